@@ -39,6 +39,33 @@ class Config:
     DB_POOL_TIMEOUT: int = 30
     DB_ECHO: bool = False
 
+    # Document rendering configuration
+    RENDER_WORKERS: int = 4
+
+    # Evidence upload configuration
+    EVIDENCE_UPLOAD_CONCURRENCY: int = 8
+    EVIDENCE_VERIFY_CONCURRENCY: int = 16
+
+    # Quote profiling (0 disables the latency-threshold trigger)
+    PROFILE_THRESHOLD_MS: int = 0
+    PROFILE_SAMPLE_INTERVAL_MS: int = 5
+    PROFILE_TOKEN: str = ""  # required in X-Profile-Token; empty ignores X-Profile
+
+    # Span export: none | file | otlp
+    TRACE_EXPORTER: str = "none"
+    TRACE_FILE: str = "out/traces/spans.jsonl"
+    TRACE_OTLP_ENDPOINT: str = "http://localhost:4318"
+
+    # MCP gateway (empty URL serves built-in mock tool results)
+    MCP_GATEWAY_URL: str = ""
+    MCP_GATEWAY_API_KEY: str = ""
+    MCP_POOL_LIMIT: int = 100
+    MCP_POOL_LIMIT_PER_HOST: int = 32
+    MCP_KEEPALIVE_SECONDS: int = 30
+    MCP_PLAN_CONCURRENCY: int = 4
+    MCP_CACHE_MAX_ENTRIES: int = 1024
+    MCP_CACHE_TTL_SECONDS: int = 300
+
     def __init__(self):
         """Initialize and validate configuration"""
         self._load_required_env_vars()
@@ -95,6 +122,42 @@ class Config:
             "yes",
         )
 
+        self.RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(self.RENDER_WORKERS)))
+        self.EVIDENCE_UPLOAD_CONCURRENCY = int(
+            os.getenv("EVIDENCE_UPLOAD_CONCURRENCY", str(self.EVIDENCE_UPLOAD_CONCURRENCY))
+        )
+        self.EVIDENCE_VERIFY_CONCURRENCY = int(
+            os.getenv("EVIDENCE_VERIFY_CONCURRENCY", str(self.EVIDENCE_VERIFY_CONCURRENCY))
+        )
+        self.PROFILE_THRESHOLD_MS = int(
+            os.getenv("PROFILE_THRESHOLD_MS", str(self.PROFILE_THRESHOLD_MS))
+        )
+        self.PROFILE_SAMPLE_INTERVAL_MS = int(
+            os.getenv("PROFILE_SAMPLE_INTERVAL_MS", str(self.PROFILE_SAMPLE_INTERVAL_MS))
+        )
+        self.PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", self.PROFILE_TOKEN)
+        self.TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", self.TRACE_EXPORTER).lower()
+        self.TRACE_FILE = os.getenv("TRACE_FILE", self.TRACE_FILE)
+        self.TRACE_OTLP_ENDPOINT = os.getenv("TRACE_OTLP_ENDPOINT", self.TRACE_OTLP_ENDPOINT)
+        self.MCP_GATEWAY_URL = os.getenv("MCP_GATEWAY_URL", self.MCP_GATEWAY_URL)
+        self.MCP_GATEWAY_API_KEY = os.getenv("MCP_GATEWAY_API_KEY", self.MCP_GATEWAY_API_KEY)
+        self.MCP_POOL_LIMIT = int(os.getenv("MCP_POOL_LIMIT", str(self.MCP_POOL_LIMIT)))
+        self.MCP_POOL_LIMIT_PER_HOST = int(
+            os.getenv("MCP_POOL_LIMIT_PER_HOST", str(self.MCP_POOL_LIMIT_PER_HOST))
+        )
+        self.MCP_KEEPALIVE_SECONDS = int(
+            os.getenv("MCP_KEEPALIVE_SECONDS", str(self.MCP_KEEPALIVE_SECONDS))
+        )
+        self.MCP_PLAN_CONCURRENCY = int(
+            os.getenv("MCP_PLAN_CONCURRENCY", str(self.MCP_PLAN_CONCURRENCY))
+        )
+        self.MCP_CACHE_MAX_ENTRIES = int(
+            os.getenv("MCP_CACHE_MAX_ENTRIES", str(self.MCP_CACHE_MAX_ENTRIES))
+        )
+        self.MCP_CACHE_TTL_SECONDS = int(
+            os.getenv("MCP_CACHE_TTL_SECONDS", str(self.MCP_CACHE_TTL_SECONDS))
+        )
+
     def _validate_config(self) -> None:
         """Validate configuration values"""
         # Validate URLs
@@ -115,6 +178,44 @@ class Config:
         if self.DB_MAX_OVERFLOW < 0:
             raise ConfigError("DB_MAX_OVERFLOW must be non-negative")
 
+        if self.RENDER_WORKERS < 1:
+            raise ConfigError("RENDER_WORKERS must be at least 1")
+
+        if self.EVIDENCE_UPLOAD_CONCURRENCY < 1:
+            raise ConfigError("EVIDENCE_UPLOAD_CONCURRENCY must be at least 1")
+
+        if self.EVIDENCE_VERIFY_CONCURRENCY < 1:
+            raise ConfigError("EVIDENCE_VERIFY_CONCURRENCY must be at least 1")
+
+        if self.PROFILE_THRESHOLD_MS < 0:
+            raise ConfigError("PROFILE_THRESHOLD_MS must be non-negative")
+
+        if self.PROFILE_SAMPLE_INTERVAL_MS < 1:
+            raise ConfigError("PROFILE_SAMPLE_INTERVAL_MS must be at least 1")
+
+        if self.TRACE_EXPORTER not in ("none", "file", "otlp"):
+            raise ConfigError("TRACE_EXPORTER must be one of: none, file, otlp")
+
+        if self.MCP_GATEWAY_URL and not self.MCP_GATEWAY_URL.startswith(("http://", "https://")):
+            raise ConfigError(
+                "Invalid MCP_GATEWAY_URL: must start with http:// or https://"
+            )
+
+        if self.MCP_POOL_LIMIT < 1 or self.MCP_POOL_LIMIT_PER_HOST < 1:
+            raise ConfigError("MCP_POOL_LIMIT and MCP_POOL_LIMIT_PER_HOST must be at least 1")
+
+        if self.MCP_KEEPALIVE_SECONDS < 0:
+            raise ConfigError("MCP_KEEPALIVE_SECONDS must be non-negative")
+
+        if self.MCP_PLAN_CONCURRENCY < 1:
+            raise ConfigError("MCP_PLAN_CONCURRENCY must be at least 1")
+
+        if self.MCP_CACHE_MAX_ENTRIES < 1:
+            raise ConfigError("MCP_CACHE_MAX_ENTRIES must be at least 1")
+
+        if self.MCP_CACHE_TTL_SECONDS < 1:
+            raise ConfigError("MCP_CACHE_TTL_SECONDS must be at least 1")
+
         if self.SIGNED_URL_TTL < 60:
             raise ConfigError("SIGNED_URL_TTL must be at least 60 seconds")
 
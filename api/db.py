@@ -9,11 +9,13 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
     async_sessionmaker,
 )
-from sqlalchemy import text, MetaData
+from sqlalchemy import event, text, MetaData
 from contextlib import asynccontextmanager
 import logging
 
+from api import tracing
 from api.config import config
+from api.metrics import DB_POOL_CONNECTIONS, DB_POOL_UTILIZATION, registry
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,52 @@ AsyncSessionLocal = async_sessionmaker(
 metadata = MetaData()
 
 
+def _collect_pool_metrics() -> None:
+    """Publish connection pool utilisation on every /metrics scrape."""
+    pool = engine.pool
+    capacity = config.DB_POOL_SIZE + config.DB_MAX_OVERFLOW
+    checked_out = pool.checkedout()
+    DB_POOL_CONNECTIONS.set(pool.size(), state="size")
+    DB_POOL_CONNECTIONS.set(checked_out, state="checked_out")
+    DB_POOL_CONNECTIONS.set(pool.checkedin(), state="idle")
+    DB_POOL_CONNECTIONS.set(max(pool.overflow(), 0), state="overflow")
+    DB_POOL_UTILIZATION.set(checked_out / capacity if capacity else 0.0)
+
+
+registry.register_collector(_collect_pool_metrics)
+
+
+# One client span per statement. The async engine runs these hooks in a
+# greenlet that shares the caller's context, so spans nest under the
+# request/stage span that issued the query.
+@event.listens_for(engine.sync_engine, "before_cursor_execute")
+def _start_query_span(conn, cursor, statement, parameters, context, executemany):
+    context._kis_span = tracing.start_span(
+        "db.query",
+        kind="client",
+        attributes={
+            "db.system": "postgresql",
+            "db.statement": statement[:1000],
+            "db.operation": statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "",
+        },
+    )
+
+
+@event.listens_for(engine.sync_engine, "after_cursor_execute")
+def _end_query_span(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_kis_span", None)
+    if span is not None:
+        span.set_attribute("db.rows", cursor.rowcount)
+        span.end()
+
+
+@event.listens_for(engine.sync_engine, "handle_error")
+def _fail_query_span(exception_context):
+    span = getattr(exception_context.execution_context, "_kis_span", None)
+    if span is not None:
+        span.end(error=exception_context.original_exception)
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency function to get database session.
@@ -0,0 +1,107 @@
+"""
+Idempotency Cache
+Bounded LRU + TTL cache for MCP tool results, keyed on the caller's
+idempotency key or on a canonical hash of tool + parameters for pure tools
+"""
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from api.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, record_cache
+
+# Tools whose result depends only on their parameters (no generated ids,
+# no side effects), so identical calls may share one result
+PURE_TOOLS = frozenset({
+    "enclosure.solve",
+    "enclosure.validate",
+    "layout.check_clearance",
+    "layout.balance_phases",
+    "doc.lint",
+    "doc.policy_check",
+})
+
+
+def canonical_key(tool_name: str, parameters: Dict[str, Any]) -> str:
+    """
+    SHA256 of tool + parameters in canonical JSON (sorted keys, no
+    whitespace), so equal payloads map to one key regardless of dict order.
+    """
+    canonical = json.dumps(
+        {"tool": tool_name, "parameters": parameters},
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class IdempotencyCache:
+    """
+    At most ``max_entries`` results, each valid for ``ttl_seconds``
+
+    The least recently used entry is evicted when full; expired entries
+    are dropped on lookup and from the cold end on insert. Values are
+    deep-copied in and out so callers cannot mutate a cached result.
+    Lookups count as ``kis_cache_requests_total{cache=name}``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 1024,
+        ttl_seconds: float = 300.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Cached value for ``key``, or None (miss or expired)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] <= self._clock():
+                self._evict(key, "expired")
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        record_cache(self.name, entry is not None)
+        return copy.deepcopy(entry[1]) if entry is not None else None
+
+    def set(self, key: str, value: Any) -> None:
+        now = self._clock()
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while self._entries:
+                oldest_key, (expires_at, _) = next(iter(self._entries.items()))
+                if expires_at <= now:
+                    self._evict(oldest_key, "expired")
+                elif len(self._entries) > self.max_entries:
+                    self._evict(oldest_key, "capacity")
+                else:
+                    break
+            CACHE_ENTRIES.set(len(self._entries), cache=self.name)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            CACHE_ENTRIES.set(0, cache=self.name)
+
+    def _evict(self, key: str, reason: str) -> None:
+        del self._entries[key]
+        CACHE_EVICTIONS.inc(cache=self.name, reason=reason)
+        CACHE_ENTRIES.set(len(self._entries), cache=self.name)
@@ -0,0 +1,144 @@
+"""
+MCP Call Planner
+Runs a dependency graph of MCP tool calls, issuing every call whose
+inputs are ready concurrently (bounded by a semaphore), so a pipeline
+takes as long as its critical path instead of the sum of its calls
+"""
+import asyncio
+import logging
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from api.metrics import stage_timer
+
+logger = logging.getLogger(__name__)
+
+Params = Union[Dict[str, Any], Callable[[Dict[str, Dict[str, Any]]], Dict[str, Any]]]
+ToolCaller = Callable[[str, Dict[str, Any]], Awaitable[Dict[str, Any]]]
+
+
+class PlannedCall:
+    """One node of an MCPCallPlan"""
+
+    def __init__(
+        self,
+        name: str,
+        tool: str,
+        params: Params,
+        after: Iterable[str] = (),
+        check: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stage: Optional[str] = None
+    ):
+        self.name = name
+        self.tool = tool
+        self.params = params
+        self.after = tuple(after)
+        self.check = check
+        self.stage = stage
+
+    def build_params(self, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return self.params(results) if callable(self.params) else self.params
+
+
+class MCPCallPlan:
+    """
+    Dependency-aware batch of MCP tool calls
+
+    Nodes name the calls they need (``after``); ``params`` may be a
+    callable receiving the results so far to build its payload from them.
+    A node starts as soon as everything in ``after`` has finished, and at
+    most ``max_concurrency`` calls are in flight. ``after`` may also list
+    gate-only dependencies whose results the payload does not use (e.g.
+    validations that must pass before a document is generated).
+
+    ``check`` validates a node's result and raises to fail the plan; the
+    first failure cancels every call still pending or running.
+    """
+
+    def __init__(self, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+        self.max_concurrency = max_concurrency
+        self.calls: Dict[str, PlannedCall] = {}
+        self.completed_at: Dict[str, str] = {}
+
+    def add(
+        self,
+        name: str,
+        tool: str,
+        params: Params,
+        after: Iterable[str] = (),
+        check: Optional[Callable[[Dict[str, Any]], None]] = None,
+        stage: Optional[str] = None
+    ) -> "MCPCallPlan":
+        """
+        Add a call; dependencies must already be in the plan (keeps it acyclic)
+
+        Args:
+            name: Node name, the key of its result
+            tool: MCP tool name
+            params: Payload, or callable building it from earlier results
+            after: Names of nodes that must finish first
+            check: Raises when the result is unacceptable
+            stage: Time the call as this pipeline stage (metrics + span)
+
+        Raises:
+            ValueError: Duplicate name or unknown dependency
+        """
+        if name in self.calls:
+            raise ValueError(f"Duplicate planned call '{name}'")
+        call = PlannedCall(name, tool, params, after, check, stage)
+        unknown = [dep for dep in call.after if dep not in self.calls]
+        if unknown:
+            raise ValueError(f"Planned call '{name}' depends on unknown calls: {unknown}")
+        self.calls[name] = call
+        return self
+
+    def critical_path(self) -> List[str]:
+        """Longest chain of dependent calls (in call count), root first"""
+        longest: Dict[str, List[str]] = {}
+        for name, call in self.calls.items():  # insertion order is topological
+            prefix = max((longest[dep] for dep in call.after), key=len, default=[])
+            longest[name] = prefix + [name]
+        return max(longest.values(), key=len, default=[])
+
+    async def run(self, call_tool: ToolCaller) -> Dict[str, Dict[str, Any]]:
+        """
+        Execute the plan
+
+        Args:
+            call_tool: Coroutine function ``(tool, params) -> result``,
+                e.g. ``MCPGatewayClient.call_tool``
+
+        Returns:
+            Result of every call by node name
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        tasks: Dict[str, asyncio.Task] = {}
+
+        async def execute(call: PlannedCall) -> None:
+            if call.after:
+                await asyncio.gather(*(tasks[dep] for dep in call.after))
+            params = call.build_params(results)
+            async with semaphore:
+                with stage_timer(call.stage) if call.stage else nullcontext():
+                    result = await call_tool(call.tool, params)
+                    if call.check is not None:
+                        call.check(result)
+            results[call.name] = result
+            self.completed_at[call.name] = datetime.now(timezone.utc).isoformat()
+
+        for call in self.calls.values():
+            tasks[call.name] = asyncio.ensure_future(execute(call))
+
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+
+        return results
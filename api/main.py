@@ -21,23 +21,17 @@ from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
 
-<<<<<<< HEAD
 from api.config import config
 from api.db import init_db, close_db, check_db_health
 from api.storage import storage_client
+from api.integrations.mcp_client import mcp_client
+from api.services.document_service import shutdown_renderer
 
 # Import routers
 from api.routers import estimate, validate, documents, catalog
-=======
-from api.routers import estimate, validation, documents, catalog, system
-from api.services import (
-    estimate_service,
-    layout_service,
-    enclosure_service,
-    document_service,
-    rag_service
-)
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
+from api.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from api.metrics import HTTP_REQUEST_SECONDS, registry as metrics_registry
+from api import tracing
 
 # Configure logging
 logging.basicConfig(
@@ -69,7 +63,13 @@ class AppContext:
         """Initialize application resources"""
         logger.info("Starting KIS Estimator API...")
 
-<<<<<<< HEAD
+        # Span export (TRACE_EXPORTER)
+        tracing.setup(
+            config.TRACE_EXPORTER,
+            file_path=config.TRACE_FILE,
+            endpoint=config.TRACE_OTLP_ENDPOINT,
+        )
+
         # Initialize database connection
         await init_db()
 
@@ -79,14 +79,6 @@ class AppContext:
         # await enclosure_service.initialize()
         # await document_service.initialize()
         # await rag_service.initialize()
-=======
-        # Initialize services
-        await estimate_service.initialize()
-        await layout_service.initialize()
-        await enclosure_service.initialize()
-        await document_service.initialize()
-        await rag_service.initialize()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
 
         self.ready = True
         logger.info("KIS Estimator API started successfully")
@@ -95,24 +87,24 @@ class AppContext:
         """Cleanup application resources"""
         logger.info("Shutting down KIS Estimator API...")
 
-<<<<<<< HEAD
         # Close database connections
         await close_db()
 
+        # Stop document render workers
+        shutdown_renderer()
+
+        # Release the shared MCP gateway transport
+        await mcp_client.disconnect()
+
+        # Flush queued spans
+        tracing.shutdown()
+
         # Cleanup services when implemented
         # await estimate_service.cleanup()
         # await layout_service.cleanup()
         # await enclosure_service.cleanup()
         # await document_service.cleanup()
         # await rag_service.cleanup()
-=======
-        # Cleanup services
-        await estimate_service.cleanup()
-        await layout_service.cleanup()
-        await enclosure_service.cleanup()
-        await document_service.cleanup()
-        await rag_service.cleanup()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
 
         self.ready = False
         logger.info("KIS Estimator API shut down successfully")
@@ -154,15 +146,29 @@ app.add_middleware(
     allowed_hosts=["*"]  # Configure appropriately for production
 )
 
-<<<<<<< HEAD
 # Register routers
 app.include_router(estimate.router)
 app.include_router(validate.router)
 app.include_router(documents.router)
 app.include_router(catalog.router)
 
-=======
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
+def _observe_request(
+    request: Request, status_code: int, seconds: float, request_span: tracing.Span
+) -> None:
+    """Record request latency under the matched route template (bounded labels)"""
+    route = getattr(request.scope.get("route"), "path", "unmatched")
+    HTTP_REQUEST_SECONDS.observe(
+        seconds,
+        method=request.method,
+        route=route,
+        status=str(status_code),
+    )
+    request_span.name = f"{request.method} {route}"
+    request_span.set_attribute("http.route", route)
+    request_span.set_attribute("http.status_code", status_code)
+    if status_code >= 500:
+        request_span.status = tracing.STATUS_ERROR
+
 # Middleware for trace ID injection
 @app.middleware("http")
 async def inject_trace_id(request: Request, call_next):
@@ -174,10 +180,26 @@ async def inject_trace_id(request: Request, call_next):
     request.state.logger = logger_adapter
     request.state.trace_id = trace_id
 
+    # Continue an upstream W3C trace, else root the trace at X-Trace-Id
+    parent = tracing.parse_traceparent(request.headers.get("traceparent"))
+    span_trace_id, parent_id = parent or (tracing.normalize_trace_id(trace_id), None)
+
     # Process request
-    start_time = time.time()
-    response = await call_next(request)
-    process_time = time.time() - start_time
+    start_time = time.perf_counter()
+    with tracing.span(
+        f"{request.method} {request.url.path}",
+        kind="server",
+        attributes={"http.method": request.method, "kis.trace_id": trace_id},
+        trace_id=span_trace_id,
+        parent_id=parent_id,
+    ) as request_span:
+        try:
+            response = await call_next(request)
+        except Exception:
+            _observe_request(request, 500, time.perf_counter() - start_time, request_span)
+            raise
+        process_time = time.perf_counter() - start_time
+        _observe_request(request, response.status_code, process_time, request_span)
 
     # Add headers to response
     response.headers["X-Trace-Id"] = trace_id
@@ -261,9 +283,14 @@ async def health_check():
         }
     )
 
+# Metrics endpoint
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: request/stage/MCP latency, DB pool, cache hit ratios"""
+    return Response(content=metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 # Readiness check endpoint
 @app.get("/readyz")
-<<<<<<< HEAD
 async def readiness_check(request: Request):
     """
     Readiness check endpoint with DB and Storage validation.
@@ -308,28 +335,15 @@ async def readiness_check(request: Request):
                 "ts": datetime.now(timezone.utc).isoformat() + "Z",
                 "traceId": trace_id
             }
-=======
-async def readiness_check():
-    """Readiness check endpoint"""
-    if not app_context.ready:
-        return JSONResponse(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            content={"status": "not_ready"}
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
         )
 
     return JSONResponse(
         content={
-<<<<<<< HEAD
             "status": "ok",
             "db": "ok",
             "storage": "ok",
             "ts": db_health.get("timestamp", datetime.now(timezone.utc).isoformat() + "Z"),
             "traceId": trace_id
-=======
-            "status": "ready",
-            "timestamp": datetime.now(timezone.utc).isoformat()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
         }
     )
 
@@ -346,21 +360,12 @@ def generate_evidence_hash(data: Dict[str, Any]) -> str:
     json_str = json.dumps(data, sort_keys=True, ensure_ascii=False)
     return hashlib.sha256(json_str.encode()).hexdigest()
 
-<<<<<<< HEAD
 # Include routers (when implemented)
 # app.include_router(estimate.router, prefix="/v1/estimate", tags=["Estimate"])
 # app.include_router(validation.router, prefix="/v1/validate", tags=["Validation"])
 # app.include_router(documents.router, prefix="/v1/documents", tags=["Documents"])
 # app.include_router(catalog.router, prefix="/v1/catalog", tags=["Catalog"])
 # app.include_router(system.router, prefix="/system", tags=["System"])
-=======
-# Include routers
-app.include_router(estimate.router, prefix="/v1/estimate", tags=["Estimate"])
-app.include_router(validation.router, prefix="/v1/validate", tags=["Validation"])
-app.include_router(documents.router, prefix="/v1/documents", tags=["Documents"])
-app.include_router(catalog.router, prefix="/v1/catalog", tags=["Catalog"])
-app.include_router(system.router, prefix="/system", tags=["System"])
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
 
 # Root endpoint
 @app.get("/")
@@ -373,7 +378,8 @@ async def root():
         "docs": "/docs",
         "openapi": "/openapi",
         "health": "/healthz",
-        "ready": "/readyz"
+        "ready": "/readyz",
+        "metrics": "/metrics"
     }
 
 if __name__ == "__main__":
@@ -0,0 +1,254 @@
+"""
+KIS Estimator Profiling Module
+Opt-in profiles of slow quote pipeline calls, stored as evidence
+
+Two triggers:
+- ``X-Profile`` request header, honoured only with an ``X-Profile-Token``
+  matching PROFILE_TOKEN (no token configured: header ignored):
+  ``cprofile`` runs the whole call under cProfile (pstats file), one call
+  at a time, since cProfile hooks the whole event-loop thread; overlapping
+  requests fall back to the sampler. ``sample`` (or ``1``/``true``) runs a
+  stack sampler
+- latency threshold: a deadline registered with a shared watchdog thread
+  starts the stack sampler only once the call is already slow (even when
+  it is blocking the event loop); a call that finishes in time costs one
+  heap push and a cancelled entry
+
+The sampler records the event loop thread, so stacks of other requests
+interleaved on the same loop can appear in a profile.
+"""
+import cProfile
+import heapq
+import hmac
+import itertools
+import marshal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Mapping, Optional
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_TOKEN_HEADER = "X-Profile-Token"
+
+_SAMPLE_VALUES = {"sample", "1", "true", "yes"}
+
+
+def profile_mode(header_value: Optional[str]) -> Optional[str]:
+    """Map an ``X-Profile`` header value to "cprofile", "sample" or None."""
+    if not header_value:
+        return None
+    value = header_value.strip().lower()
+    if value == "cprofile":
+        return "cprofile"
+    if value in _SAMPLE_VALUES:
+        return "sample"
+    return None
+
+
+def requested_profile(headers: Mapping[str, str], token: str) -> Optional[str]:
+    """
+    Profile mode requested by ``headers``, or None.
+
+    Args:
+        headers: Request headers
+        token: PROFILE_TOKEN; empty disables header-triggered profiling
+    """
+    supplied = headers.get(PROFILE_TOKEN_HEADER) or ""
+    if not token or not hmac.compare_digest(supplied.encode("utf-8"), token.encode("utf-8")):
+        return None
+    return profile_mode(headers.get(PROFILE_HEADER))
+
+
+# cProfile hooks the whole thread: concurrent captures would replace each
+# other's profiler (and fail outright on Python 3.12+)
+_cprofile_lock = threading.Lock()
+
+
+class StackSampler:
+    """
+    Sample one thread's Python stack on a background thread.
+
+    Samples are aggregated as folded stacks (``root;...;leaf count``),
+    the input format of flamegraph tools.
+    """
+
+    def __init__(self, thread_id: int, interval_ms: float = 5.0):
+        self.thread_id = thread_id
+        self.interval_s = interval_ms / 1000.0
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="kis-profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def folded(self) -> bytes:
+        return "".join(
+            f"{stack} {count}\n" for stack, count in self.stacks.most_common()
+        ).encode("utf-8")
+
+
+class _Watchdog:
+    """One daemon thread running callbacks at deadlines (cancellable)."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap: List[list] = []
+        self._seq = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+
+    def schedule(self, delay_s: float, callback: Callable[[], None]) -> list:
+        entry = [time.monotonic() + delay_s, next(self._seq), callback]
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="kis-profile-watchdog", daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, entry)
+            self._cond.notify()
+        return entry
+
+    @staticmethod
+    def cancel(entry: list) -> None:
+        entry[2] = None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                delay = self._heap[0][0] - time.monotonic()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                callback = heapq.heappop(self._heap)[2]
+            if callback is not None:
+                callback()
+
+
+_watchdog = _Watchdog()
+
+
+class ProfileCapture:
+    """Outcome of ``profile_call``: an evidence artefact when a profile was taken."""
+
+    def __init__(self):
+        self.mode: Optional[str] = None
+        self.trigger: Optional[str] = None
+        self.started_after_ms = 0.0
+        self.elapsed_ms = 0.0
+        self.artifact: Optional[Dict[str, Any]] = None
+
+    def _finish(self, ext: str, data: bytes, **meta: Any) -> None:
+        self.artifact = {
+            "stage": "profile",
+            "ext": ext,
+            "file_bytes": data,
+            "meta": {
+                "mode": self.mode,
+                "trigger": self.trigger,
+                "started_after_ms": round(self.started_after_ms, 1),
+                "elapsed_ms": round(self.elapsed_ms, 1),
+                **meta,
+            },
+        }
+
+
+@asynccontextmanager
+async def profile_call(
+    mode: Optional[str] = None,
+    threshold_ms: float = 0,
+    interval_ms: float = 5.0,
+) -> AsyncIterator[ProfileCapture]:
+    """
+    Profile the body of an ``async with`` block.
+
+    Args:
+        mode: "cprofile" or "sample" to profile unconditionally (header
+            trigger); None to rely on the threshold. "cprofile" falls back
+            to "sample" while another cProfile capture is running
+        threshold_ms: Start sampling once the block has run this long
+            (0 disables the threshold trigger)
+        interval_ms: Stack sampling interval
+
+    Yields:
+        ProfileCapture whose ``artifact`` (an upload_evidence_batch item)
+        is set on exit when a profile was taken
+    """
+    capture = ProfileCapture()
+    start = time.perf_counter()
+    profiler: Optional[cProfile.Profile] = None
+    sampler: Optional[StackSampler] = None
+    deadline: Optional[list] = None
+    thread_id = threading.get_ident()
+    lock = threading.Lock()
+    done = False
+
+    def start_sampler(trigger: str) -> None:
+        nonlocal sampler
+        with lock:
+            if done:
+                return
+            capture.mode, capture.trigger = "sample", trigger
+            capture.started_after_ms = (time.perf_counter() - start) * 1000
+            sampler = StackSampler(thread_id, interval_ms)
+            sampler.start()
+
+    if mode == "cprofile" and _cprofile_lock.acquire(blocking=False):
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiling tool owns the thread (Python 3.12+)
+            profiler = None
+            _cprofile_lock.release()
+        else:
+            capture.mode, capture.trigger = "cprofile", "header"
+    if mode in ("cprofile", "sample") and profiler is None:
+        start_sampler("header")
+    elif profiler is None and threshold_ms > 0:
+        deadline = _watchdog.schedule(threshold_ms / 1000.0, lambda: start_sampler("threshold"))
+
+    try:
+        yield capture
+    finally:
+        capture.elapsed_ms = (time.perf_counter() - start) * 1000
+        if deadline is not None:
+            _watchdog.cancel(deadline)
+        with lock:
+            done = True
+        if profiler is not None:
+            profiler.disable()
+            _cprofile_lock.release()
+            profiler.create_stats()
+            # Same format as Profile.dump_stats, readable with pstats.Stats
+            capture._finish("prof", marshal.dumps(profiler.stats))
+        if sampler is not None:
+            sampler.stop()
+            capture._finish(
+                "folded",
+                sampler.folded(),
+                samples=sampler.samples,
+                interval_ms=interval_ms,
+            )
@@ -1,6 +1,11 @@
 """Documents Router - Document generation and retrieval"""
 import logging
+from typing import Optional
+
 from fastapi import APIRouter
+from pydantic import BaseModel, Field
+
+from api.services import document_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/v1/documents", tags=["documents"])
@@ -25,3 +30,29 @@ async def export_documents(quoteId: str, kinds: list[str]):
     """Export documents in specified formats"""
     # Stub: Will generate and upload documents
     return {"taskId": "task-uuid", "documents": []}, 202
+
+
+class BatchExportQuote(BaseModel):
+    quoteId: str
+    data: dict
+
+
+class BatchExportRequest(BaseModel):
+    quotes: list[BatchExportQuote] = Field(..., min_length=1, max_length=1000)
+    concurrency: Optional[int] = Field(None, ge=1, le=64)
+
+
+@router.post("/export/batch")
+async def export_documents_batch(req: BatchExportRequest):
+    """
+    Bulk PDF/XLSX export (month-end re-issue)
+
+    Quotes render in parallel on the shared worker pool; per-quote
+    failures are returned in place instead of failing the batch.
+    """
+    results = await document_service.export_pdf_xlsx_batch(
+        [{"quote_id": q.quoteId, "quote_data": q.data} for q in req.quotes],
+        concurrency=req.concurrency,
+    )
+    failed = sum(1 for r in results if "error" in r)
+    return {"documents": results, "total": len(results), "failed": failed}
@@ -1,10 +1,12 @@
 """Estimate Router - Quote estimation with FIX-4 pipeline and SSE"""
 import logging
 import uuid
-from fastapi import APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
+from api.config import config
+from api.profiling import requested_profile
 from api.services import estimate_service
 
 logger = logging.getLogger(__name__)
@@ -18,8 +20,8 @@ class EstimateRequest(BaseModel):
     locale: str = "ko-KR"
 
 
-@router.post("")
-async def create_estimate(req: EstimateRequest):
+@router.post("", status_code=201)
+async def create_estimate(req: EstimateRequest, request: Request):
     """
     FIX-4 Pipeline: Enclosure → Breaker → Critic → Format → Cover → Lint
     
@@ -28,10 +30,16 @@ async def create_estimate(req: EstimateRequest):
     - Layout: phase_dev <= 0.03, clearance_ok = true
     - Format: formula_loss = 0
     - Lint: errors = 0
+
+    ``X-Profile: cprofile|sample`` with ``X-Profile-Token: <PROFILE_TOKEN>``
+    stores a profile of the run as evidence.
     """
-    result = await estimate_service.create_quote(req.model_dump())
+    result = await estimate_service.create_quote(
+        req.model_dump(),
+        profile=requested_profile(request.headers, config.PROFILE_TOKEN),
+    )
     
-    return result, 201
+    return result
 
 
 @router.get("/{id}")
@@ -1,23 +1,197 @@
 """
-<<<<<<< HEAD
 Document Service - Evidence Upload and Signed URL Management
 Evidence-Gated validation with SHA256 integrity checks
 """
 
+import asyncio
 import hashlib
+import io
 import logging
 import uuid
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 from sqlalchemy import text
 
+from api.config import config
 from api.db import AsyncSessionLocal
+from api.metrics import record_cache
+from api.services.render_service import DocumentRenderer
 from api.storage import storage_client
 
 logger = logging.getLogger(__name__)
 
+# Shared renderer: compiled templates + PDF/XLSX worker pool, created on first export
+_renderer: Optional[DocumentRenderer] = None
+
+
+def get_renderer() -> DocumentRenderer:
+    """Return the shared document renderer, creating it on first use."""
+    global _renderer
+    if _renderer is None:
+        _renderer = DocumentRenderer(max_workers=config.RENDER_WORKERS)
+    return _renderer
+
+
+def shutdown_renderer() -> None:
+    """Stop the shared renderer's worker pool (application shutdown)."""
+    global _renderer
+    renderer, _renderer = _renderer, None
+    if renderer is not None:
+        renderer.shutdown()
+
+
+VALID_STAGES = {"enclosure", "breaker", "critic", "format", "cover", "lint", "profile", "bundle"}
+
+CONTENT_TYPES = {
+    "json": "application/json",
+    "pdf": "application/pdf",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "svg": "image/svg+xml",
+    "dxf": "application/dxf",
+    "zip": "application/zip",
+    "prof": "application/octet-stream",  # cProfile/pstats
+    "folded": "text/plain",  # folded stacks (flamegraph input)
+}
+
+
+# Read/hash/download granularity for file-backed evidence
+EVIDENCE_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(file_path: Union[str, Path]) -> Tuple[str, int]:
+    """
+    SHA256 of a file, read in chunks (constant memory).
+
+    Returns:
+        tuple: (sha256 hex, size in bytes)
+    """
+    with open(file_path, "rb") as f:
+        digest = hashlib.file_digest(f, "sha256")
+        return digest.hexdigest(), f.tell()
+
+
+def hash_stream(chunks: Iterable[bytes]) -> Tuple[str, int]:
+    """
+    SHA256 of a byte stream (e.g. a streamed download).
+
+    Returns:
+        tuple: (sha256 hex, size in bytes)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in chunks:
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+def _validate_evidence(artifact: Dict[str, Any]) -> None:
+    """
+    Check an artefact's stage, extension and source.
+
+    Raises:
+        ValueError: Invalid stage or extension, or not exactly one of
+            file_bytes / file_path
+    """
+    stage, ext = artifact["stage"], artifact["ext"]
+    if stage not in VALID_STAGES:
+        raise ValueError(
+            f"Invalid stage '{stage}'. Must be one of: {', '.join(VALID_STAGES)}"
+        )
+    if ext not in CONTENT_TYPES:
+        raise ValueError(
+            f"Invalid extension '{ext}'. Must be one of: {', '.join(CONTENT_TYPES)}"
+        )
+    if ("file_bytes" in artifact) == ("file_path" in artifact):
+        raise ValueError("Evidence artifact needs exactly one of file_bytes or file_path")
+
+
+async def _prepare_evidence(quote_id: str, artifact: Dict[str, Any]) -> Dict[str, Any]:
+    """Hash a validated artefact and build its evidence_blobs row."""
+    stage, ext = artifact["stage"], artifact["ext"]
+    if "file_path" in artifact:
+        sha256_hash, size = await asyncio.to_thread(hash_file, artifact["file_path"])
+    else:
+        sha256_hash = hashlib.sha256(artifact["file_bytes"]).hexdigest()
+        size = len(artifact["file_bytes"])
+    logger.info(
+        f"Calculated SHA256 for evidence: {sha256_hash[:8]}... (stage={stage}, size={size} bytes)"
+    )
+
+    return {
+        "id": str(uuid.uuid4()),
+        "quote_id": quote_id,
+        "stage": stage,
+        "path": f"evidence/quote/{quote_id}/{stage}/{sha256_hash}.{ext}",
+        "sha256": sha256_hash,
+        "meta": artifact.get("meta") or {},
+        "content_type": CONTENT_TYPES[ext],
+    }
+
+
+async def _store_evidence(row: Dict[str, Any], artifact: Dict[str, Any]) -> None:
+    """Upload one artefact without blocking the event loop."""
+    if "file_path" in artifact:
+        # Streamed from disk by the storage client, never read into memory here
+        await asyncio.to_thread(
+            storage_client.upload_path, row["path"], artifact["file_path"], row["content_type"]
+        )
+    else:
+        await asyncio.to_thread(
+            storage_client.upload_file, row["path"], artifact["file_bytes"], row["content_type"]
+        )
+    logger.info(f"Uploaded evidence to storage: {row['path']}")
+
+
+async def _insert_evidence_rows(rows: List[Dict[str, Any]]) -> None:
+    """Insert evidence_blobs rows in one multi-row INSERT (SHA256 CHECK applies per row)."""
+    values = []
+    params: Dict[str, Any] = {}
+    for i, row in enumerate(rows):
+        values.append(
+            f"(:id_{i}, :quote_id_{i}, :stage_{i}, :path_{i}, :sha256_{i}, :meta_{i}, "
+            "(now() AT TIME ZONE 'utc'))"
+        )
+        for column in ("id", "quote_id", "stage", "path", "sha256", "meta"):
+            params[f"{column}_{i}"] = row[column]
+
+    async with AsyncSessionLocal() as session:
+        insert_query = text(
+            """
+            INSERT INTO estimator.evidence_blobs
+                (id, quote_id, stage, path, sha256, meta, created_at)
+            VALUES
+            """
+            + ",\n".join(values)
+            + "\nRETURNING id"
+        )
+        result = await session.execute(insert_query, params)
+        await session.commit()
+        inserted = result.scalars().all()
+
+    if len(inserted) != len(rows):
+        raise RuntimeError(f"Inserted {len(inserted)} of {len(rows)} evidence_blob records")
+    logger.info(f"Inserted {len(rows)} evidence_blob record(s)")
+
+
+def _evidence_result(row: Dict[str, Any]) -> dict:
+    return {
+        "path": row["path"],
+        "sha256": row["sha256"],
+        "quote_id": row["quote_id"],
+        "stage": row["stage"],
+        "id": row["id"],
+    }
+
 
 async def upload_evidence(
-    quote_id: str, stage: str, file_bytes: bytes, ext: str
+    quote_id: str,
+    stage: str,
+    file_bytes: bytes,
+    ext: str,
+    meta: Optional[Dict[str, Any]] = None,
 ) -> dict:
     """
     Upload evidence artifact with SHA256 integrity validation.
@@ -29,97 +203,146 @@ async def upload_evidence(
     4. Insert to DB: estimator.evidence_blobs (SHA256 CHECK passes)
     5. Return {path, sha256}
 
+    Use ``upload_evidence_batch`` for several artefacts of one quote.
+
     Args:
         quote_id: UUID of the quote
-        stage: FIX-4 pipeline stage (enclosure|breaker|critic|format|cover|lint)
+        stage: FIX-4 pipeline stage (enclosure|breaker|critic|format|cover|lint|profile)
         file_bytes: Raw file bytes
-        ext: File extension (json|pdf|xlsx|svg)
+        ext: File extension (json|pdf|xlsx|svg|dxf|zip)
+        meta: JSONB metadata stored with the record
 
     Returns:
-        dict: {path, sha256, quote_id, stage}
+        dict: {path, sha256, quote_id, stage, id}
 
     Raises:
         ValueError: Invalid stage or extension
         RuntimeError: Upload or DB insert failure
     """
-    # Validate stage
-    valid_stages = {"enclosure", "breaker", "critic", "format", "cover", "lint"}
-    if stage not in valid_stages:
-        raise ValueError(
-            f"Invalid stage '{stage}'. Must be one of: {', '.join(valid_stages)}"
-        )
+    results = await upload_evidence_batch(
+        quote_id,
+        [{"stage": stage, "file_bytes": file_bytes, "ext": ext, "meta": meta}],
+    )
+    return results[0]
 
-    # Validate extension
-    valid_extensions = {"json", "pdf", "xlsx", "svg", "dxf"}
-    if ext not in valid_extensions:
-        raise ValueError(
-            f"Invalid extension '{ext}'. Must be one of: {', '.join(valid_extensions)}"
-        )
 
-    # Step 1: Calculate SHA256
-    sha256_hash = hashlib.sha256(file_bytes).hexdigest()
-    logger.info(
-        f"Calculated SHA256 for evidence: {sha256_hash[:8]}... (stage={stage}, size={len(file_bytes)} bytes)"
+async def upload_evidence_file(
+    quote_id: str,
+    stage: str,
+    file_path: Union[str, Path],
+    ext: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> dict:
+    """
+    Upload a file-backed evidence artifact (large PDF/DXF) without loading it.
+
+    The SHA256 is computed by reading the file in chunks and the storage
+    client streams the upload from disk, so memory use does not grow with
+    the file size.
+
+    Returns:
+        dict: {path, sha256, quote_id, stage, id}
+
+    Raises:
+        ValueError: Invalid stage or extension
+        RuntimeError: Upload or DB insert failure
+    """
+    results = await upload_evidence_batch(
+        quote_id,
+        [{"stage": stage, "file_path": file_path, "ext": ext, "meta": meta}],
     )
+    return results[0]
 
-    # Step 2: Generate path
-    path = f"evidence/quote/{quote_id}/{stage}/{sha256_hash}.{ext}"
 
-    try:
-        # Step 3: Upload to Storage (private bucket)
-        content_type_map = {
-            "json": "application/json",
-            "pdf": "application/pdf",
-            "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            "svg": "image/svg+xml",
-            "dxf": "application/dxf",
-        }
-        content_type = content_type_map.get(ext, "application/octet-stream")
+async def upload_evidence_batch(
+    quote_id: str,
+    artifacts: List[Dict[str, Any]],
+    concurrency: Optional[int] = None,
+) -> List[dict]:
+    """
+    Upload several evidence artefacts of one quote in a single round.
 
-        storage_client.upload_file(path, file_bytes, content_type)
-        logger.info(f"Uploaded evidence to storage: {path}")
+    Every artefact is validated first, so a bad stage or extension fails
+    the batch before anything is stored. Hashing and storage uploads then
+    run concurrently in the default thread pool (the storage client is
+    synchronous), and the evidence_blobs rows go in with one multi-row
+    INSERT. An upload failure aborts the batch before the INSERT, so no row
+    points at a missing object.
 
-        # Step 4: Insert to DB with SHA256 CHECK validation
-        async with AsyncSessionLocal() as session:
-            insert_query = text(
-                """
-                INSERT INTO estimator.evidence_blobs
-                    (id, quote_id, stage, path, sha256, meta, created_at)
-                VALUES
-                    (:id, :quote_id, :stage, :path, :sha256, :meta, (now() AT TIME ZONE 'utc'))
-                RETURNING id
-                """
-            )
+    Args:
+        quote_id: UUID of the quote
+        artifacts: [{"stage": str, "file_bytes": bytes, "ext": str, "meta": dict?}, ...];
+            ``file_path`` instead of ``file_bytes`` hashes and uploads from disk
+        concurrency: Uploads in flight at once (default: EVIDENCE_UPLOAD_CONCURRENCY)
 
-            result = await session.execute(
-                insert_query,
-                {
-                    "id": str(uuid.uuid4()),
-                    "quote_id": quote_id,
-                    "stage": stage,
-                    "path": path,
-                    "sha256": sha256_hash,
-                    "meta": {},  # Empty JSONB metadata
-                },
-            )
+    Returns:
+        list: {path, sha256, quote_id, stage, id} per artefact, in order
 
-            await session.commit()
-            evidence_id = result.scalar_one()
-            logger.info(f"Inserted evidence_blob record: {evidence_id}")
+    Raises:
+        ValueError: Invalid stage or extension
+        RuntimeError: Upload or DB insert failure
+    """
+    if not artifacts:
+        return []
 
-        # Step 5: Return metadata
-        return {
-            "path": path,
-            "sha256": sha256_hash,
-            "quote_id": quote_id,
-            "stage": stage,
-            "id": str(evidence_id),
-        }
+    for artifact in artifacts:
+        _validate_evidence(artifact)
+    semaphore = asyncio.Semaphore(concurrency or config.EVIDENCE_UPLOAD_CONCURRENCY)
+
+    async def store(artifact: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            row = await _prepare_evidence(quote_id, artifact)
+            await _store_evidence(row, artifact)
+        return row
 
+    try:
+        rows = await asyncio.gather(*(store(artifact) for artifact in artifacts))
+        await _insert_evidence_rows(rows)
     except Exception as e:
         logger.error(f"Failed to upload evidence: {e}", exc_info=True)
         raise RuntimeError(f"Evidence upload failed: {str(e)}") from e
 
+    return [_evidence_result(row) for row in rows]
+
+
+def bundle_index(bundle_bytes: bytes) -> Dict[str, str]:
+    """
+    Member name → SHA256 of an evidence bundle (engine ``_bundle`` format).
+
+    Raises:
+        ValueError: Not a zip file
+    """
+    try:
+        with zipfile.ZipFile(io.BytesIO(bundle_bytes)) as zf:
+            return {
+                info.filename: info.comment.decode("ascii").removeprefix("sha256:")
+                for info in zf.infolist()
+            }
+    except zipfile.BadZipFile as e:
+        raise ValueError(f"Invalid evidence bundle: {e}") from e
+
+
+async def upload_evidence_bundle(quote_id: str, bundle_bytes: bytes) -> dict:
+    """
+    Upload a quote's single-file evidence bundle as one object.
+
+    The bundle covers every FIX-4 stage, so it is recorded under its own
+    ``bundle`` stage with its member index (name → SHA256) in ``meta``; any
+    member can later be checked without re-uploading it separately.
+
+    Returns:
+        dict: {path, sha256, quote_id, stage, id, members}
+
+    Raises:
+        ValueError: Not a zip file
+        RuntimeError: Upload or DB insert failure
+    """
+    members = bundle_index(bundle_bytes)
+    result = await upload_evidence(
+        quote_id, "bundle", bundle_bytes, "zip", meta={"kind": "bundle", "members": members}
+    )
+    return {**result, "members": len(members)}
+
 
 def create_signed_url(path: str, ttl: int = 600) -> str:
     """
@@ -184,9 +407,8 @@ async def verify_evidence_integrity(quote_id: str, stage: str) -> dict:
 
             path, stored_hash = row
 
-        # Download file from storage and compute hash
-        file_bytes = storage_client.download_file(path)
-        computed_hash = hashlib.sha256(file_bytes).hexdigest()
+        # Hash a streamed download (constant memory, off the event loop)
+        computed_hash = await asyncio.to_thread(_hash_download, path)
 
         # Compare hashes
         valid = stored_hash == computed_hash
@@ -210,6 +432,169 @@ async def verify_evidence_integrity(quote_id: str, stage: str) -> dict:
         logger.error(f"Evidence verification failed: {e}", exc_info=True)
         raise RuntimeError(f"Verification failed: {str(e)}") from e
 
+
+def _hash_download(path: str) -> str:
+    """SHA256 of a stored object, hashed from a streamed download."""
+    computed_hash, _ = hash_stream(storage_client.download_stream(path, EVIDENCE_CHUNK_SIZE))
+    return computed_hash
+
+
+async def _verify_blob(blob: Dict[str, Any], use_cache: bool) -> Dict[str, Any]:
+    """
+    Verify one evidence blob, skipping the download when the cache covers it.
+
+    The cache (``object_version``/``verified_sha256`` joined from
+    evidence_verifications) covers the blob when it was verified against the
+    same object version (ETag, else last-modified) and the same recorded
+    SHA256.
+    """
+    stat = await asyncio.to_thread(storage_client.stat, blob["path"])
+    version = stat.get("etag") or stat.get("last_modified")
+    if use_cache:
+        hit = (
+            version is not None
+            and blob["object_version"] == version
+            and blob["verified_sha256"] == blob["sha256"]
+        )
+        record_cache("evidence_verification", hit)
+        if hit:
+            return {"status": "cached"}
+
+    computed_hash = await asyncio.to_thread(_hash_download, blob["path"])
+    if computed_hash != blob["sha256"]:
+        logger.warning(
+            f"Evidence integrity check FAILED: {blob['path']} "
+            f"(stored={blob['sha256'][:8]}..., computed={computed_hash[:8]}...)"
+        )
+        return {"status": "mismatch", "computed_hash": computed_hash}
+    return {"status": "verified", "object_version": version}
+
+
+async def verify_evidence_bulk(
+    page_size: int = 500,
+    concurrency: Optional[int] = None,
+    use_cache: bool = True,
+) -> dict:
+    """
+    Verify every evidence blob (nightly audit).
+
+    Scans estimator.evidence_blobs in keyset-paginated pages (by id) and
+    verifies each page with bounded concurrency. Successful checks are
+    recorded in estimator.evidence_verifications with the object's storage
+    version, so a later run only re-downloads objects whose ETag (or
+    last-modified) changed since they were last verified.
+
+    Args:
+        page_size: Blobs per page
+        concurrency: Blobs verified at once (default: EVIDENCE_VERIFY_CONCURRENCY)
+        use_cache: False re-downloads every object (cache is still refreshed)
+
+    Returns:
+        dict: {checked, verified, cached, mismatched: [...], errors: [...]}
+    """
+    semaphore = asyncio.Semaphore(concurrency or config.EVIDENCE_VERIFY_CONCURRENCY)
+    summary: Dict[str, Any] = {
+        "checked": 0,
+        "verified": 0,
+        "cached": 0,
+        "mismatched": [],
+        "errors": [],
+    }
+
+    async def check(blob: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            try:
+                return await _verify_blob(blob, use_cache)
+            except Exception as e:
+                logger.error(f"Evidence verification failed for {blob['path']}: {e}")
+                return {"status": "error", "error": str(e)}
+
+    after = None
+    while True:
+        async with AsyncSessionLocal() as session:
+            result = await session.execute(
+                text(
+                    """
+                    SELECT b.id, b.quote_id, b.stage, b.path, b.sha256,
+                           v.object_version, v.sha256 AS verified_sha256
+                    FROM estimator.evidence_blobs b
+                    LEFT JOIN estimator.evidence_verifications v ON v.blob_id = b.id
+                    WHERE (CAST(:after AS uuid) IS NULL OR b.id > CAST(:after AS uuid))
+                    ORDER BY b.id
+                    LIMIT :page_size
+                    """
+                ),
+                {"after": after, "page_size": page_size},
+            )
+            page = [dict(row._mapping) for row in result.fetchall()]
+        if not page:
+            break
+
+        outcomes = await asyncio.gather(*(check(blob) for blob in page))
+
+        verified = []
+        for blob, outcome in zip(page, outcomes):
+            status = outcome["status"]
+            report = {"id": str(blob["id"]), "path": blob["path"]}
+            if status == "mismatch":
+                summary["mismatched"].append(
+                    {**report, "stored_hash": blob["sha256"], "computed_hash": outcome["computed_hash"]}
+                )
+            elif status == "error":
+                summary["errors"].append({**report, "error": outcome["error"]})
+            else:
+                summary[status] += 1
+                if status == "verified" and outcome["object_version"] is not None:
+                    verified.append((blob, outcome["object_version"]))
+        summary["checked"] += len(page)
+
+        if verified:
+            await _record_verifications(verified)
+        after = str(page[-1]["id"])
+        logger.info(
+            f"Evidence audit progress: {summary['checked']} checked, "
+            f"{summary['cached']} cached, {len(summary['mismatched'])} mismatched"
+        )
+
+    logger.info(
+        f"Evidence audit finished: {summary['checked']} checked, {summary['verified']} verified, "
+        f"{summary['cached']} cached, {len(summary['mismatched'])} mismatched, "
+        f"{len(summary['errors'])} errors"
+    )
+    return summary
+
+
+async def _record_verifications(verified: List[Tuple[Dict[str, Any], str]]) -> None:
+    """Upsert verification cache rows for one page in a single statement."""
+    values = []
+    params: Dict[str, Any] = {}
+    for i, (blob, version) in enumerate(verified):
+        values.append(f"(:blob_id_{i}, :object_version_{i}, :sha256_{i}, (now() AT TIME ZONE 'utc'))")
+        params[f"blob_id_{i}"] = blob["id"]
+        params[f"object_version_{i}"] = version
+        params[f"sha256_{i}"] = blob["sha256"]
+
+    async with AsyncSessionLocal() as session:
+        await session.execute(
+            text(
+                """
+                INSERT INTO estimator.evidence_verifications
+                    (blob_id, object_version, sha256, verified_at)
+                VALUES
+                """
+                + ",\n".join(values)
+                + """
+                ON CONFLICT (blob_id) DO UPDATE SET
+                    object_version = EXCLUDED.object_version,
+                    sha256 = EXCLUDED.sha256,
+                    verified_at = EXCLUDED.verified_at
+                """
+            ),
+            params,
+        )
+        await session.commit()
+
+
 async def format_estimate(quote_data: dict) -> dict:
     """
     Format estimate with formula preservation
@@ -273,95 +658,59 @@ async def export_pdf_xlsx(quote_id: str, quote_data: dict) -> dict:
     Export estimate to PDF and XLSX formats
 
     Pipeline:
-    1. XLSX: Load template → Bind data → Save with formulas preserved
-    2. PDF: Render HTML template → Convert to PDF
-    3. Calculate SHA256 for each
-    4. Upload to Storage
-    5. Insert to DB (documents + evidence_blobs)
+    1. Render HTML template → PDF and XLSX concurrently in the worker pool
+    2. Calculate SHA256 for each
+    3. Upload both to Storage concurrently
+    4. Insert both evidence_blobs rows in one statement
 
     Returns:
         dict: {pdf: {path, sha256}, xlsx: {path, sha256}}
-    """
-    import json
-
-    # Stub: Generate documents
-    pdf_bytes = b"PDF_CONTENT_PLACEHOLDER"
-    xlsx_bytes = b"XLSX_CONTENT_PLACEHOLDER"
 
-    # Upload PDF
-    pdf_result = await upload_evidence(quote_id, "format", pdf_bytes, "pdf")
-
-    # Upload XLSX
-    xlsx_result = await upload_evidence(quote_id, "format", xlsx_bytes, "xlsx")
+    Raises:
+        RuntimeError: Rendering or upload failure
+    """
+    docs = await get_renderer().render(quote_id, quote_data)
+
+    pdf_result, xlsx_result = await upload_evidence_batch(
+        quote_id,
+        [
+            {"stage": "format", "file_bytes": docs["pdf"], "ext": "pdf"},
+            {"stage": "format", "file_bytes": docs["xlsx"], "ext": "xlsx"},
+        ],
+    )
 
     return {"pdf": pdf_result, "xlsx": xlsx_result}
-=======
-Document Service
-Document generation and formatting logic
-"""
-
-import logging
-from typing import Any, Dict, Optional
-
-from api.integrations.mcp_client import MCPGatewayClient
-
-logger = logging.getLogger(__name__)
-
-class DocumentService:
-    """Service for document generation"""
-
-    def __init__(self):
-        self.mcp_client = MCPGatewayClient()
-
-    async def initialize(self):
-        """Initialize service"""
-        logger.info("Initializing DocumentService...")
-        await self.mcp_client.connect()
 
-    async def cleanup(self):
-        """Cleanup service"""
-        logger.info("Cleaning up DocumentService...")
-        await self.mcp_client.disconnect()
 
-    async def generate_pdf(self, quote_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate PDF document"""
-        return await self.mcp_client.call_tool(
-            "estimate.export",
-            {"format": "pdf", "data": quote_data}
-        )
-
-    async def generate_excel(self, quote_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate Excel document"""
-        return await self.mcp_client.call_tool(
-            "estimate.export",
-            {"format": "xlsx", "data": quote_data}
-        )
+async def export_pdf_xlsx_batch(
+    quotes: List[Dict[str, Any]], concurrency: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Export PDF/XLSX for many quotes (e.g. month-end re-issue).
 
-    async def generate_cover(self, customer: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate document cover"""
-        return await self.mcp_client.call_tool(
-            "doc.cover_generate",
-            {"customer": customer}
-        )
+    Quotes render with bounded concurrency on the shared worker pool; a
+    failing quote is reported in its result instead of aborting the batch.
 
-    async def apply_branding(self, document: Dict[str, Any]) -> Dict[str, Any]:
-        """Apply company branding"""
-        return await self.mcp_client.call_tool(
-            "doc.apply_branding",
-            {"document": document}
-        )
+    Args:
+        quotes: [{"quote_id": str, "quote_data": dict}, ...]
+        concurrency: Quotes in flight at once (default: 2 × RENDER_WORKERS)
 
-    async def lint_document(self, document: Dict[str, Any]) -> Dict[str, Any]:
-        """Validate document quality"""
-        result = await self.mcp_client.call_tool(
-            "doc.lint",
-            {"document": document}
-        )
-        
-        if result.get("errors", 0) > 0:
-            raise ValueError(f"Document lint errors: {result.get('errors')}")
-        
-        return result
-
-document_service = DocumentService()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
+    Returns:
+        list: {quote_id, pdf, xlsx} or {quote_id, error} per quote, in order
+    """
+    semaphore = asyncio.Semaphore(concurrency or 2 * config.RENDER_WORKERS)
+
+    async def export_one(quote: Dict[str, Any]) -> Dict[str, Any]:
+        quote_id = quote["quote_id"]
+        async with semaphore:
+            try:
+                result = await export_pdf_xlsx(quote_id, quote["quote_data"])
+            except RuntimeError as e:
+                logger.error(f"Batch export failed for quote {quote_id}: {e}")
+                return {"quote_id": quote_id, "error": str(e)}
+        return {"quote_id": quote_id, **result}
+
+    results = await asyncio.gather(*(export_one(quote) for quote in quotes))
+    failed = sum(1 for r in results if "error" in r)
+    logger.info(f"Batch export finished: {len(results) - failed} ok, {failed} failed")
+    return results
@@ -1,5 +1,4 @@
 """
-<<<<<<< HEAD
 Estimate Service - FIX-4 Pipeline Orchestration
 Enclosure → Breaker → Critic → Format → Cover → Lint
 """
@@ -7,35 +6,109 @@ import asyncio
 import json
 import logging
 import uuid
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Callable, Dict, Optional
 
-from api.services import enclosure_service, layout_service, document_service
+from api.config import config
+from api.integrations.mcp_client import mcp_client
+from api.integrations.mcp_planner import MCPCallPlan
+from api.metrics import stage_timer
+from api.profiling import ProfileCapture, profile_call
+from api.services import document_service
 
 logger = logging.getLogger(__name__)
 
-
-async def create_quote(payload: dict, sse_queue: asyncio.Queue = None) -> dict:
+# Quality gates: plan node -> (gate name, predicate on the node's result)
+GATES: Dict[str, tuple] = {
+    "enclosure": ("enclosure_fit", lambda r: r.get("fit_score", 0) >= 0.90),
+    "phase_balance": ("phase_balance", lambda r: r.get("imbalance", 1.0) <= 0.03),
+    "clearance": ("clearance", lambda r: r.get("violations", 0) == 0),
+    "format": ("formula_preservation", lambda r: r.get("formula_preserved", 0) >= 1.0),
+    "lint": ("lint", lambda r: r.get("errors", 0) == 0),
+    "policy": ("policy", lambda r: r.get("violations", 0) == 0),
+}
+
+# SSE stage reported when a plan call completes
+PROGRESS_STAGES = {
+    "enclosure.solve": "enclosure",
+    "layout.place_breakers": "layout",
+    "layout.balance_phases": "layout",
+    "layout.check_clearance": "layout",
+    "estimate.format": "format",
+    "doc.cover_generate": "cover",
+    "doc.apply_branding": "cover",
+    "doc.lint": "lint",
+    "doc.policy_check": "lint",
+}
+
+
+async def create_quote(
+    payload: dict,
+    sse_queue: asyncio.Queue = None,
+    profile: Optional[str] = None,
+) -> dict:
     """
     Create quote with FIX-4 pipeline execution
 
     Pipeline stages (with progress %):
     - 10%: INPUT_NORMALIZED
-    - 25%: ENCLOSURE_OK (fit_score >= 0.90)
-    - 45%: LAYOUT_OK (clearance + phase_dev <= 0.03)
-    - 70%: FORMAT_OK (formula_loss = 0)
-    - 85%: COVER_LINT_OK (lint_errors = 0)
+    - 10-85%: one event per completed MCP tool call (enclosure, layout,
+      format, cover, lint); the calls run as one MCPCallPlan and any failed
+      gate (see ``GATES``) cancels the rest
+    - 95%: EXPORT (PDF/XLSX evidence)
     - 100%: DONE
 
+    A profile of the call is stored as "profile" evidence when requested
+    (``profile`` = "cprofile"/"sample", from the X-Profile header) or when
+    the call runs longer than PROFILE_THRESHOLD_MS.
+
     Args:
         payload: Estimate request data
         sse_queue: Queue for SSE progress events (optional)
+        profile: Profiling mode requested by the caller (optional)
 
     Returns:
         dict: {quoteId, evidence, totals, gates}
     """
     quote_id = str(uuid.uuid4())
+    capture = None
+    try:
+        async with profile_call(
+            profile,
+            threshold_ms=config.PROFILE_THRESHOLD_MS,
+            interval_ms=config.PROFILE_SAMPLE_INTERVAL_MS,
+        ) as capture:
+            result = await _run_quote(quote_id, payload, sse_queue)
+    except Exception:
+        # A failed run's profile is still evidence; the failure is re-raised
+        await _store_profile(quote_id, capture)
+        raise
+
+    profile_evidence = await _store_profile(quote_id, capture)
+    if profile_evidence is not None:
+        result["evidence"]["profile"] = profile_evidence
+    return result
+
+
+async def _store_profile(quote_id: str, capture: Optional[ProfileCapture]) -> Optional[dict]:
+    """Upload a captured profile as evidence; failures are logged, never raised."""
+    if capture is None or capture.artifact is None:
+        return None
+    artifact = capture.artifact
+    try:
+        results = await document_service.upload_evidence_batch(quote_id, [artifact])
+    except Exception as e:
+        logger.warning(f"Failed to store profile for quote {quote_id}: {e}")
+        return None
+    logger.info(
+        f"Stored {artifact['meta']['mode']} profile for quote {quote_id} "
+        f"({artifact['meta']['elapsed_ms']:.0f} ms, trigger={artifact['meta']['trigger']})"
+    )
+    return results[0]
+
+
+async def _run_quote(quote_id: str, payload: dict, sse_queue: Optional[asyncio.Queue]) -> dict:
+    """Run the FIX-4 stages for ``create_quote``."""
     evidence = {"stages": {}}
-    gates = {}
 
     async def emit_progress(stage: str, progress: float, status: str = "in_progress", metrics: dict = None):
         """Emit SSE progress event"""
@@ -51,71 +124,35 @@ async def create_quote(payload: dict, sse_queue: asyncio.Queue = None) -> dict:
 
     try:
         # Stage 1: INPUT_NORMALIZED (10%)
-        await emit_progress("input", 0.10, "in_progress")
-        # Validation would happen here
-        await asyncio.sleep(0.1)  # Simulate work
+        with stage_timer("input"):
+            await emit_progress("input", 0.10, "in_progress")
+            # Validation would happen here
+            await asyncio.sleep(0.1)  # Simulate work
+
+        # Stages 2-5: MCP tool calls (10% → 85%), independent calls overlap
+        plan = _build_pipeline_plan(payload)
+        completed = 0
+
+        async def call_tool(tool: str, params: Dict[str, Any]) -> Dict[str, Any]:
+            nonlocal completed
+            result = await mcp_client.call_tool(tool, params)
+            completed += 1
+            await emit_progress(
+                PROGRESS_STAGES[tool], 0.10 + 0.75 * completed / len(plan.calls), "completed", {"tool": tool}
+            )
+            return result
 
-        # Stage 2: ENCLOSURE (25%)
         await emit_progress("enclosure", 0.15, "in_progress")
-        enclosure_result = await enclosure_service.solve(
-            payload["panels"][0].get("breakers", []),
-            payload["panels"][0].get("materials", [])
-        )
-        fit_score = enclosure_result["fit_score"]
-        gates["enclosure_fit"] = fit_score >= 0.90
-
-        evidence["stages"]["enclosure"] = {
-            "fit_score": fit_score,
-            "sku": enclosure_result["enclosure_sku"],
-            "gate_pass": gates["enclosure_fit"],
-        }
-        await emit_progress("enclosure", 0.25, "completed", {"fit_score": fit_score})
-
-        # Stage 3: LAYOUT (45%)
-        await emit_progress("layout", 0.30, "in_progress")
-        layout_result = await layout_service.place_breakers(
-            payload["panels"][0].get("breakers", []),
-            {"width": 800, "height": 600}
-        )
-        phase_result = await layout_service.balance_phases(layout_result["layout"])
-        phase_dev = phase_result["phase_dev"]
-        gates["phase_balance"] = phase_dev <= 0.03
-        gates["clearance"] = layout_result["clearance_ok"]
-
-        evidence["stages"]["breaker"] = {
-            "phase_dev": phase_dev,
-            "clearance_ok": layout_result["clearance_ok"],
-            "gate_pass": gates["phase_balance"] and gates["clearance"],
-        }
-        await emit_progress("layout", 0.45, "completed", {"phase_dev": phase_dev})
-
-        # Stage 4: FORMAT (70%)
-        await emit_progress("format", 0.55, "in_progress")
-        format_result = await document_service.format_estimate(payload)
-        gates["formula_preservation"] = format_result["formula_loss"] == 0
-
-        evidence["stages"]["format"] = {
-            "formula_loss": format_result["formula_loss"],
-            "gate_pass": gates["formula_preservation"],
-        }
-        await emit_progress("format", 0.70, "completed", {"formula_loss": 0})
-
-        # Stage 5: COVER & LINT (85%)
-        await emit_progress("cover", 0.75, "in_progress")
-        cover_result = await document_service.generate_cover(payload["customer"], quote_id)
-        lint_result = await document_service.lint_document({})
-        gates["cover_branding"] = cover_result["policy_violations"] == 0
-        gates["lint"] = lint_result["errors"] == 0
-
-        evidence["stages"]["cover"] = cover_result
-        evidence["stages"]["lint"] = lint_result
-        await emit_progress("cover", 0.85, "completed", {"lint_errors": 0})
+        results = await plan.run(call_tool)
+        evidence["stages"] = _record_pipeline_evidence(plan, results)
+        gates = {name: passes(results[node]) for node, (name, passes) in GATES.items()}
 
         # Stage 6: EXPORT (95%)
-        await emit_progress("export", 0.90, "in_progress")
-        export_result = await document_service.export_pdf_xlsx(quote_id, payload)
-        evidence["documents"] = export_result
-        await emit_progress("export", 0.95, "completed")
+        with stage_timer("export"):
+            await emit_progress("export", 0.90, "in_progress")
+            export_result = await document_service.export_pdf_xlsx(quote_id, payload)
+            evidence["documents"] = export_result
+            await emit_progress("export", 0.95, "completed")
 
         # DONE (100%)
         await emit_progress("done", 1.0, "completed")
@@ -146,6 +183,117 @@ async def create_quote(payload: dict, sse_queue: asyncio.Queue = None) -> dict:
         raise
 
 
+def _gate_check(node: str) -> Callable[[Dict[str, Any]], None]:
+    """Plan ``check`` failing the quote when ``node``'s gate does not pass."""
+    name, passes = GATES[node]
+
+    def check(result: Dict[str, Any]) -> None:
+        if not passes(result):
+            raise ValueError(f"Quality gate '{name}' failed: {result}")
+
+    return check
+
+
+def _build_pipeline_plan(payload: dict) -> MCPCallPlan:
+    """
+    FIX-4 tool calls and their dependencies
+
+    enclosure.solve -> layout.place_breakers -> {layout.balance_phases,
+    layout.check_clearance, estimate.format}; doc.cover_generate waits
+    for the format and both placement checks, then doc.apply_branding
+    -> {doc.lint, doc.policy_check}.
+
+    estimate.format only needs the enclosure and placement, so it runs
+    alongside the placement checks; nothing after it starts unless they
+    pass. A failed gate cancels every call still pending or running.
+    """
+    panels = payload["panels"]
+    breakers = [breaker for panel in panels for breaker in panel.get("breakers", [])]
+
+    plan = MCPCallPlan(max_concurrency=config.MCP_PLAN_CONCURRENCY)
+    plan.add(
+        "enclosure", "enclosure.solve",
+        {"panels": panels},
+        check=_gate_check("enclosure"), stage="enclosure"
+    )
+    plan.add(
+        "placement", "layout.place_breakers",
+        lambda r: {"breakers": breakers, "enclosure": r["enclosure"]},
+        after=["enclosure"], stage="breaker_placement"
+    )
+    plan.add(
+        "phase_balance", "layout.balance_phases",
+        lambda r: {"placement": r["placement"]},
+        after=["placement"], check=_gate_check("phase_balance"), stage="phase_balance"
+    )
+    plan.add(
+        "clearance", "layout.check_clearance",
+        lambda r: {"placement": r["placement"]},
+        after=["placement"], check=_gate_check("clearance"), stage="critic_validation"
+    )
+    plan.add(
+        "format", "estimate.format",
+        lambda r: {"request": payload, "enclosure": r["enclosure"], "placement": r["placement"]},
+        after=["enclosure", "placement"], check=_gate_check("format"), stage="format_generation"
+    )
+    plan.add(
+        "cover", "doc.cover_generate",
+        lambda r: {"customer": payload["customer"], "format": r["format"]},
+        after=["format", "phase_balance", "clearance"], stage="cover_generation"
+    )
+    plan.add(
+        "branding", "doc.apply_branding",
+        lambda r: {"document": r["cover"]},
+        after=["cover"], stage="branding"
+    )
+    plan.add(
+        "lint", "doc.lint",
+        lambda r: {"document": r["branding"]},
+        after=["branding"], check=_gate_check("lint"), stage="document_lint"
+    )
+    plan.add(
+        "policy", "doc.policy_check",
+        lambda r: {"document": r["branding"]},
+        after=["branding"], check=_gate_check("policy"), stage="policy_check"
+    )
+    return plan
+
+
+def _record_pipeline_evidence(plan: MCPCallPlan, results: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Stage evidence in pipeline order (independent of completion order)"""
+    done = plan.completed_at
+    return {
+        "enclosure": {
+            "fit_score": results["enclosure"].get("fit_score"),
+            "sku": results["enclosure"].get("sku"),
+            "timestamp": done["enclosure"],
+        },
+        "breaker": {
+            "placement": results["placement"],
+            "phase_dev": results["phase_balance"].get("imbalance"),
+            "timestamp": max(done["placement"], done["phase_balance"]),
+        },
+        "critic": {
+            "violations": results["clearance"].get("violations"),
+            "timestamp": done["clearance"],
+        },
+        "format": {
+            "formula_preserved": results["format"].get("formula_preserved"),
+            "timestamp": done["format"],
+        },
+        "cover": {
+            "cover": results["cover"],
+            "branding": results["branding"],
+            "timestamp": done["branding"],
+        },
+        "lint": {
+            "lint": results["lint"],
+            "policy": results["policy"],
+            "timestamp": max(done["lint"], done["policy"]),
+        },
+    }
+
+
 async def generate_sse_events(quote_id: str, payload: dict) -> AsyncGenerator:
     """
     Generate SSE events for estimate progress
@@ -200,388 +348,3 @@ async def generate_sse_events(quote_id: str, payload: dict) -> AsyncGenerator:
         logger.error(f"SSE stream error: {e}")
         seq += 1
         yield f'event: ERROR\ndata: {{"meta": {{"seq": {seq}}}, "error": "{str(e)}"}}\n\n'
-=======
-Estimate Service
-Core business logic for estimate generation with FIX-4 pipeline
-"""
-
-import asyncio
-import hashlib
-import json
-import logging
-import uuid
-from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
-
-from pydantic import BaseModel
-
-from api.integrations.mcp_client import MCPGatewayClient
-from api.services.enclosure_service import EnclosureService
-from api.services.layout_service import LayoutService
-from api.services.document_service import DocumentService
-
-logger = logging.getLogger(__name__)
-
-class EstimateRequest(BaseModel):
-    """Estimate request model"""
-    customer: Dict[str, Any]
-    items: List[Dict[str, Any]]
-    panels: List[Dict[str, Any]]
-    currency: str = "KRW"
-    locale: str = "ko-KR"
-
-class EstimateResponse(BaseModel):
-    """Estimate response model"""
-    id: str
-    status: str
-    customer: Dict[str, Any]
-    totals: Dict[str, float]
-    currency: str
-    created_at: str
-    updated_at: str
-    evidence_sha: str
-    evidence_url: Optional[str] = None
-
-class EstimateService:
-    """Service for handling estimate operations"""
-
-    def __init__(self):
-        self.mcp_client = MCPGatewayClient()
-        self.enclosure_service = EnclosureService()
-        self.layout_service = LayoutService()
-        self.document_service = DocumentService()
-        self.estimates_cache = {}  # Simplified cache - use Redis in production
-
-    async def initialize(self):
-        """Initialize service resources"""
-        logger.info("Initializing EstimateService...")
-        await self.mcp_client.connect()
-
-    async def cleanup(self):
-        """Cleanup service resources"""
-        logger.info("Cleaning up EstimateService...")
-        await self.mcp_client.disconnect()
-
-    async def create_estimate(
-        self,
-        request: EstimateRequest,
-        idempotency_key: Optional[str] = None
-    ) -> EstimateResponse:
-        """
-        Create an estimate using FIX-4 pipeline
-
-        Pipeline stages:
-        1. Enclosure solving (fit_score >= 0.90)
-        2. Breaker placement (phase balance <= 3%)
-        3. Format generation
-        4. Cover generation
-        5. Document lint
-        """
-        # Check idempotency
-        if idempotency_key and idempotency_key in self.estimates_cache:
-            logger.info(f"Returning cached estimate for idempotency key: {idempotency_key}")
-            return self.estimates_cache[idempotency_key]
-
-        estimate_id = str(uuid.uuid4())
-        evidence_data = {
-            "estimate_id": estimate_id,
-            "request": request.dict(),
-            "pipeline_stages": []
-        }
-
-        try:
-            # Stage 1: Enclosure solving
-            logger.info(f"Stage 1: Solving enclosure for estimate {estimate_id}")
-            enclosure_result = await self._solve_enclosure(request.panels, evidence_data)
-
-            # Stage 2: Breaker placement
-            logger.info(f"Stage 2: Placing breakers for estimate {estimate_id}")
-            placement_result = await self._place_breakers(
-                request.panels,
-                enclosure_result,
-                evidence_data
-            )
-
-            # Stage 2.1: Critic validation
-            logger.info(f"Stage 2.1: Validating placement for estimate {estimate_id}")
-            critic_result = await self._validate_placement(placement_result, evidence_data)
-
-            # Stage 3: Format generation
-            logger.info(f"Stage 3: Generating format for estimate {estimate_id}")
-            format_result = await self._generate_format(
-                request,
-                enclosure_result,
-                placement_result,
-                evidence_data
-            )
-
-            # Stage 4: Cover generation
-            logger.info(f"Stage 4: Generating cover for estimate {estimate_id}")
-            cover_result = await self._generate_cover(request, format_result, evidence_data)
-
-            # Stage 5: Document lint
-            logger.info(f"Stage 5: Linting document for estimate {estimate_id}")
-            lint_result = await self._lint_document(cover_result, evidence_data)
-
-            # Calculate totals
-            totals = self._calculate_totals(request.items, request.panels)
-
-            # Generate evidence hash
-            evidence_sha = self._generate_evidence_hash(evidence_data)
-
-            # Create response
-            response = EstimateResponse(
-                id=estimate_id,
-                status="completed",
-                customer=request.customer,
-                totals=totals,
-                currency=request.currency,
-                created_at=datetime.now(timezone.utc).isoformat(),
-                updated_at=datetime.now(timezone.utc).isoformat(),
-                evidence_sha=evidence_sha,
-                evidence_url=f"/evidence/{estimate_id}"
-            )
-
-            # Cache if idempotency key provided
-            if idempotency_key:
-                self.estimates_cache[idempotency_key] = response
-
-            return response
-
-        except Exception as e:
-            logger.error(f"Error creating estimate {estimate_id}: {e}")
-            raise
-
-    async def _solve_enclosure(
-        self,
-        panels: List[Dict[str, Any]],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 1: Solve enclosure with fit_score >= 0.90"""
-        result = await self.mcp_client.call_tool(
-            "enclosure.solve",
-            {"panels": panels}
-        )
-
-        # Validate fit score
-        if result.get("fit_score", 0) < 0.90:
-            raise ValueError(f"Enclosure fit_score {result.get('fit_score')} < 0.90")
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "enclosure",
-            "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return result
-
-    async def _place_breakers(
-        self,
-        panels: List[Dict[str, Any]],
-        enclosure_result: Dict[str, Any],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 2: Place breakers with phase balance <= 3%"""
-        breakers = []
-        for panel in panels:
-            breakers.extend(panel.get("breakers", []))
-
-        result = await self.mcp_client.call_tool(
-            "layout.place_breakers",
-            {
-                "breakers": breakers,
-                "enclosure": enclosure_result
-            }
-        )
-
-        # Check phase balance
-        phase_balance = await self.mcp_client.call_tool(
-            "layout.balance_phases",
-            {"placement": result}
-        )
-
-        if phase_balance.get("imbalance", 1.0) > 0.03:
-            raise ValueError(f"Phase imbalance {phase_balance.get('imbalance')} > 3%")
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "breaker_placement",
-            "result": result,
-            "phase_balance": phase_balance,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return result
-
-    async def _validate_placement(
-        self,
-        placement_result: Dict[str, Any],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 2.1: Validate placement with critic"""
-        result = await self.mcp_client.call_tool(
-            "layout.check_clearance",
-            {"placement": placement_result}
-        )
-
-        if result.get("violations", 0) > 0:
-            raise ValueError(f"Clearance violations: {result.get('violations')}")
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "critic_validation",
-            "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return result
-
-    async def _generate_format(
-        self,
-        request: EstimateRequest,
-        enclosure_result: Dict[str, Any],
-        placement_result: Dict[str, Any],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 3: Generate format with formula preservation"""
-        result = await self.mcp_client.call_tool(
-            "estimate.format",
-            {
-                "request": request.dict(),
-                "enclosure": enclosure_result,
-                "placement": placement_result
-            }
-        )
-
-        # Verify formula preservation
-        if result.get("formula_preserved", 0) < 1.0:
-            raise ValueError("Formula preservation failed")
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "format_generation",
-            "result": result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return result
-
-    async def _generate_cover(
-        self,
-        request: EstimateRequest,
-        format_result: Dict[str, Any],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 4: Generate cover with branding"""
-        result = await self.mcp_client.call_tool(
-            "doc.cover_generate",
-            {
-                "customer": request.customer,
-                "format": format_result
-            }
-        )
-
-        # Apply branding
-        branded_result = await self.mcp_client.call_tool(
-            "doc.apply_branding",
-            {"document": result}
-        )
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "cover_generation",
-            "result": branded_result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return branded_result
-
-    async def _lint_document(
-        self,
-        document_result: Dict[str, Any],
-        evidence_data: Dict[str, Any]
-    ) -> Dict[str, Any]:
-        """Stage 5: Lint document with zero errors"""
-        result = await self.mcp_client.call_tool(
-            "doc.lint",
-            {"document": document_result}
-        )
-
-        if result.get("errors", 0) > 0:
-            raise ValueError(f"Document lint errors: {result.get('errors')}")
-
-        # Policy check
-        policy_result = await self.mcp_client.call_tool(
-            "doc.policy_check",
-            {"document": document_result}
-        )
-
-        if policy_result.get("violations", 0) > 0:
-            raise ValueError(f"Policy violations: {policy_result.get('violations')}")
-
-        evidence_data["pipeline_stages"].append({
-            "stage": "document_lint",
-            "result": result,
-            "policy": policy_result,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        })
-
-        return result
-
-    def _calculate_totals(
-        self,
-        items: List[Dict[str, Any]],
-        panels: List[Dict[str, Any]]
-    ) -> Dict[str, float]:
-        """Calculate estimate totals"""
-        subtotal = 0.0
-
-        # Calculate items total
-        for item in items:
-            qty = item.get("quantity", 0)
-            unit_price = item.get("unitPrice", 0)
-            subtotal += qty * unit_price
-
-        # Calculate panels/breakers total
-        for panel in panels:
-            for breaker in panel.get("breakers", []):
-                qty = breaker.get("quantity", 0)
-                # Simplified pricing - use catalog in production
-                unit_price = breaker.get("capacity", 0) * 1000  # Price per amp
-                subtotal += qty * unit_price
-
-        tax = subtotal * 0.1  # 10% tax
-        total = subtotal + tax
-
-        return {
-            "subtotal": subtotal,
-            "tax": tax,
-            "total": total
-        }
-
-    def _generate_evidence_hash(self, evidence_data: Dict[str, Any]) -> str:
-        """Generate SHA256 hash for evidence"""
-        json_str = json.dumps(evidence_data, sort_keys=True, ensure_ascii=False)
-        return hashlib.sha256(json_str.encode()).hexdigest()
-
-    async def stream_estimate_progress(self, estimate_id: str):
-        """Stream estimate generation progress via SSE"""
-        async def event_generator():
-            stages = [
-                "Solving enclosure...",
-                "Placing breakers...",
-                "Validating placement...",
-                "Generating format...",
-                "Creating cover...",
-                "Linting document...",
-                "Complete!"
-            ]
-
-            for i, stage in enumerate(stages):
-                # Heartbeat with metadata
-                yield f"data: {json.dumps({'stage': stage, 'progress': i/len(stages), 'meta': {'seq': i}})}\n\n"
-                await asyncio.sleep(1)  # Simulate processing
-
-            yield f"data: {json.dumps({'complete': True, 'estimateId': estimate_id})}\n\n"
-
-        return event_generator()
-
-# Singleton instance
-estimate_service = EstimateService()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
@@ -1,4 +1,3 @@
-<<<<<<< HEAD
 """RAG Service - Document ingestion and retrieval (stub)"""
 import logging
 
@@ -15,67 +14,3 @@ async def normalize(text: str) -> str:
 async def verify(doc_id: str) -> bool:
     """Verify document indexed successfully"""
     return True
-=======
-"""
-RAG Service
-Retrieval-Augmented Generation for knowledge management
-"""
-
-import logging
-from typing import Any, Dict, List
-
-from api.integrations.mcp_client import MCPGatewayClient
-
-logger = logging.getLogger(__name__)
-
-class RAGService:
-    """Service for RAG operations"""
-
-    def __init__(self):
-        self.mcp_client = MCPGatewayClient()
-
-    async def initialize(self):
-        """Initialize service"""
-        logger.info("Initializing RAGService...")
-        await self.mcp_client.connect()
-
-    async def cleanup(self):
-        """Cleanup service"""
-        logger.info("Cleaning up RAGService...")
-        await self.mcp_client.disconnect()
-
-    async def ingest_documents(self, documents: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Ingest documents into knowledge base"""
-        return await self.mcp_client.call_tool(
-            "rag.ingest",
-            {"documents": documents}
-        )
-
-    async def normalize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Normalize data for indexing"""
-        return await self.mcp_client.call_tool(
-            "rag.normalize",
-            {"data": data}
-        )
-
-    async def index_content(self, content: Dict[str, Any]) -> Dict[str, Any]:
-        """Index content for retrieval"""
-        return await self.mcp_client.call_tool(
-            "rag.index",
-            {"content": content}
-        )
-
-    async def verify_citations(self, document: Dict[str, Any]) -> Dict[str, Any]:
-        """Verify citation coverage"""
-        result = await self.mcp_client.call_tool(
-            "rag.verify",
-            {"document": document}
-        )
-        
-        if result.get("citation_coverage", 0) < 1.0:
-            raise ValueError(f"Citation coverage {result.get('citation_coverage')} < 100%")
-        
-        return result
-
-rag_service = RAGService()
->>>>>>> b21feef637c13ecc0be617bfd6c88f47155d8b0e
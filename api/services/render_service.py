@@ -0,0 +1,215 @@
+"""
+Render Service - PDF/XLSX document rendering
+Pre-compiled Jinja2 templates with HTML→PDF and XLSX rendering in a worker pool
+"""
+
+import asyncio
+import functools
+import io
+import logging
+import os
+import sys
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+ROOT_DIR = Path(__file__).resolve().parent.parent.parent
+
+# The estimator core lives under src/ and is not installed as a package
+sys.path.insert(0, str(ROOT_DIR / "src"))
+
+from kis_estimator_core.engine._xlsx_template import (  # noqa: E402
+    CompiledTemplate,
+    ItemRegion,
+    compile_template,
+    stream_workbook,
+)
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = ROOT_DIR / "templates"
+PDF_TEMPLATE = "estimate.pdf.html"
+XLSX_TEMPLATE = "estimate.xlsx"
+COMPANY_NAME = "KIS"
+
+# Layout of templates/estimate.xlsx: header cells, then the item block
+# whose overflow pushes the 합계 row (and its SUM range) down
+XLSX_SHEET = "Estimate"
+XLSX_CELLS = {"quote_id": "B1", "customer": "B2", "created_at": "B3"}
+XLSX_ITEMS = ItemRegion(XLSX_SHEET, "A6", "F7", ["no", "name", "spec", "qty", "unit_price", "total"])
+
+
+def build_context(quote_id: str, quote_data: dict) -> dict:
+    """
+    Build the template context shared by the PDF and XLSX renders.
+
+    Items accept either ``name`` or ``desc``; missing line totals and the
+    grand total are computed from qty × unit_price.
+    """
+    items = []
+    for item in quote_data.get("items", []):
+        qty = item.get("qty", 0)
+        unit_price = item.get("unit_price", 0)
+        items.append({
+            "name": item.get("name") or item.get("desc", ""),
+            "spec": item.get("spec", ""),
+            "qty": qty,
+            "unit_price": unit_price,
+            "total": item.get("total", qty * unit_price),
+        })
+
+    totals = dict(quote_data.get("totals") or {})
+    totals.setdefault("total", sum(item["total"] for item in items))
+
+    return {
+        "quote_id": quote_id,
+        "customer": quote_data.get("customer") or {"name": ""},
+        "created_at": quote_data.get("created_at")
+        or datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "items": items,
+        "totals": totals,
+        "company": quote_data.get("company", COMPANY_NAME),
+    }
+
+
+@functools.lru_cache(maxsize=64)
+def _fetch_resource(url: str) -> dict:
+    """Fetch a stylesheet/font once per worker process."""
+    from weasyprint import default_url_fetcher
+
+    resource = default_url_fetcher(url)
+    if "file_obj" in resource:
+        resource["string"] = resource.pop("file_obj").read()
+    return resource
+
+
+def html_to_pdf(html: str, base_url: Optional[str] = None) -> bytes:
+    """
+    Convert rendered HTML to PDF bytes (runs inside the worker pool).
+
+    Raises:
+        RuntimeError: weasyprint is not installed
+    """
+    try:
+        from weasyprint import HTML
+    except ImportError as e:
+        raise RuntimeError("PDF rendering requires weasyprint") from e
+
+    def fetcher(url: str) -> dict:
+        return dict(_fetch_resource(url))
+
+    return HTML(string=html, base_url=base_url, url_fetcher=fetcher).write_pdf()
+
+
+@functools.lru_cache(maxsize=4)
+def _xlsx_template(path: str, mtime_ns: int) -> CompiledTemplate:
+    """Compile the XLSX template once per worker process (and per file version)."""
+    return compile_template(Path(path), sheets=[XLSX_SHEET])
+
+
+def context_to_xlsx(context: dict, template_path: Path = TEMPLATES_DIR / XLSX_TEMPLATE) -> bytes:
+    """
+    Fill the estimate XLSX template from the context (runs inside the worker pool).
+
+    Uses the estimator core's compiled template writer, so the workbook
+    keeps the template's styles and formulas.
+    """
+    compiled = _xlsx_template(str(template_path), os.stat(template_path).st_mtime_ns)
+    cells = {
+        XLSX_CELLS["quote_id"]: context["quote_id"],
+        XLSX_CELLS["customer"]: context["customer"].get("name", ""),
+        XLSX_CELLS["created_at"]: context["created_at"],
+    }
+    items = ({"no": no, **item} for no, item in enumerate(context["items"], start=1))
+
+    buffer = io.BytesIO()
+    stream_workbook(compiled, buffer, {XLSX_SHEET: cells}, {}, XLSX_ITEMS, items)
+    return buffer.getvalue()
+
+
+class DocumentRenderer:
+    """
+    Renders estimate PDF/XLSX documents.
+
+    The Jinja2 environment and the PDF template are compiled once. PDF
+    conversion and XLSX writing are CPU bound and run in a worker pool, so
+    the two formats of one quote (and many quotes of a batch) render in
+    parallel without blocking the event loop.
+    """
+
+    def __init__(
+        self,
+        templates_dir: Path = TEMPLATES_DIR,
+        max_workers: Optional[int] = None,
+        use_processes: bool = True,
+        pdf_converter: Callable[[str, Optional[str]], bytes] = html_to_pdf,
+    ):
+        self.templates_dir = Path(templates_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.pdf_converter = pdf_converter
+
+        self.env = Environment(
+            loader=FileSystemLoader(str(self.templates_dir)),
+            autoescape=select_autoescape(["html"]),
+            auto_reload=False,
+        )
+        self._pdf_template = None
+        self._executor: Optional[Executor] = None
+
+    @property
+    def pdf_template(self):
+        if self._pdf_template is None:
+            self._pdf_template = self.env.get_template(PDF_TEMPLATE)
+        return self._pdf_template
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            pool = ProcessPoolExecutor if self.use_processes else ThreadPoolExecutor
+            self._executor = pool(max_workers=self.max_workers)
+        return self._executor
+
+    def render_html(self, context: dict) -> str:
+        """Render the PDF template to HTML."""
+        return self.pdf_template.render(**context)
+
+    async def render(self, quote_id: str, quote_data: dict) -> Dict[str, bytes]:
+        """
+        Render PDF and XLSX for one quote concurrently.
+
+        Returns:
+            dict: {"pdf": bytes, "xlsx": bytes}
+
+        Raises:
+            RuntimeError: Rendering failure
+        """
+        loop = asyncio.get_running_loop()
+        context = build_context(quote_id, quote_data)
+        html = self.render_html(context)
+
+        try:
+            pdf_bytes, xlsx_bytes = await asyncio.gather(
+                loop.run_in_executor(
+                    self.executor, self.pdf_converter, html, self.templates_dir.as_uri() + "/"
+                ),
+                loop.run_in_executor(self.executor, context_to_xlsx, context),
+            )
+        except Exception as e:
+            logger.error(f"Rendering failed for quote {quote_id}: {e}", exc_info=True)
+            raise RuntimeError(f"Document rendering failed: {str(e)}") from e
+
+        logger.info(
+            f"Rendered documents for quote {quote_id} "
+            f"(pdf={len(pdf_bytes)} bytes, xlsx={len(xlsx_bytes)} bytes)"
+        )
+        return {"pdf": pdf_bytes, "xlsx": xlsx_bytes}
+
+    def shutdown(self):
+        """Stop the worker pool"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -3,15 +3,35 @@ KIS Estimator Supabase Storage Module
 Storage client for evidence bucket with signed URL generation
 """
 from supabase import create_client, Client
+import functools
+import httpx
 import logging
 import uuid
 from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Union
 
+from api import tracing
 from api.config import config
 
 logger = logging.getLogger(__name__)
 
 
+def _traced(operation: str):
+    """Run a ``StorageClient`` method taking ``path`` first inside a storage span."""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, path, *args, **kwargs):
+            with tracing.span(
+                f"storage.{operation}",
+                kind="client",
+                attributes={"storage.bucket": self.bucket, "storage.path": path},
+            ):
+                return method(self, path, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
 class StorageClient:
     """Supabase Storage client for evidence bucket operations"""
 
@@ -23,6 +43,7 @@ class StorageClient:
         )
         self.bucket = config.STORAGE_BUCKET
 
+    @_traced("upload")
     def upload_file(
         self,
         path: str,
@@ -57,6 +78,46 @@ class StorageClient:
             logger.error(f"File upload failed for {path}: {e}")
             raise
 
+    @_traced("upload")
+    def upload_path(
+        self,
+        path: str,
+        local_path: Union[str, Path],
+        content_type: str = "application/octet-stream",
+    ) -> dict:
+        """
+        Upload a local file to evidence bucket without reading it into memory.
+
+        The open file is handed to the HTTP client, which streams the
+        request body from disk in chunks.
+
+        Args:
+            path: Storage path
+            local_path: File to upload
+            content_type: MIME type
+
+        Returns:
+            dict with path and metadata
+
+        Raises:
+            Exception if upload fails
+        """
+        try:
+            with open(local_path, "rb") as f:
+                self.client.storage.from_(self.bucket).upload(
+                    path=path,
+                    file=f,
+                    file_options={"content-type": content_type, "upsert": "false"},
+                )
+
+            logger.info(f"File uploaded successfully (streamed): {path}")
+            return {"path": path, "bucket": self.bucket, "uploaded": True}
+
+        except Exception as e:
+            logger.error(f"File upload failed for {path}: {e}")
+            raise
+
+    @_traced("sign")
     def create_signed_url(self, path: str, expires_in: int = 600) -> str:
         """
         Generate signed URL for private file access.
@@ -88,6 +149,7 @@ class StorageClient:
             logger.error(f"Signed URL creation failed for {path}: {e}")
             raise
 
+    @_traced("delete")
     def delete_file(self, path: str) -> dict:
         """
         Delete file from evidence bucket.
@@ -110,6 +172,7 @@ class StorageClient:
             logger.error(f"File deletion failed for {path}: {e}")
             raise
 
+    @_traced("download")
     def download_file(self, path: str) -> bytes:
         """
         Download file from evidence bucket.
@@ -132,6 +195,73 @@ class StorageClient:
             logger.error(f"File download failed for {path}: {e}")
             raise
 
+    def download_stream(self, path: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Download file from evidence bucket in chunks.
+
+        Fetches through a short-lived signed URL so the body is streamed
+        instead of buffered; only one chunk is held in memory at a time.
+
+        Args:
+            path: Storage path
+            chunk_size: Bytes per yielded chunk
+
+        Yields:
+            File content chunks
+
+        Raises:
+            Exception if download fails
+        """
+        try:
+            with tracing.span(
+                "storage.download",
+                kind="client",
+                attributes={"storage.bucket": self.bucket, "storage.path": path},
+            ):
+                url = self.create_signed_url(path, expires_in=60)
+                with httpx.stream("GET", url, timeout=60.0) as response:
+                    response.raise_for_status()
+                    yield from response.iter_bytes(chunk_size)
+            logger.info(f"File downloaded (streamed): {path}")
+
+        except Exception as e:
+            logger.error(f"File download failed for {path}: {e}")
+            raise
+
+    @_traced("stat")
+    def stat(self, path: str) -> dict:
+        """
+        Object version metadata without downloading the object.
+
+        Args:
+            path: Storage path
+
+        Returns:
+            dict with etag, last_modified and size (None when not reported)
+
+        Raises:
+            FileNotFoundError if the object does not exist
+            Exception if listing fails
+        """
+        folder, _, name = path.rpartition("/")
+        try:
+            entries = self.client.storage.from_(self.bucket).list(
+                path=folder, options={"search": name, "limit": 100}
+            )
+        except Exception as e:
+            logger.error(f"File stat failed for {path}: {e}")
+            raise
+
+        for entry in entries:
+            if entry.get("name") == name:
+                metadata = entry.get("metadata") or {}
+                return {
+                    "etag": metadata.get("eTag"),
+                    "last_modified": metadata.get("lastModified") or entry.get("updated_at"),
+                    "size": metadata.get("size"),
+                }
+        raise FileNotFoundError(f"Object not found: {path}")
+
     def list_files(self, prefix: str = "") -> list:
         """
         List files in evidence bucket with optional prefix filter.
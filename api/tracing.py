@@ -0,0 +1,373 @@
+"""
+KIS Estimator Tracing Module
+OpenTelemetry-compatible spans: request → pipeline stage → MCP tool call →
+DB query → storage operation, exported as OTLP/JSON
+
+The active span travels in a ContextVar, so the request's trace_id reaches
+every nested span, including work moved to threads with asyncio.to_thread
+and SQLAlchemy's greenlets. Finished spans are queued and exported in
+batches on a background thread:
+
+- "file": one OTLP/JSON ExportTraceServiceRequest per line (readable by
+  the collector's otlpjsonfile receiver)
+- "otlp": POST to an OTLP/HTTP collector at ``{endpoint}/v1/traces``
+- "none": spans still carry trace ids, nothing is exported
+"""
+import hashlib
+import json
+import logging
+import queue
+import re
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+SERVICE_NAME = "kis-estimator-api"
+
+# OTLP SpanKind / StatusCode values
+SPAN_KINDS = {"internal": 1, "server": 2, "client": 3}
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+
+# version-trace_id-parent_id-flags; later versions may append fields
+_TRACEPARENT_RE = re.compile(r"([0-9a-f]{2})-([0-9a-f]{32})-([0-9a-f]{16})-([0-9a-f]{2})(-.*)?")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("kis_current_span", default=None)
+
+
+def normalize_trace_id(value: str) -> str:
+    """
+    32-hex OTLP trace id for an X-Trace-Id value.
+
+    UUIDs and 32-hex ids keep their value (dashes dropped); anything else
+    is hashed so the same header always maps to the same trace.
+    """
+    compact = value.replace("-", "").lower()
+    if len(compact) == 32 and all(c in "0123456789abcdef" for c in compact):
+        return compact
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def parse_traceparent(header: Optional[str]) -> Optional[tuple]:
+    """
+    (trace_id, parent_span_id) from a W3C ``traceparent`` header, or None.
+
+    Malformed headers are ignored: fields must be lowercase hex of the
+    right length, version ``ff`` is invalid, version ``00`` takes exactly
+    four fields, and all-zero ids are rejected.
+    """
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.fullmatch(header.strip())
+    if match is None:
+        return None
+    version, trace_id, parent_id, _, extra = match.groups()
+    if version == "ff" or (version == "00" and extra is not None):
+        return None
+    if trace_id == "0" * 32 or parent_id == "0" * 16:
+        return None
+    return trace_id, parent_id
+
+
+def _attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": str(value)}}
+
+
+class Span:
+    """One timed operation; ``end`` hands it to the configured exporter."""
+
+    __slots__ = (
+        "name", "kind", "trace_id", "span_id", "parent_id", "attributes",
+        "start_ns", "end_ns", "status", "status_message", "_t0",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        kind: str = "internal",
+        trace_id: Optional[str] = None,
+        parent_id: Optional[str] = None,
+        attributes: Optional[Dict[str, Any]] = None,
+    ):
+        parent = _current_span.get()
+        if trace_id is None and parent is not None:
+            trace_id, parent_id = parent.trace_id, parent_id or parent.span_id
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id or secrets.token_hex(16)
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self._t0 = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def traceparent(self) -> str:
+        """W3C trace context header value for calls made inside this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self, error: Optional[BaseException] = None) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = self.start_ns + (time.perf_counter_ns() - self._t0)
+        if error is not None:
+            self.status, self.status_message = STATUS_ERROR, f"{type(error).__name__}: {error}"
+        elif self.status == STATUS_UNSET:
+            self.status = STATUS_OK
+        processor = _processor
+        if processor is not None:
+            processor.on_end(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": SPAN_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def start_span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+) -> Span:
+    """Start a child of the current span without making it current (leaf spans)."""
+    return Span(name, kind, attributes=attributes)
+
+
+@contextmanager
+def span(
+    name: str,
+    kind: str = "internal",
+    attributes: Optional[Dict[str, Any]] = None,
+    trace_id: Optional[str] = None,
+    parent_id: Optional[str] = None,
+) -> Iterator[Span]:
+    """
+    Run the ``with`` body inside a new current span.
+
+    Args:
+        name: Span name
+        kind: "internal", "server" or "client"
+        attributes: Initial span attributes
+        trace_id: Start a trace with this id instead of continuing the
+            current one (e.g. the request's X-Trace-Id)
+        parent_id: Remote parent span id (incoming traceparent)
+    """
+    current = Span(name, kind, trace_id, parent_id, attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except GeneratorExit:
+        raise
+    except BaseException as e:
+        current.end(error=e)
+        raise
+    finally:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # Generator closed from another context; the span still ends
+            pass
+        current.end()
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def current_trace_id() -> Optional[str]:
+    current = _current_span.get()
+    return current.trace_id if current is not None else None
+
+
+class SpanExporter:
+    """Receives batches of finished spans on the export thread."""
+
+    def export(self, spans: List[Span]) -> None:
+        raise NotImplementedError
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _export_request(spans: List[Span]) -> Dict[str, Any]:
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [_attribute("service.name", SERVICE_NAME)]},
+            "scopeSpans": [{
+                "scope": {"name": "api.tracing"},
+                "spans": [s.to_otlp() for s in spans],
+            }],
+        }]
+    }
+
+
+class FileSpanExporter(SpanExporter):
+    """Append one OTLP/JSON export request per batch to a JSON-lines file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def export(self, spans: List[Span]) -> None:
+        line = json.dumps(_export_request(spans), ensure_ascii=False, separators=(",", ":")) + "\n"
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+class OTLPHttpSpanExporter(SpanExporter):
+    """POST OTLP/JSON batches to a collector (``{endpoint}/v1/traces``)."""
+
+    def __init__(self, endpoint: str, timeout: float = 10.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.timeout = timeout
+
+    def export(self, spans: List[Span]) -> None:
+        body = json.dumps(_export_request(spans), ensure_ascii=False).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=body, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+class BatchSpanProcessor:
+    """
+    Queue finished spans and export them in batches off the request path.
+
+    A full queue drops spans (counted in ``dropped``) rather than blocking
+    the caller; export errors are logged and the batch is discarded.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_queue_size: int = 2048,
+        batch_size: int = 512,
+        interval_s: float = 1.0,
+    ):
+        self.exporter = exporter
+        self.batch_size = batch_size
+        self.interval_s = interval_s
+        self.dropped = 0
+        self._queue: "queue.Queue[Span]" = queue.Queue(max_queue_size)
+        self._export_lock = threading.Lock()
+        self._flush = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="kis-span-exporter", daemon=True)
+        self._thread.start()
+
+    def on_end(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._queue.qsize() >= self.batch_size:
+            self._flush.set()
+
+    def _drain(self) -> None:
+        with self._export_lock:
+            self._drain_locked()
+
+    def _drain_locked(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            try:
+                self.exporter.export(batch)
+            except Exception as e:
+                logger.warning(f"Span export failed ({len(batch)} spans dropped): {e}")
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._flush.wait(self.interval_s)
+            self._flush.clear()
+            self._drain()
+        self._drain()
+
+    def force_flush(self) -> None:
+        """Export everything queued so far (in the calling thread)."""
+        self._drain()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._flush.set()
+        self._thread.join()
+        self.exporter.shutdown()
+
+
+_processor: Optional[BatchSpanProcessor] = None
+
+
+def configure(exporter: Optional[SpanExporter], **processor_options: Any) -> None:
+    """Install ``exporter`` (None disables export), replacing any previous one."""
+    global _processor
+    shutdown()
+    if exporter is not None:
+        _processor = BatchSpanProcessor(exporter, **processor_options)
+
+
+def setup(exporter: str, file_path: str = "", endpoint: str = "") -> None:
+    """
+    Configure export by name (TRACE_EXPORTER).
+
+    Raises:
+        ValueError: Unknown exporter name
+    """
+    if exporter == "none":
+        configure(None)
+    elif exporter == "file":
+        configure(FileSpanExporter(file_path))
+    elif exporter == "otlp":
+        configure(OTLPHttpSpanExporter(endpoint))
+    else:
+        raise ValueError(f"Unknown trace exporter '{exporter}'. Must be one of: none, file, otlp")
+    logger.info(f"Span export: {exporter}")
+
+
+def force_flush() -> None:
+    if _processor is not None:
+        _processor.force_flush()
+
+
+def shutdown() -> None:
+    """Flush and stop the exporter (application shutdown)."""
+    global _processor
+    processor, _processor = _processor, None
+    if processor is not None:
+        processor.shutdown()
@@ -0,0 +1,18 @@
+-- KIS Estimator - Profile Evidence Stage
+-- Purpose: Allow cProfile / stack-sampling profiles of slow quote pipeline
+--          calls to be stored as evidence next to the quote (stage 'profile')
+-- Created: 2026-10-19
+-- Version: 1.0.0
+
+INSERT INTO schema_migrations (version, description, checksum)
+VALUES (
+    '20261019_evidence_profile_stage',
+    'Profile evidence stage for slow quote diagnostics',
+    encode(sha256('20261019_evidence_profile_stage'::bytea), 'hex')
+) ON CONFLICT (version) DO NOTHING;
+
+ALTER TABLE estimator.evidence_blobs DROP CONSTRAINT IF EXISTS evidence_blobs_stage_check;
+ALTER TABLE estimator.evidence_blobs ADD CONSTRAINT evidence_blobs_stage_check
+    CHECK (stage IN ('enclosure', 'breaker', 'critic', 'format', 'cover', 'lint', 'profile'));
+
+COMMENT ON COLUMN estimator.evidence_blobs.stage IS 'FIX-4 pipeline stage (enclosure/breaker/critic/format/cover/lint), or profile for opt-in performance profiles';
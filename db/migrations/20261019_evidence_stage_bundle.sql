@@ -0,0 +1,24 @@
+-- KIS Estimator - Bundle Evidence Stage
+-- Purpose: Record whole-quote evidence bundles (evidence.zip covering every
+--          FIX-4 stage) under their own stage 'bundle' instead of 'lint'
+--          (applies after 20261019_evidence_profile_stage)
+-- Created: 2026-10-19
+-- Version: 1.0.0
+
+INSERT INTO schema_migrations (version, description, checksum)
+VALUES (
+    '20261019_evidence_stage_bundle',
+    'Bundle evidence stage for single-file quote evidence',
+    encode(sha256('20261019_evidence_stage_bundle'::bytea), 'hex')
+) ON CONFLICT (version) DO NOTHING;
+
+ALTER TABLE estimator.evidence_blobs DROP CONSTRAINT IF EXISTS evidence_blobs_stage_check;
+ALTER TABLE estimator.evidence_blobs ADD CONSTRAINT evidence_blobs_stage_check
+    CHECK (stage IN ('enclosure', 'breaker', 'critic', 'format', 'cover', 'lint', 'profile', 'bundle'));
+
+-- Bundles stored before this migration were recorded under 'lint'
+UPDATE estimator.evidence_blobs
+SET stage = 'bundle'
+WHERE stage = 'lint' AND meta->>'kind' = 'bundle';
+
+COMMENT ON COLUMN estimator.evidence_blobs.stage IS 'FIX-4 pipeline stage (enclosure/breaker/critic/format/cover/lint), profile for opt-in performance profiles, or bundle for whole-quote evidence bundles';
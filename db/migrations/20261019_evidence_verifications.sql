@@ -0,0 +1,27 @@
+-- KIS Estimator - Evidence Verification Cache
+-- Purpose: Remember which evidence objects were verified, keyed on the storage
+--          object version (ETag, or last-modified when no ETag is exposed), so
+--          bulk integrity audits only re-download objects that changed
+-- Created: 2026-10-19
+-- Version: 1.0.0
+
+INSERT INTO schema_migrations (version, description, checksum)
+VALUES (
+    '20261019_evidence_verifications',
+    'Verified-hash cache for bulk evidence integrity audits',
+    encode(sha256('20261019_evidence_verifications'::bytea), 'hex')
+) ON CONFLICT (version) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS estimator.evidence_verifications (
+    blob_id UUID PRIMARY KEY REFERENCES estimator.evidence_blobs(id) ON DELETE CASCADE,
+    object_version TEXT NOT NULL,
+    sha256 TEXT NOT NULL CHECK (length(sha256) = 64 AND sha256 ~ '^[a-f0-9]+$'),
+    verified_at TIMESTAMPTZ NOT NULL DEFAULT (now() AT TIME ZONE 'utc')
+);
+
+COMMENT ON TABLE estimator.evidence_verifications IS 'Last successful integrity check per evidence blob';
+COMMENT ON COLUMN estimator.evidence_verifications.object_version IS 'Storage ETag (or last-modified) of the object that was hashed';
+COMMENT ON COLUMN estimator.evidence_verifications.sha256 IS 'Hash that was verified; a cache hit also requires it to equal evidence_blobs.sha256';
+
+ALTER TABLE estimator.evidence_verifications ENABLE ROW LEVEL SECURITY;
+GRANT ALL ON estimator.evidence_verifications TO service_role;
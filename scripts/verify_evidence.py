@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Nightly evidence integrity audit
+
+Verifies every estimator.evidence_blobs object against its stored SHA256.
+Objects whose storage ETag/last-modified is unchanged since their last
+successful check are not downloaded again (estimator.evidence_verifications).
+
+Usage:
+    python scripts/verify_evidence.py [--page-size 500] [--concurrency 16] [--no-cache]
+
+Exit code 1 when any blob mismatches or could not be checked.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from api.services.document_service import verify_evidence_bulk  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Bulk evidence integrity audit")
+    parser.add_argument("--page-size", type=int, default=500, help="Blobs per DB page")
+    parser.add_argument("--concurrency", type=int, default=None, help="Blobs verified at once")
+    parser.add_argument("--no-cache", action="store_true", help="Re-download every object")
+    args = parser.parse_args()
+
+    summary = asyncio.run(
+        verify_evidence_bulk(
+            page_size=args.page_size,
+            concurrency=args.concurrency,
+            use_cache=not args.no_cache,
+        )
+    )
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    return 1 if summary["mismatched"] or summary["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
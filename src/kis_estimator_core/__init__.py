@@ -3,10 +3,17 @@ KIS Estimator Core Package
 Korean Industrial Systems - AI-powered Estimation Engine
 """
 
+import importlib
+
 __version__ = "0.1.0-rebuild"
 __author__ = "KIS Development Team"
 
-from . import engine
-from . import infra
+__all__ = ["engine", "infra"]
+
 
-__all__ = ["engine", "infra"]
\ No newline at end of file
+def __getattr__(name):
+    # Subpackages load on first access: infra pulls in SQLAlchemy and the
+    # engine OR-Tools/openpyxl, which callers may never need
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,12 +3,28 @@ KIS Estimator Engine Module
 Core estimation algorithms and processors
 """
 
-from .breaker_placer import BreakerSpec
-from .enclosure_solver import EnclosureSolver
-from .estimate_formatter import EstimateFormatter
+import importlib
+import sys
+from pathlib import Path
+
+# Public name -> defining submodule, imported on first attribute access
+_LAZY_ATTRS = {
+    "BreakerSpec": "breaker_placer",
+}
 
 __all__ = [
     "BreakerSpec",
-    "EnclosureSolver",
-    "EstimateFormatter",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        # Stage modules double as CLI scripts and import their siblings flat
+        # (``from _util_io import ...``); only put the engine dir on the path
+        # when one of them is actually requested.
+        engine_dir = str(Path(__file__).resolve().parent)
+        if engine_dir not in sys.path:
+            sys.path.append(engine_dir)
+        module = importlib.import_module(f".{_LAZY_ATTRS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
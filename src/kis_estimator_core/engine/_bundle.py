@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Single-file evidence bundles
+
+An ``EvidenceBundle`` is one append-only zip per quote (``evidence.zip``
+in the work directory) instead of many small svg/json/png files per stage:
+
+- the zip central directory is the index, so any member is read without
+  scanning the others
+- each member's SHA256 is stored as its zip comment and checked on read
+- members are only ever appended; re-adding a name appends a new member
+  and the latest one wins
+- appends hold an exclusive ``flock``, so stage threads and worker
+  processes can share one bundle; readers hold a shared lock
+
+Stages write into the active bundle (``open_bundle``) through
+``write_evidence``; the whole file can then be uploaded as one object.
+The active bundle is per context, so concurrent runs (threads or tasks
+with their own context) each write to their own work directory's bundle.
+"""
+import hashlib
+import os
+import threading
+import warnings
+import zipfile
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, only this process's threads are serialised
+    fcntl = None
+
+BUNDLE_NAME = "evidence.zip"
+
+_SHA_PREFIX = b"sha256:"
+
+
+class EvidenceBundle:
+    """Append-only zip of evidence artefacts with a SHA256 per member."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @contextmanager
+    def _locked(self, exclusive: bool):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            with _local_lock:
+                yield
+            return
+        fd = os.open(self.path.with_name(self.path.name + ".lock"), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def add(self, name: str, data: Union[bytes, str]) -> str:
+        """
+        Append a member.
+
+        Returns:
+            The member's SHA256
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+
+        info = zipfile.ZipInfo(name)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.comment = _SHA_PREFIX + digest.encode("ascii")
+
+        with self._locked(exclusive=True):
+            mode = "a" if self.path.exists() else "w"
+            with warnings.catch_warnings(), zipfile.ZipFile(self.path, mode) as zf:
+                # Appending an existing name is intended: the latest member wins
+                warnings.simplefilter("ignore", UserWarning)
+                zf.writestr(info, data)
+        return digest
+
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Latest member per name: {name: {sha256, size, offset}}."""
+        if not self.path.exists():
+            return {}
+        with self._locked(exclusive=False), zipfile.ZipFile(self.path) as zf:
+            return {
+                info.filename: {
+                    "sha256": _member_sha(info),
+                    "size": info.file_size,
+                    "offset": info.header_offset,
+                }
+                for info in zf.infolist()
+            }
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.index()
+
+    def read(self, name: str, verify: bool = True) -> bytes:
+        """
+        Read one member (the latest with that name).
+
+        Raises:
+            KeyError: No such member
+            ValueError: The member does not match its recorded SHA256
+        """
+        with self._locked(exclusive=False), zipfile.ZipFile(self.path) as zf:
+            info = zf.getinfo(name)
+            data = zf.read(info)
+        if verify and hashlib.sha256(data).hexdigest() != _member_sha(info):
+            raise ValueError(f"SHA256 mismatch for bundle member {name}")
+        return data
+
+    def verify(self) -> List[str]:
+        """Names of members whose content does not match their SHA256."""
+        bad = []
+        with self._locked(exclusive=False), zipfile.ZipFile(self.path) as zf:
+            for info in zf.infolist():
+                if hashlib.sha256(zf.read(info)).hexdigest() != _member_sha(info):
+                    bad.append(info.filename)
+        return bad
+
+
+def _member_sha(info: zipfile.ZipInfo) -> Optional[str]:
+    if info.comment.startswith(_SHA_PREFIX):
+        return info.comment[len(_SHA_PREFIX):].decode("ascii")
+    return None
+
+
+_local_lock = threading.RLock()
+
+# (bundle, work dir it covers) for the current run
+_active: ContextVar[Optional[Tuple[EvidenceBundle, Path]]] = ContextVar("kis_evidence_bundle", default=None)
+
+
+def open_bundle(work: Path) -> Token:
+    """
+    Route evidence written under ``work`` into ``work/evidence.zip``.
+
+    Applies to the current context and threads started with a copy of it.
+
+    Returns:
+        Token for ``close_bundle``
+    """
+    root = Path(work).resolve()
+    return _active.set((EvidenceBundle(root / BUNDLE_NAME), root))
+
+
+def close_bundle(token: Optional[Token] = None):
+    """Write evidence as individual files again (or restore the bundle active
+    before the ``open_bundle`` that returned ``token``)."""
+    if token is None:
+        _active.set(None)
+    else:
+        _active.reset(token)
+
+
+def active_bundle() -> Optional[EvidenceBundle]:
+    active = _active.get()
+    return active[0] if active else None
+
+
+def _member(path: Path) -> Tuple[Optional[EvidenceBundle], Optional[str]]:
+    """Active bundle and member name for ``path``; (None, None) when it is not bundled."""
+    active = _active.get()
+    if active is None:
+        return None, None
+    bundle, root = active
+    try:
+        return bundle, Path(path).resolve().relative_to(root).as_posix()
+    except ValueError:
+        return None, None
+
+
+def write_evidence(path: Path, data: Union[bytes, str]) -> bool:
+    """Append ``data`` to the active bundle if ``path`` belongs to it."""
+    bundle, name = _member(path)
+    if name is None:
+        return False
+    bundle.add(name, data)
+    return True
+
+
+def bundled(path: Path) -> bool:
+    """Whether ``path`` is a member of the active bundle."""
+    bundle, name = _member(path)
+    return name is not None and name in bundle
+
+
+def bundled_paths(paths: Iterable[Path]) -> Set[Path]:
+    """Which of ``paths`` are members of the active bundle (one index read)."""
+    bundle = active_bundle()
+    if bundle is None:
+        return set()
+    members = {path: _member(path)[1] for path in paths}
+    names = bundle.index()
+    return {path for path, name in members.items() if name is not None and name in names}
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Lazy evidence manifest
+
+In lazy mode a stage does not render its evidence artefacts. It appends
+one line per artefact to ``evidence_manifest.jsonl`` in the artefact's
+directory: the target file name, the renderer (``module:function``), and
+either the stage JSON the renderer reads (``source``) or the compact
+payload itself (``data``). ``materialize`` renders an artefact the first
+time someone asks for it; ``materialize_all`` renders everything pending
+under a work directory (e.g. before an audit export).
+
+The manifest is append-only; the last line for a target wins. Parsed
+manifests are cached per directory and re-read only when the file grows
+or its mtime changes.
+"""
+import importlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+MANIFEST = "evidence_manifest.jsonl"
+
+_lock = threading.Lock()
+
+# manifest path -> ((mtime_ns, size), latest entry per target)
+_parsed: Dict[Path, Tuple[Tuple[int, int], Dict[str, Dict[str, Any]]]] = {}
+
+
+def record(target: Path, renderer: Callable[[Any], str], data: Any = None,
+           source: Optional[Path] = None) -> Dict[str, Any]:
+    """
+    Record a deferred artefact instead of rendering it.
+
+    Args:
+        target: Artefact path
+        renderer: Module-level function rendering ``data`` (or the parsed
+            ``source`` JSON) to the artefact text (or bytes, e.g. a PNG)
+        data: JSON-serialisable payload, stored inline when no source is given
+        source: JSON file (next to the artefact or below it) holding the payload
+
+    Returns:
+        The manifest entry
+    """
+    target = Path(target)
+    entry = {
+        "target": target.name,
+        "renderer": f"{renderer.__module__}:{renderer.__name__}",
+        "recorded": datetime.now().isoformat(),
+    }
+    if source is not None:
+        entry["source"] = os.path.relpath(source, target.parent)
+    else:
+        entry["data"] = data
+
+    line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    with _lock:
+        # A file left by an earlier eager run would be stale now
+        target.unlink(missing_ok=True)
+        with open(target.parent / MANIFEST, "a", encoding="utf-8") as f:
+            f.write(line)
+    return entry
+
+
+def _latest(directory: Path) -> Dict[str, Dict[str, Any]]:
+    """Cached ``entries`` of ``directory`` (shared; do not modify)."""
+    manifest = Path(os.path.abspath(directory)) / MANIFEST
+    try:
+        st = manifest.stat()
+    except FileNotFoundError:
+        _parsed.pop(manifest, None)
+        return {}
+    version = (st.st_mtime_ns, st.st_size)
+    cached = _parsed.get(manifest)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    latest = {}
+    with open(manifest, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                latest[entry["target"]] = entry
+    _parsed[manifest] = (version, latest)
+    return latest
+
+
+def entries(directory: Path) -> Dict[str, Dict[str, Any]]:
+    """Latest manifest entry per target name in ``directory``."""
+    return dict(_latest(directory))
+
+
+def is_recorded(path: Path) -> bool:
+    """Whether ``path`` exists or can be materialized from its manifest."""
+    path = Path(path)
+    return path.exists() or path.name in _latest(path.parent)
+
+
+def pending(work: Path) -> List[Path]:
+    """Recorded artefacts under ``work`` that have not been rendered yet."""
+    paths = []
+    for manifest in sorted(Path(work).rglob(MANIFEST)):
+        for name in _latest(manifest.parent):
+            if not (manifest.parent / name).exists():
+                paths.append(manifest.parent / name)
+    return paths
+
+
+def materialize(path: Path) -> Path:
+    """
+    Render a recorded artefact if it does not exist yet.
+
+    Returns:
+        The artefact path
+
+    Raises:
+        FileNotFoundError: Neither the artefact nor a manifest entry exists
+    """
+    path = Path(path)
+    if path.exists():
+        return path
+
+    entry = _latest(path.parent).get(path.name)
+    if entry is None:
+        raise FileNotFoundError(f"No evidence recorded for {path}")
+
+    module_name, func_name = entry["renderer"].split(":")
+    renderer = getattr(importlib.import_module(module_name), func_name)
+    if "source" in entry:
+        data = json.loads((path.parent / entry["source"]).read_text(encoding="utf-8"))
+    else:
+        data = entry["data"]
+
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    content = renderer(data)
+    if isinstance(content, bytes):
+        tmp.write_bytes(content)
+    else:
+        tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def materialize_all(work: Path) -> List[Path]:
+    """Render every pending artefact under ``work``."""
+    return [materialize(path) for path in pending(work)]
@@ -0,0 +1,28 @@
+"""Deferred imports for heavy optional dependencies (polars, duckdb, OR-Tools)."""
+
+from __future__ import annotations
+
+import importlib
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Module placeholder that imports the real module on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = name
+
+    def _load(self) -> types.ModuleType:
+        module = importlib.import_module(self.__dict__["_lazy_target"])
+        # Later lookups hit the copied attributes and skip __getattr__
+        self.__dict__.update(module.__dict__)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._load(), attr)
+
+
+def lazy_module(name: str) -> LazyModule:
+    """Return a stand-in for ``import name`` that costs nothing until used."""
+    return LazyModule(name)
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Column-wise estimate pricing and workbook cross-checks
+
+Line totals, markups, subtotal, VAT and grand total are computed over all
+items at once with polars; the filled workbook is verified by joining every
+cell value the formatter wrote against the cells read back from it.
+Template formulas (e.g. ``=SUM`` footers) are not evaluated: they keep the
+template's cached result until the workbook is recalculated, so they are
+not part of the check. A plain Python path keeps both available when
+polars is not installed.
+"""
+import functools
+import importlib.util
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from _util_io import log
+
+VAT_RATE = 0.1
+
+# pricing.markup in business_rules.yaml
+DEFAULT_MARKUP = {"material": 1.15, "labor": 1.20, "overhead": 1.10}
+
+# Numeric cells may differ by rounding (KRW has no decimals)
+TOLERANCE = 0.5
+
+# Mismatching cells listed in the result
+MAX_REPORTED = 20
+
+_HAS_POLARS = None
+
+def has_polars() -> bool:
+    """Whether polars is installed (checked once, without importing it)."""
+    global _HAS_POLARS
+    if _HAS_POLARS is None:
+        _HAS_POLARS = importlib.util.find_spec("polars") is not None
+        if not _HAS_POLARS:
+            log("WARNING: polars not available, using row-wise pricing", "WARN")
+    return _HAS_POLARS
+
+def load_markup(rules_dir: Optional[Path]) -> Dict[str, float]:
+    """Read ``pricing.markup`` from business_rules.yaml (defaults if absent).
+
+    The file is parsed once per path and modification time.
+    """
+    rules_file = Path(rules_dir) / "business_rules.yaml" if rules_dir else None
+    if rules_file is None or not rules_file.exists():
+        return dict(DEFAULT_MARKUP)
+
+    stat = rules_file.stat()
+    return dict(_read_markup(str(rules_file.resolve()), stat.st_mtime_ns, stat.st_size))
+
+@functools.lru_cache(maxsize=16)
+def _read_markup(rules_file: str, mtime_ns: int, size: int) -> Dict[str, float]:
+    try:
+        import yaml
+        with open(rules_file, "r", encoding="utf-8") as f:
+            rules = yaml.safe_load(f) or {}
+        markup = (rules.get("pricing") or {}).get("markup") or {}
+        return {**DEFAULT_MARKUP, **{k: float(v) for k, v in markup.items()}}
+    except Exception as e:
+        log(f"Error loading pricing rules: {e}", "WARN")
+        return dict(DEFAULT_MARKUP)
+
+def price_items(items: Sequence[Dict], markup: Optional[Dict[str, float]] = None,
+                vat_rate: float = VAT_RATE) -> Dict[str, Any]:
+    """
+    Price all line items column-wise.
+
+    Each line's amount is ``qty * unit_price`` (the stated ``total`` for
+    items without both); items with a ``category`` (material/labor/overhead)
+    are multiplied by its markup factor.
+
+    Args:
+        items: Estimate line items
+        markup: Category → factor (``DEFAULT_MARKUP`` if omitted)
+        vat_rate: VAT rate applied to the subtotal
+
+    Returns:
+        dict: {line_totals, stated_mismatches, net, markup, subtotal, vat, total};
+        line totals are whole numbers (int) on both backends
+    """
+    markup = DEFAULT_MARKUP if markup is None else markup
+    if has_polars():
+        totals = _price_polars(items, markup)
+    else:
+        totals = _price_rows(items, markup)
+
+    subtotal = round(totals["net"] + totals["markup"])
+    vat = round(subtotal * vat_rate)
+    totals.update({
+        "net": round(totals["net"]),
+        "markup": round(totals["markup"]),
+        "subtotal": subtotal,
+        "vat": vat,
+        "total": subtotal + vat,
+    })
+    return totals
+
+def _price_polars(items: Sequence[Dict], markup: Dict[str, float]) -> Dict[str, Any]:
+    import polars as pl
+
+    df = pl.DataFrame(
+        {
+            "qty": [item.get("qty") for item in items],
+            "unit_price": [item.get("unit_price") for item in items],
+            "stated": [item.get("total") for item in items],
+            "category": [item.get("category") for item in items],
+        },
+        schema={"qty": pl.Float64, "unit_price": pl.Float64,
+                "stated": pl.Float64, "category": pl.Utf8},
+    )
+    factors = pl.DataFrame({"category": list(markup), "factor": list(markup.values())},
+                           schema={"category": pl.Utf8, "factor": pl.Float64})
+
+    df = (
+        df.with_columns(
+            (pl.col("qty") * pl.col("unit_price")).fill_null(pl.col("stated")).fill_null(0.0).alias("amount")
+        )
+        .join(factors, on="category", how="left", maintain_order="left")
+        .with_columns(pl.col("factor").fill_null(1.0))
+        .with_columns((pl.col("amount") * (pl.col("factor") - 1.0)).alias("markup"))
+    )
+    mismatched = df.select(
+        ((pl.col("stated") - pl.col("amount")).abs() > TOLERANCE).fill_null(False)
+    ).to_series()
+
+    return {
+        "line_totals": df["amount"].round(0).cast(pl.Int64).to_list(),
+        "stated_mismatches": mismatched.arg_true().to_list(),
+        "net": df["amount"].sum(),
+        "markup": df["markup"].sum(),
+    }
+
+def _price_rows(items: Sequence[Dict], markup: Dict[str, float]) -> Dict[str, Any]:
+    line_totals, mismatches = [], []
+    net = marked = 0.0
+    for i, item in enumerate(items):
+        stated = item.get("total")
+        if item.get("qty") is not None and item.get("unit_price") is not None:
+            amount = float(item["qty"]) * float(item["unit_price"])
+        else:
+            amount = float(stated or 0)
+        if stated is not None and abs(stated - amount) > TOLERANCE:
+            mismatches.append(i)
+        line_totals.append(round(amount))
+        net += amount
+        marked += amount * (markup.get(item.get("category"), 1.0) - 1.0)
+    return {"line_totals": line_totals, "stated_mismatches": mismatches,
+            "net": net, "markup": marked}
+
+def compare_cells(expected: List[Tuple[str, str, Any]],
+                  actual: Dict[Tuple[str, str], Any]) -> Tuple[int, List[Dict]]:
+    """
+    Compare expected cell values against cells read back from a workbook.
+
+    Args:
+        expected: [(sheet, ref, value), ...]
+        actual: {(sheet, ref): value}
+
+    Returns:
+        (number of differing cells, first ``MAX_REPORTED`` differences)
+    """
+    if has_polars():
+        return _compare_polars(expected, actual)
+
+    diffs = []
+    for sheet, ref, value in expected:
+        got = actual.get((sheet, ref))
+        if not _same(value, got):
+            diffs.append({"sheet": sheet, "ref": ref, "expected": value, "actual": got})
+    return len(diffs), diffs[:MAX_REPORTED]
+
+def _same(expected: Any, actual: Any) -> bool:
+    if isinstance(expected, (int, float)) and not isinstance(expected, bool):
+        return isinstance(actual, (int, float)) and abs(expected - actual) <= TOLERANCE
+    return expected == actual
+
+def _split_values(values: List[Any]) -> Tuple[List[Optional[float]], List[Optional[str]]]:
+    """Split mixed cell values into numeric and text columns."""
+    nums, texts = [], []
+    for v in values:
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            nums.append(float(v))
+            texts.append(None)
+        else:
+            nums.append(None)
+            texts.append(None if v is None else str(v))
+    return nums, texts
+
+def _compare_polars(expected: List[Tuple[str, str, Any]],
+                    actual: Dict[Tuple[str, str], Any]) -> Tuple[int, List[Dict]]:
+    import polars as pl
+
+    exp_num, exp_text = _split_values([v for _, _, v in expected])
+    exp = pl.DataFrame(
+        {"sheet": [s for s, _, _ in expected], "ref": [r for _, r, _ in expected],
+         "exp_num": exp_num, "exp_text": exp_text},
+        schema={"sheet": pl.Utf8, "ref": pl.Utf8, "exp_num": pl.Float64, "exp_text": pl.Utf8},
+    )
+    act_num, act_text = _split_values(list(actual.values()))
+    act = pl.DataFrame(
+        {"sheet": [s for s, _ in actual], "ref": [r for _, r in actual],
+         "act_num": act_num, "act_text": act_text},
+        schema={"sheet": pl.Utf8, "ref": pl.Utf8, "act_num": pl.Float64, "act_text": pl.Utf8},
+    )
+
+    joined = exp.join(act, on=["sheet", "ref"], how="left", maintain_order="left")
+    num_diff = pl.col("exp_num").is_not_null() & (
+        pl.col("act_num").is_null() | ((pl.col("exp_num") - pl.col("act_num")).abs() > TOLERANCE)
+    )
+    text_diff = pl.col("exp_num").is_null() & pl.col("exp_text").ne_missing(pl.col("act_text"))
+    diffs = joined.filter(num_diff | text_diff)
+
+    reported = [
+        {"sheet": row["sheet"], "ref": row["ref"],
+         "expected": row["exp_num"] if row["exp_num"] is not None else row["exp_text"],
+         "actual": row["act_num"] if row["act_num"] is not None else row["act_text"]}
+        for row in diffs.head(MAX_REPORTED).iter_rows(named=True)
+    ]
+    return diffs.height, reported
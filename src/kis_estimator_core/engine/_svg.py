@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Compiled SVG evidence templates
+
+Static chrome (frames, titles, grids) is built once at import into a
+``SvgTemplate``; a render only formats its ``{field:spec}`` slots. Text
+values are XML-escaped, ``Markup`` fragments (e.g. per-row elements built
+by the caller, whose free text goes through ``escape``) are inserted as-is.
+
+Writing goes through ``write_svg`` which honours the evidence SVG mode:
+
+- ``eager``: render and write immediately (default)
+- ``defer``: remember the renderer; ``render_deferred_svg`` writes it later
+  in this process
+- ``lazy``:  record the renderer and payload in the evidence manifest;
+  ``_evidence.materialize`` renders it on demand, in any process
+- ``skip``:  never render (batch runs)
+
+The mode comes from ``KIS_EVIDENCE_SVG`` or ``set_svg_mode`` (per context,
+like the active evidence bundle).
+"""
+import os
+import string
+import threading
+from contextvars import ContextVar, Token
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from xml.sax.saxutils import escape as _escape
+
+import _bundle
+import _evidence
+
+SVG_MODES = ("eager", "defer", "lazy", "skip")
+
+_formatter = string.Formatter()
+_QUOTE_ENTITIES = {'"': "&quot;", "'": "&#x27;"}
+
+
+class Markup(str):
+    """Already-rendered SVG fragment (inserted without escaping)."""
+
+
+def escape(text: str) -> str:
+    """XML-escape text, quotes included so it is safe inside attributes
+    (returned as-is when there is nothing to escape)."""
+    if "&" in text or "<" in text or ">" in text or '"' in text or "'" in text:
+        return _escape(text, _QUOTE_ENTITIES)
+    return text
+
+
+def _text(value: Any) -> Any:
+    """Escape plain strings; numbers and ``Markup`` pass through."""
+    if type(value) is str:
+        return escape(value)
+    return value
+
+
+class SvgTemplate:
+    """
+    SVG markup with ``str.format`` slots, compiled once at import.
+
+    The source is split once into ``(literal, field, spec)`` pieces, so a
+    render only formats the slots instead of re-parsing the markup.
+    """
+
+    def __init__(self, source: str):
+        self.source = source
+        self.fields = set()
+        self._pieces: List[Tuple[str, Optional[str], str]] = []
+        for literal, field, spec, conversion in _formatter.parse(source):
+            if conversion:
+                raise ValueError(f"Conversions are not supported in SVG templates: {field}!{conversion}")
+            if field is not None:
+                if not field.isidentifier() or "{" in spec:
+                    raise ValueError(f"Invalid SVG template field: {{{field}:{spec}}}")
+                self.fields.add(field)
+            self._pieces.append((literal, field, spec or ""))
+
+    def render(self, **values: Any) -> str:
+        out = []
+        for literal, field, spec in self._pieces:
+            out.append(literal)
+            if field is not None:
+                out.append(format(_text(values[field]), spec))
+        return "".join(out)
+
+
+# Per context, so concurrent runs (threads or tasks) keep their own mode
+_mode: ContextVar[str] = ContextVar("kis_evidence_svg", default=os.environ.get("KIS_EVIDENCE_SVG", "eager"))
+_deferred: Dict[Path, Tuple[Callable[[Any], str], Any]] = {}
+_lock = threading.Lock()
+
+
+def set_svg_mode(mode: str) -> Token:
+    """
+    Switch between eager, defer, lazy and skip in the current context.
+
+    Returns:
+        Token for ``reset_svg_mode``
+    """
+    if mode not in SVG_MODES:
+        raise ValueError(f"Unknown SVG mode '{mode}'. Must be one of: {', '.join(SVG_MODES)}")
+    return _mode.set(mode)
+
+
+def reset_svg_mode(token: Token):
+    """Restore the mode active before the ``set_svg_mode`` that returned ``token``."""
+    _mode.reset(token)
+
+
+def svg_mode() -> str:
+    return _mode.get()
+
+
+def write_svg(path: Path, renderer: Callable[[Any], str], data: Any,
+              source: Optional[Path] = None) -> Optional[Path]:
+    """
+    Write an SVG evidence file according to the current mode.
+
+    Args:
+        path: Target .svg path
+        renderer: Module-level function producing the SVG text from ``data``
+        data: Payload to render
+        source: JSON file already holding ``data`` (lazy mode references it
+            instead of copying the payload into the manifest)
+
+    Returns:
+        The path if the file was written now, otherwise None
+    """
+    path = Path(path)
+    mode = _mode.get()
+    if mode == "skip":
+        return None
+    if mode == "defer":
+        with _lock:
+            _deferred[path] = (renderer, data)
+        return None
+    if mode == "lazy":
+        _evidence.record(path, renderer, data, source)
+        return None
+
+    _write(path, renderer(data))
+    return path
+
+
+def _write(path: Path, text: str):
+    """Write into the active evidence bundle, or as a file."""
+    if not _bundle.write_evidence(path, text):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text, encoding="utf-8")
+
+
+def render_deferred_svg(path: Optional[Path] = None) -> List[Path]:
+    """
+    Write deferred SVGs (all of them, or only ``path``).
+
+    Returns:
+        Paths written
+    """
+    with _lock:
+        if path is None:
+            pending = list(_deferred.items())
+            _deferred.clear()
+        else:
+            queued = _deferred.pop(Path(path), None)
+            pending = [(Path(path), queued)] if queued else []
+
+    written = []
+    for target, (renderer, data) in pending:
+        _write(target, renderer(data))
+        written.append(target)
+    return written
+
+
+def deferred_svg() -> List[Path]:
+    """Paths with a pending deferred render."""
+    with _lock:
+        return list(_deferred)
+
+
+def evidence_available(path: Path) -> bool:
+    """Whether an evidence file exists (on disk or in the active bundle), is
+    queued, or is recorded for lazy rendering."""
+    path = Path(path)
+    if path.exists() or _bundle.bundled(path):
+        return True
+    with _lock:
+        if path in _deferred:
+            return True
+    return _evidence.is_recorded(path)
+
+
+def available_evidence(paths: Iterable[Path]) -> Set[Path]:
+    """
+    The subset of ``paths`` for which ``evidence_available`` holds.
+
+    Lists each directory once instead of stat-ing every path, and reads the
+    bundle index and lazy manifests once for the paths not found on disk.
+    Paths may be ``Path`` objects or strings; the same objects are returned.
+    """
+    listings: Dict[str, Set[str]] = {}
+    found = set()
+    rest = []
+    for p in paths:
+        directory, name = os.path.split(os.fspath(p))
+        if directory not in listings:
+            try:
+                listings[directory] = set(os.listdir(directory or "."))
+            except FileNotFoundError:
+                listings[directory] = set()
+        if name in listings[directory]:
+            found.add(p)
+        else:
+            rest.append((p, directory, name))
+    if not rest:
+        return found
+
+    found |= _bundle.bundled_paths(p for p, _, _ in rest)
+    with _lock:
+        found |= {p for p, _, _ in rest if Path(p) in _deferred}
+    recorded: Dict[str, Dict[str, Any]] = {}
+    for p, directory, name in rest:
+        if directory not in recorded:
+            recorded[directory] = _evidence.entries(directory or ".")
+        if name in recorded[directory]:
+            found.add(p)
+    return found
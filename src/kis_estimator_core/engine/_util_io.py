@@ -1,32 +1,145 @@
 #!/usr/bin/env python3
 import json, os, argparse, pathlib, time, sys
+import threading
+import uuid
 from pathlib import Path
 from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import _evidence
+from _bundle import write_evidence
+from _svg import Markup, SvgTemplate, escape, svg_mode, write_svg
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+METRICS_PATH = ".meta/metrics.jsonl"
+
+_current_span: ContextVar[Optional[str]] = ContextVar("kis_metrics_span", default=None)
+
+def _peak_rss_kb() -> Optional[int]:
+    """Peak resident set size of this process so far (KiB), if known."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
 
 class MetricsCollector:
-    def __init__(self):
-        self.metrics = {"steps": {}, "total_ms": 0, "errors": []}
-    
+    """
+    Step timings for one engine run.
+
+    Every ``timer``/``span`` produces one record: wall time from
+    ``perf_counter_ns``, CPU time of the running thread from
+    ``thread_time_ns``, and the process's peak RSS when the step ended.
+    Spans opened inside another span (in the same thread or task) record
+    it as their parent. All records carry the collector's ``run_id``.
+
+    ``metrics["steps"]`` keeps the latest record per step name (``ms``,
+    ``status``) for callers that only want a summary. ``save`` appends the
+    records not yet written as JSON Lines, so concurrent stages and runs
+    sharing one file never overwrite each other.
+    """
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id or os.environ.get("KIS_RUN_ID") or uuid.uuid4().hex[:16]
+        self.metrics = {"run_id": self.run_id, "steps": {}, "total_ms": 0, "errors": []}
+        self.records: List[Dict[str, Any]] = []
+        self._saved = 0
+        self._lock = threading.Lock()
+
     @contextmanager
-    def timer(self, step_name):
-        start = time.time()
+    def span(self, name: str, **attrs):
+        """Time a (possibly nested) step; extra keyword args are stored on the record."""
+        span_id = uuid.uuid4().hex[:16]
+        parent_id = _current_span.get()
+        token = _current_span.set(span_id)
+        record = {
+            "type": "span",
+            "run_id": self.run_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "start_ns": time.time_ns(),
+            **attrs,
+        }
+        cpu_start = time.thread_time_ns()
+        wall_start = time.perf_counter_ns()
         try:
-            yield
-            elapsed_ms = int((time.time() - start) * 1000)
-            self.metrics["steps"][step_name] = {"ms": elapsed_ms, "status": "OK"}
+            yield record
+            record["status"] = "OK"
         except Exception as e:
-            elapsed_ms = int((time.time() - start) * 1000)
-            self.metrics["steps"][step_name] = {"ms": elapsed_ms, "status": "FAIL", "error": str(e)}
-            self.metrics["errors"].append({"step": step_name, "error": str(e)})
+            record["status"] = "FAIL"
+            record["error"] = str(e)
             raise
-    
-    def save(self, path=".meta/metrics.json"):
+        finally:
+            record["wall_ns"] = time.perf_counter_ns() - wall_start
+            record["cpu_ns"] = time.thread_time_ns() - cpu_start
+            record["peak_rss_kb"] = _peak_rss_kb()
+            _current_span.reset(token)
+            self._add(record)
+
+    timer = span
+
+    def skip(self, step_name):
+        self._add({
+            "type": "span",
+            "run_id": self.run_id,
+            "span_id": uuid.uuid4().hex[:16],
+            "parent_id": _current_span.get(),
+            "name": step_name,
+            "start_ns": time.time_ns(),
+            "status": "SKIPPED",
+            "wall_ns": 0,
+            "cpu_ns": 0,
+        })
+
+    def _add(self, record: Dict[str, Any]):
+        step = {"ms": record["wall_ns"] / 1e6, "status": record["status"]}
+        if "error" in record:
+            step["error"] = record["error"]
+        with self._lock:
+            self.records.append(record)
+            self.metrics["steps"][record["name"]] = step
+            if record["status"] == "FAIL":
+                self.metrics["errors"].append({"step": record["name"], "error": record["error"]})
+
+    def save(self, path=METRICS_PATH):
+        """Append unsaved span records plus a run summary line to ``path``."""
+        with self._lock:
+            records = self.records[self._saved:]
+            self._saved = len(self.records)
+            self.metrics["total_ms"] = sum(
+                r["wall_ns"] for r in self.records if r["parent_id"] is None) / 1e6
+            self.metrics["timestamp"] = datetime.now().isoformat()
+            summary = {
+                "type": "run",
+                "run_id": self.run_id,
+                "total_ms": self.metrics["total_ms"],
+                "errors": list(self.metrics["errors"]),
+                "peak_rss_kb": _peak_rss_kb(),
+                "timestamp": self.metrics["timestamp"],
+            }
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records + [summary])
+
         Path(path).parent.mkdir(parents=True, exist_ok=True)
-        self.metrics["total_ms"] = sum(s.get("ms", 0) for s in self.metrics["steps"].values())
-        self.metrics["timestamp"] = datetime.now().isoformat()
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(self.metrics, f, indent=2, ensure_ascii=False)
+        # One O_APPEND write per save keeps lines from concurrent writers whole
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, lines.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+def read_metrics(path=METRICS_PATH, run_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Records from a metrics JSONL file, optionally only one run's."""
+    path = Path(path)
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    return [r for r in records if run_id is None or r.get("run_id") == run_id]
 
 def ensure_dir(p: Path):
     p.mkdir(parents=True, exist_ok=True)
@@ -44,33 +157,59 @@ def write_text(p: Path, text: str):
     ensure_dir(p.parent)
     p.write_text(text, encoding="utf-8")
 
+_EVIDENCE_SVG = SvgTemplate(
+    '<svg xmlns="http://www.w3.org/2000/svg" width="400" height="300">'
+    '<rect width="100%" height="100%" fill="#f8f9fa"/>'
+    '<text x="10" y="20" font-size="14" font-weight="bold">Evidence: {name}</text>'
+    '{lines}</svg>'
+)
+_EVIDENCE_FALLBACK_SVG = SvgTemplate(
+    '<svg xmlns="http://www.w3.org/2000/svg" width="320" height="160">'
+    '<rect width="100%" height="100%" fill="#e8f4f8"/>'
+    '<text x="10" y="80" font-size="14">Evidence for {name}</text></svg>'
+)
+
+def _render_evidence_svg(evidence):
+    name, data = evidence["name"], evidence["summary"]
+    if data and isinstance(data, dict):
+        lines = "".join(
+            f'<text x="20" y="{50 + 20 * i}" font-size="12">{escape(str(key))}: {escape(str(value))}</text>'
+            for i, (key, value) in enumerate(list(data.items())[:8])  # Show first 8 items
+        )
+        return _EVIDENCE_SVG.render(name=name, lines=Markup(lines))
+    return _EVIDENCE_FALLBACK_SVG.render(name=name)
+
+def _render_evidence_json(evidence_data):
+    return json.dumps(evidence_data, ensure_ascii=False, indent=2)
+
+def _render_placeholder(_):
+    return ""
+
 def make_evidence(base: Path, data=None, kind="svg"):
-    """Generate evidence files with actual data visualization"""
+    """Generate evidence files with actual data visualization
+
+    In lazy evidence mode (see ``_evidence``) nothing is rendered; the
+    payload is recorded in the evidence manifest instead. With an open
+    evidence bundle (see ``_bundle``) the files go into the bundle.
+    """
+    lazy = svg_mode() == "lazy"
     if kind == "svg":
-        if data and isinstance(data, dict):
-            # Create data-driven SVG
-            svg_parts = ['<svg xmlns="http://www.w3.org/2000/svg" width="400" height="300">']
-            svg_parts.append('<rect width="100%" height="100%" fill="#f8f9fa"/>')
-            svg_parts.append('<text x="10" y="20" font-size="14" font-weight="bold">Evidence: {}</text>'.format(base.name))
-            
-            y_pos = 50
-            for key, value in list(data.items())[:8]:  # Show first 8 items
-                svg_parts.append(f'<text x="20" y="{y_pos}" font-size="12">{key}: {value}</text>')
-                y_pos += 20
-            
-            svg_parts.append('</svg>')
-            svg = ''.join(svg_parts)
-        else:
-            svg = f'<svg xmlns="http://www.w3.org/2000/svg" width="320" height="160"><rect width="100%" height="100%" fill="#e8f4f8"/><text x="10" y="80" font-size="14">Evidence for {base.name}</text></svg>'
-        write_text(base.with_suffix(".svg"), svg)
-    else:
+        snapshot = dict(data) if isinstance(data, dict) else data
+        write_svg(base.with_suffix(".svg"), _render_evidence_svg, {"name": base.name, "summary": snapshot})
+    elif lazy:
+        _evidence.record(base.with_suffix(".png"), _render_placeholder)
+    elif not write_evidence(base.with_suffix(".png"), ""):
         # PNG placeholder
         write_text(base.with_suffix(".png"), "")
     
     evidence_data = {"ok": True, "target": base.name, "timestamp": datetime.now().isoformat()}
     if data:
         evidence_data["summary"] = data
-    write_json(base.parent / (base.stem + "_evidence.json"), evidence_data)
+    json_path = base.parent / (base.stem + "_evidence.json")
+    if lazy:
+        _evidence.record(json_path, _render_evidence_json, evidence_data)
+    elif not write_evidence(json_path, _render_evidence_json(evidence_data)):
+        write_json(json_path, evidence_data)
 
 def arg_parser():
     ap = argparse.ArgumentParser()
@@ -0,0 +1,660 @@
+#!/usr/bin/env python3
+"""
+Compiled XLSX templates with a streaming write path
+
+The template workbook is parsed once into a ``CompiledTemplate``: raw zip
+members, the sheet → part mapping and every ``<row>`` of the sheets we
+touch. Writing an estimate then patches the compiled parts directly and
+streams item rows into the zip, so no workbook object model is built and
+memory stays flat regardless of the number of line items.
+
+Item values are merged into the region's template rows, so cells outside
+the item columns survive. Item rows overflowing the ``Items.Start``–
+``Items.End`` region push the rows below it down; A1 references on that
+sheet into the moved rows (unqualified or qualified with the sheet's own
+name, in formulas on any row, shared-formula ranges, merged cells,
+hyperlinks, conditional formats, data validations and defined names) are
+shifted to match. References from other sheets are left as they are.
+"""
+import io
+import math
+import os
+import re
+import shutil
+import tempfile
+import threading
+import zipfile
+import xml.etree.ElementTree as ET
+from pathlib import Path, PurePosixPath
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from xml.sax.saxutils import escape, unescape
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, snapshots are best effort
+    fcntl = None
+
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_DOC_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+WORKBOOK_PART = "xl/workbook.xml"
+WORKBOOK_RELS = "xl/_rels/workbook.xml.rels"
+CONTENT_TYPES = "[Content_Types].xml"
+CALC_CHAIN = "xl/calcChain.xml"
+
+# Rows flushed to the zip stream per write call
+FLUSH_ROWS = 1000
+
+# Item rows kept in memory before spooling to disk (see _write_sheet)
+SPOOL_BYTES = 8 << 20
+
+_ROW_RE = re.compile(r"<row\b[^>]*?(?:/>|>.*?</row>)", re.S)
+_CELL_RE = re.compile(r"<c\b[^>]*?(?:/>|>.*?</c>)", re.S)
+_ROW_OPEN_RE = re.compile(r"<row\b[^>]*?(/?)>")
+_ROW_NUM_RE = re.compile(r'\br="(\d+)"')
+_CELL_REF_RE = re.compile(r'\br="([A-Z]+)(\d+)"')
+_STYLE_RE = re.compile(r'\bs="(\d+)"')
+_FORMULA_RE = re.compile(r"(<f\b[^>]*?(?<!/)>)(.*?)(</f>)", re.S)
+_FORMULA_REF_RE = re.compile(r'(\bref=")([^"]+)(")')
+_A1_BODY = (
+    r"(\$?)([A-Z]{1,3})(\$?)(\d+)"
+    r"(?::(\$?)([A-Z]{1,3})(\$?)(\d+))?(?![A-Za-z0-9_(])"
+)
+_A1_RE = re.compile(r"(?<![A-Za-z0-9_.!$])" + _A1_BODY)
+# An A1 reference with an optional ``Sheet!`` / ``'Sheet name'!`` prefix
+_QUALIFIED_A1_RE = re.compile(
+    r"(?<![A-Za-z0-9_.!$'])((?:'(?:[^']|'')+'|[A-Za-z_][A-Za-z0-9_.]*)!)?" + _A1_BODY
+)
+# Range attributes and formulas after <sheetData> that address cells
+_TAIL_REFS_RE = re.compile(
+    r'(<(?:mergeCell|hyperlink)\b[^>]*\bref="|<(?:conditionalFormatting|dataValidation)\b[^>]*\bsqref=")'
+    r'([^"]+)(")'
+    r"|(<(?:formula[12]?|xm:f|xm:sqref)>)(.*?)(</(?:formula[12]?|xm:f|xm:sqref)>)",
+    re.S,
+)
+_DEFINED_NAMES_RE = re.compile(r"<definedNames\b.*?(?:/>|</definedNames>)", re.S)
+_PLAIN_SHEET_NAME = re.compile(r"^[A-Za-z_][A-Za-z0-9_.]*$")
+
+
+def column_index(letters: str) -> int:
+    """Convert column letters (``A``, ``AB``) to a 1-based index."""
+    index = 0
+    for ch in letters:
+        index = index * 26 + (ord(ch) - 64)
+    return index
+
+
+def column_letter(index: int) -> str:
+    """Convert a 1-based column index to letters."""
+    letters = ""
+    while index:
+        index, rem = divmod(index - 1, 26)
+        letters = chr(65 + rem) + letters
+    return letters
+
+
+def split_ref(ref: str) -> Tuple[int, int]:
+    """Split an A1 reference (``$`` allowed) into (row, column)."""
+    match = _A1_RE.fullmatch(ref.replace("$", "")) if ref else None
+    if not match or match.group(5) is not None:
+        raise ValueError(f"Invalid cell reference: {ref}")
+    return int(match.group(4)), column_index(match.group(2))
+
+
+def quote_sheet(name: str) -> str:
+    """Quote a sheet name for use in a defined name."""
+    if _PLAIN_SHEET_NAME.match(name):
+        return name
+    return "'" + name.replace("'", "''") + "'"
+
+
+def _prefix_sheet(prefix: str) -> str:
+    """Sheet name of a ``Sheet!`` / ``'Sheet name'!`` prefix (XML-escaped text)."""
+    name = unescape(prefix[:-1], {"&apos;": "'", "&quot;": '"'})
+    if name.startswith("'"):
+        name = name[1:-1].replace("''", "'")
+    return name
+
+
+def shift_refs(text: str, end_row: int, delta: int, sheet: Optional[str] = None) -> str:
+    """
+    Move A1 references at or below ``end_row`` down by ``delta`` rows.
+
+    Unqualified references always move; ``Sheet!A1`` references move only
+    when they name ``sheet`` (the sheet whose rows moved).
+    """
+    if not delta:
+        return text
+
+    def move(row: str) -> str:
+        return str(int(row) + delta) if int(row) >= end_row else row
+
+    def repl(m: re.Match) -> str:
+        prefix = m.group(1)
+        if prefix is not None and (sheet is None or _prefix_sheet(prefix) != sheet):
+            return m.group(0)
+        first = f"{prefix or ''}{m.group(2)}{m.group(3)}{m.group(4)}{move(m.group(5))}"
+        if m.group(6) is None:
+            return first
+        return f"{first}:{m.group(6)}{m.group(7)}{m.group(8)}{move(m.group(9))}"
+
+    return _QUALIFIED_A1_RE.sub(repl, text)
+
+
+def _shift_formulas(row_xml: str, end_row: int, delta: int, sheet: Optional[str] = None) -> str:
+    """Shift references in a row's formulas, including shared-formula ``ref`` ranges."""
+    if not delta:
+        return row_xml
+
+    def formula(m: re.Match) -> str:
+        tag = _FORMULA_REF_RE.sub(
+            lambda r: r.group(1) + shift_refs(r.group(2), end_row, delta) + r.group(3), m.group(1))
+        return tag + shift_refs(m.group(2), end_row, delta, sheet) + m.group(3)
+
+    return _FORMULA_RE.sub(formula, row_xml)
+
+
+def _shift_tail(tail_xml: str, end_row: int, delta: int, sheet: str) -> str:
+    """Shift the cell ranges and formulas that follow ``<sheetData>``."""
+    if not delta:
+        return tail_xml
+
+    def repl(m: re.Match) -> str:
+        if m.group(1) is not None:
+            return m.group(1) + shift_refs(m.group(2), end_row, delta) + m.group(3)
+        return m.group(4) + shift_refs(m.group(5), end_row, delta, sheet) + m.group(6)
+
+    return _TAIL_REFS_RE.sub(repl, tail_xml)
+
+
+def read_snapshot(path: Path) -> bytes:
+    """Read a file in one go under a shared advisory lock.
+
+    Tools that update templates in place should take ``LOCK_EX`` on the
+    file; readers then never see a half-written workbook.
+    """
+    with open(path, "rb") as f:
+        if fcntl is None:
+            return f.read()
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH)
+        try:
+            return f.read()
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _cell_value_xml(ref: str, value: Any, style: Optional[str]) -> str:
+    """
+    Serialise one cell, keeping the template style index.
+
+    Raises:
+        ValueError: For NaN or infinite numbers (XLSX has no representation)
+    """
+    s = f' s="{style}"' if style is not None else ""
+    if value is None:
+        return f'<c r="{ref}"{s}/>'
+    if isinstance(value, bool):
+        return f'<c r="{ref}"{s} t="b"><v>{int(value)}</v></c>'
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"Cell {ref}: non-finite number {value!r}")
+        return f'<c r="{ref}"{s}><v>{value!r}</v></c>'
+    text = escape(str(value))
+    return f'<c r="{ref}"{s} t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+
+class CompiledSheet:
+    """One worksheet part split into head, indexed rows and tail."""
+
+    def __init__(self, name: str, part: str, xml: str):
+        self.name = name
+        self.part = part
+
+        xml = re.sub(r"<sheetData\s*/>", "<sheetData></sheetData>", xml, count=1)
+        start = xml.index("<sheetData")
+        start = xml.index(">", start) + 1
+        end = xml.index("</sheetData>")
+
+        self.head = xml[:start]
+        self.tail = xml[end:]
+        self.rows: Dict[int, str] = {}
+        for row in _ROW_RE.findall(xml, start, end):
+            self.rows[int(_ROW_NUM_RE.search(row).group(1))] = row
+
+    def row_styles(self, row: int) -> Dict[int, str]:
+        """Column → style index for the cells of a template row."""
+        styles = {}
+        for cell in _CELL_RE.findall(self.rows.get(row, "")):
+            ref = _CELL_REF_RE.search(cell)
+            style = _STYLE_RE.search(cell)
+            if ref and style:
+                styles[column_index(ref.group(1))] = style.group(1)
+        return styles
+
+
+class CompiledTemplate:
+    """Immutable template snapshot, reusable for any number of writes.
+
+    Writers only read the snapshot, so one instance can be shared between
+    threads.
+    """
+
+    def __init__(self, path: Path, members: Sequence[Tuple[zipfile.ZipInfo, bytes]],
+                 sheet_parts: Dict[str, str]):
+        self.path = path
+        self.members = tuple(members)
+        self.sheet_parts = sheet_parts
+        self._sheets: Dict[str, CompiledSheet] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return list(self.sheet_parts)
+
+    def member(self, name: str) -> bytes:
+        for info, data in self.members:
+            if info.filename == name:
+                return data
+        raise KeyError(name)
+
+    def sheet(self, name: str) -> CompiledSheet:
+        """Parsed rows of a worksheet (parsed on first use and kept)."""
+        with self._lock:
+            if name not in self._sheets:
+                part = self.sheet_parts[name]
+                xml = self.member(part).decode("utf-8")
+                self._sheets[name] = CompiledSheet(name, part, xml)
+            return self._sheets[name]
+
+
+def _sheet_parts(workbook_xml: bytes, rels_xml: bytes) -> Dict[str, str]:
+    """Map sheet names to their worksheet part names."""
+    targets = {}
+    for rel in ET.fromstring(rels_xml).iter(f"{{{NS_PKG_REL}}}Relationship"):
+        target = rel.get("Target", "")
+        if target.startswith("/"):
+            target = target[1:]
+        else:
+            target = str(PurePosixPath("xl") / target)
+        targets[rel.get("Id")] = target
+
+    sheet_parts = {}
+    for sheet in ET.fromstring(workbook_xml).iter(f"{{{NS_MAIN}}}sheet"):
+        rid = sheet.get(f"{{{NS_DOC_REL}}}id")
+        if rid in targets:
+            sheet_parts[sheet.get("name")] = targets[rid]
+    return sheet_parts
+
+
+def compile_template(path: Path, sheets: Iterable[str] = (),
+                     data: Optional[bytes] = None) -> CompiledTemplate:
+    """
+    Parse an XLSX template once.
+
+    Args:
+        path: Template workbook
+        sheets: Sheet names to pre-parse (others are parsed on first use)
+        data: Snapshot of the file contents (read from ``path`` if omitted)
+
+    Returns:
+        CompiledTemplate
+
+    Raises:
+        ValueError: If the file is not a usable XLSX workbook
+    """
+    path = Path(path)
+    try:
+        if data is None:
+            data = read_snapshot(path)
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            members = [(info, zf.read(info)) for info in zf.infolist()]
+    except (OSError, zipfile.BadZipFile) as e:
+        raise ValueError(f"Cannot read template {path}: {e}") from e
+
+    parts = {info.filename: blob for info, blob in members}
+    if WORKBOOK_PART not in parts or WORKBOOK_RELS not in parts:
+        raise ValueError(f"Not an XLSX workbook: {path}")
+
+    sheet_parts = _sheet_parts(parts[WORKBOOK_PART], parts[WORKBOOK_RELS])
+    compiled = CompiledTemplate(path, members, sheet_parts)
+    for name in sheets:
+        if name in sheet_parts:
+            compiled.sheet(name)
+    return compiled
+
+
+class ItemRegion:
+    """Rectangular item block (``Items.Start``–``Items.End``) on one sheet."""
+
+    def __init__(self, sheet: str, start_ref: str, end_ref: str, fields: Sequence[str]):
+        self.sheet = sheet
+        self.start_row, self.start_col = split_ref(start_ref)
+        self.end_row, self.end_col = split_ref(end_ref)
+        if self.end_row < self.start_row or self.end_col < self.start_col:
+            raise ValueError(f"Invalid item region {start_ref}:{end_ref}")
+        self.fields = list(fields)[: self.end_col - self.start_col + 1]
+
+    @property
+    def capacity(self) -> int:
+        return self.end_row - self.start_row + 1
+
+
+def _patch_row(row_xml: Optional[str], row: int, values: Dict[int, Any],
+               styles: Optional[Dict[int, str]] = None) -> str:
+    """Set cell values in one row, keeping other cells and styles.
+
+    ``styles`` (column → style index) applies to set cells the row has no
+    styled cell for.
+    """
+    cells: Dict[int, str] = {}
+    open_tag = f'<row r="{row}">'
+    if row_xml:
+        m = _ROW_OPEN_RE.match(row_xml)
+        open_tag = m.group(0).replace("/>", ">") if m.group(1) else m.group(0)
+        for cell in _CELL_RE.findall(row_xml):
+            cells[column_index(_CELL_REF_RE.search(cell).group(1))] = cell
+
+    for col, value in values.items():
+        style = _STYLE_RE.search(cells.get(col, ""))
+        cells[col] = _cell_value_xml(f"{column_letter(col)}{row}", value,
+                                     style.group(1) if style else (styles or {}).get(col))
+
+    return open_tag + "".join(cells[c] for c in sorted(cells)) + "</row>"
+
+
+def _shift_row(row_xml: str, delta: int) -> str:
+    """Renumber a template row (and its formulas) ``delta`` rows down."""
+    def renumber(m: re.Match) -> str:
+        return f'r="{int(m.group(1)) + delta}"'
+
+    def recell(m: re.Match) -> str:
+        return f'r="{m.group(1)}{int(m.group(2)) + delta}"'
+
+    row_xml = _CELL_REF_RE.sub(recell, row_xml)
+    return _ROW_NUM_RE.sub(renumber, row_xml, count=1)
+
+
+def _item_rows(sheet: CompiledSheet, region: ItemRegion,
+               items: Iterable[Dict[str, Any]]) -> Iterator[Tuple[int, str]]:
+    """Yield (row number, xml) for the item block.
+
+    Items are merged into the region's template rows (other cells of the
+    row are kept); overflow rows get the first item row's cell styles.
+    """
+    styles = sheet.row_styles(region.start_row)
+    row = region.start_row - 1
+    for row, item in enumerate(items, start=region.start_row):
+        values = {region.start_col + offset: item.get(field) for offset, field in enumerate(region.fields)}
+        template_row = sheet.rows.get(row) if row <= region.end_row else None
+        yield row, _patch_row(template_row, row, values, styles)
+
+    # Leave unused template rows of the region as they are
+    for spare in range(row + 1, region.end_row + 1):
+        if spare in sheet.rows:
+            yield spare, sheet.rows[spare]
+
+
+def _write_sheet(fh, sheet: CompiledSheet, cells: Dict[Tuple[int, int], Any],
+                 region: Optional[ItemRegion], items: Iterable[Dict[str, Any]]) -> int:
+    """Stream one patched sheet part into ``fh``; returns rows added."""
+    by_row: Dict[int, Dict[int, Any]] = {}
+    for (row, col), value in cells.items():
+        by_row.setdefault(row, {})[col] = value
+    all_rows = sorted(set(sheet.rows) | set(by_row))
+
+    buffer: List[str] = []
+
+    def emit(xml: str):
+        buffer.append(xml)
+        if len(buffer) >= FLUSH_ROWS:
+            flush()
+
+    def flush():
+        fh.write("".join(buffer).encode("utf-8"))
+        buffer.clear()
+
+    delta = 0
+
+    def emit_row(row: int, target: int):
+        xml = sheet.rows.get(row)
+        if xml is not None and delta:
+            if target != row:
+                xml = _shift_row(xml, target - row)
+            xml = _shift_formulas(xml, region.end_row, delta, sheet.name)
+        emit(_patch_row(xml, target, by_row[row]) if row in by_row else xml)
+
+    if region is None:
+        fh.write(sheet.head.encode("utf-8"))
+        for row in all_rows:
+            emit_row(row, row)
+        flush()
+        fh.write(sheet.tail.encode("utf-8"))
+        return 0
+
+    # Rows above the region may hold formulas into the rows below it, and
+    # the shift is known only once the items are consumed: spool the item
+    # rows first (in memory up to SPOOL_BYTES), then write in sheet order
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_BYTES) as spool:
+        last = region.start_row - 1
+        for row, xml in _item_rows(sheet, region, items):
+            spool.write(xml.encode("utf-8"))
+            last = max(last, row)
+        delta = max(0, last - region.end_row)
+
+        # The optional <dimension> hint would be stale; drop it
+        fh.write(re.sub(r"<dimension\b[^>]*/>", "", sheet.head, count=1).encode("utf-8"))
+        for row in all_rows:
+            if row < region.start_row:
+                emit_row(row, row)
+        flush()
+        spool.seek(0)
+        shutil.copyfileobj(spool, fh)
+
+    for row in all_rows:
+        if row > region.end_row:
+            emit_row(row, row + delta)
+    flush()
+
+    fh.write(_shift_tail(sheet.tail, region.end_row, delta, sheet.name).encode("utf-8"))
+    return delta
+
+
+def _defined_names_xml(names: Dict[str, Tuple[str, str]]) -> str:
+    if not names:
+        return ""
+    parts = []
+    for name, (sheet, ref) in names.items():
+        row, col = split_ref(ref)
+        target = f"{quote_sheet(sheet)}!${column_letter(col)}${row}"
+        parts.append(f'<definedName name="{escape(name)}">{escape(target)}</definedName>')
+    return "<definedNames>" + "".join(parts) + "</definedNames>"
+
+
+def _patch_workbook(xml: str, names: Dict[str, Tuple[str, str]]) -> str:
+    """Replace the workbook's defined names."""
+    xml = _DEFINED_NAMES_RE.sub("", xml)
+    block = _defined_names_xml(names)
+    for anchor in ("</externalReferences>", "</sheets>"):
+        if anchor in xml:
+            return xml.replace(anchor, anchor + block, 1)
+    return xml
+
+
+def _drop_calc_chain(name: str, data: bytes) -> bytes:
+    """Remove calcChain references; it is stale once cells move."""
+    xml = data.decode("utf-8")
+    if name == CONTENT_TYPES:
+        xml = re.sub(r'<Override\b[^>]*PartName="/xl/calcChain.xml"[^>]*/>', "", xml)
+    else:
+        xml = re.sub(r'<Relationship\b[^>]*Target="/?(?:xl/)?calcChain.xml"[^>]*/>', "", xml)
+    return xml.encode("utf-8")
+
+
+def write_workbook(compiled: CompiledTemplate, out_path: Path,
+                   cells: Dict[str, Dict[str, Any]],
+                   names: Dict[str, Tuple[str, str]],
+                   region: Optional[ItemRegion] = None,
+                   items: Iterable[Dict[str, Any]] = ()) -> int:
+    """
+    Stream a filled-in copy of a compiled template to ``out_path``.
+
+    The workbook is written to a temporary file next to ``out_path`` and
+    renamed into place, so concurrent readers never see a partial file and
+    the last of several writers to the same path wins.
+
+    Args:
+        compiled: Template from ``compile_template``
+        out_path: Destination workbook
+        cells: {sheet: {A1 ref: value}} single-cell values
+        names: {defined name: (sheet, A1 ref)} replacing existing names
+        region: Item block to fill (optional)
+        items: Item dicts, consumed lazily in order
+
+    Returns:
+        Rows inserted below the item region (0 if the items fit)
+
+    Raises:
+        ValueError: If ``out_path`` is the template itself
+    """
+    sheet_cells = _split_cells(cells)
+    out_path = Path(out_path)
+    if out_path.resolve() == Path(compiled.path).resolve():
+        raise ValueError(f"Refusing to overwrite template {compiled.path}")
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out_path.with_name(f".{out_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        delta = _write_zip(compiled, tmp_path, sheet_cells, names, region, items)
+        os.replace(tmp_path, out_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+    return delta
+
+
+def stream_workbook(compiled: CompiledTemplate, fh: BinaryIO,
+                    cells: Dict[str, Dict[str, Any]],
+                    names: Dict[str, Tuple[str, str]],
+                    region: Optional[ItemRegion] = None,
+                    items: Iterable[Dict[str, Any]] = ()) -> int:
+    """
+    Stream a filled-in copy of a compiled template into a binary file object.
+
+    Same arguments as ``write_workbook`` with ``fh`` (e.g. ``io.BytesIO``) in
+    place of ``out_path``, for callers that ship the workbook as bytes.
+
+    Returns:
+        Rows inserted below the item region (0 if the items fit)
+    """
+    return _write_zip(compiled, fh, _split_cells(cells), names, region, items)
+
+
+def _split_cells(cells: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[Tuple[int, int], Any]]:
+    return {sheet: {split_ref(ref): value for ref, value in refs.items()}
+            for sheet, refs in cells.items()}
+
+
+def _member_info(info: zipfile.ZipInfo) -> zipfile.ZipInfo:
+    """Fresh ZipInfo for one write; ZipFile mutates the one it is given."""
+    clone = zipfile.ZipInfo(info.filename, info.date_time)
+    clone.compress_type = zipfile.ZIP_DEFLATED
+    clone.external_attr = info.external_attr
+    return clone
+
+
+def _write_zip(compiled: CompiledTemplate, out: Union[Path, BinaryIO],
+               sheet_cells: Dict[str, Dict[Tuple[int, int], Any]],
+               names: Dict[str, Tuple[str, str]],
+               region: Optional[ItemRegion], items: Iterable[Dict[str, Any]]) -> int:
+    patched = set(sheet_cells)
+    if region is not None:
+        patched.add(region.sheet)
+    patched_parts = {compiled.sheet_parts[s]: s for s in patched if s in compiled.sheet_parts}
+
+    delta = 0
+    workbook_info = None
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as zf:
+        for info, data in compiled.members:
+            name = info.filename
+            if name == CALC_CHAIN:
+                continue
+            if name == WORKBOOK_PART:
+                # Written last: defined names depend on the final row shift
+                workbook_info = (info, data)
+                continue
+            if name in patched_parts:
+                sheet = compiled.sheet(patched_parts[name])
+                sheet_region = region if region is not None and region.sheet == sheet.name else None
+                with zf.open(name, "w") as fh:
+                    added = _write_sheet(fh, sheet, sheet_cells.get(sheet.name, {}),
+                                         sheet_region, items if sheet_region else ())
+                delta = max(delta, added)
+                continue
+            if name in (CONTENT_TYPES, WORKBOOK_RELS):
+                data = _drop_calc_chain(name, data)
+            zf.writestr(_member_info(info), data)
+
+        info, data = workbook_info
+        moved = {}
+        for key, (sheet, ref) in names.items():
+            if region is not None and sheet == region.sheet:
+                ref = shift_refs(ref.replace("$", ""), region.end_row, delta)
+            moved[key] = (sheet, ref)
+        data = _patch_workbook(data.decode("utf-8"), moved).encode("utf-8")
+        zf.writestr(_member_info(info), data)
+    return delta
+
+
+def _cell_value(cell: ET.Element, shared: List[str]) -> Any:
+    kind = cell.get("t")
+    if kind == "inlineStr":
+        return "".join(t.text or "" for t in cell.iter(f"{{{NS_MAIN}}}t"))
+    v = cell.find(f"{{{NS_MAIN}}}v")
+    if v is None or v.text is None:
+        return None
+    if kind == "s":
+        return shared[int(v.text)]
+    if kind == "b":
+        return v.text == "1"
+    if kind in ("str", "e"):
+        return v.text
+    number = float(v.text)
+    return int(number) if number.is_integer() else number
+
+
+def read_cells(path: Path, sheets: Iterable[str]) -> Dict[Tuple[str, str], Any]:
+    """
+    Read back cell values of a workbook without building an object model.
+
+    Args:
+        path: Workbook to read
+        sheets: Sheet names to read
+
+    Returns:
+        dict: {(sheet, A1 ref): value} (cached values for formula cells)
+    """
+    cells: Dict[Tuple[str, str], Any] = {}
+    tag_c = f"{{{NS_MAIN}}}c"
+    tag_row = f"{{{NS_MAIN}}}row"
+
+    with zipfile.ZipFile(path) as zf:
+        names = set(zf.namelist())
+        sheet_parts = _sheet_parts(zf.read(WORKBOOK_PART), zf.read(WORKBOOK_RELS))
+
+        shared: List[str] = []
+        if "xl/sharedStrings.xml" in names:
+            root = ET.fromstring(zf.read("xl/sharedStrings.xml"))
+            for si in root.iter(f"{{{NS_MAIN}}}si"):
+                shared.append("".join(t.text or "" for t in si.iter(f"{{{NS_MAIN}}}t")))
+
+        for sheet in sheets:
+            if sheet not in sheet_parts:
+                continue
+            with zf.open(sheet_parts[sheet]) as fh:
+                for _, el in ET.iterparse(fh):
+                    if el.tag == tag_c:
+                        cells[(sheet, el.get("r"))] = _cell_value(el, shared)
+                    elif el.tag == tag_row:
+                        el.clear()
+    return cells
@@ -1,8 +1,9 @@
 #!/usr/bin/env python3
 import json
 from pathlib import Path
-from typing import Dict, List, Tuple
-from _util_io import write_json, read_json, make_evidence, log, write_text, arg_parser, MetricsCollector
+from typing import Dict, List, Optional, Tuple
+from _util_io import write_json, read_json, make_evidence, log, arg_parser, MetricsCollector
+from _svg import Markup, SvgTemplate, escape, write_svg
 
 # Critical thresholds - constants
 MAX_LIMITS = {
@@ -14,16 +15,20 @@ MAX_LIMITS = {
     "min_clearance_mm": 50
 }
 
-def critique_placement(work_dir) -> dict:
-    """Critique breaker placement against design rules."""
+def critique_placement(work_dir, placement: Optional[Dict] = None) -> dict:
+    """Critique breaker placement against design rules.
+
+    When ``placement`` is given (in-process pipeline), it is used as-is and
+    ``breaker_placement.json`` is not read back from disk.
+    """
     work_path = Path(work_dir)
 
     # Load placement result
     placement_file = work_path / "placement" / "breaker_placement.json"
-    if not placement_file.exists():
-        return {"error": "No placement file found", "violations": [], "warnings": []}
-
-    placement = read_json(placement_file)
+    if placement is None:
+        if not placement_file.exists():
+            return {"error": "No placement file found", "violations": [], "warnings": []}
+        placement = read_json(placement_file)
 
     violations = []
     warnings = []
@@ -140,52 +145,67 @@ def critique_placement(work_dir) -> dict:
 
     return critique_result
 
-def _generate_critique_svg(critique_result: Dict, violations: List[Dict]) -> str:
-    """Generate SVG visualization highlighting violations."""
-    svg_parts = [
-        '<svg xmlns="http://www.w3.org/2000/svg" width="600" height="400" viewBox="0 0 600 400">',
-        '<rect width="100%" height="100%" fill="#f8f8f8" stroke="#333" stroke-width="2"/>',
-        '<text x="300" y="30" text-anchor="middle" font-size="20" font-weight="bold">Placement Critique</text>'
-    ]
-
-    # Draw status indicator
-    status_color = "#4caf50" if critique_result["passed"] else "#f44336"
-    status_text = "PASSED" if critique_result["passed"] else "FAILED"
-    svg_parts.append(
-        f'<rect x="250" y="50" width="100" height="30" fill="{status_color}" rx="5"/>'
-    )
-    svg_parts.append(
-        f'<text x="300" y="70" text-anchor="middle" font-size="14" fill="white">{status_text}</text>'
-    )
-
-    # Draw score
-    svg_parts.append(
-        f'<text x="300" y="110" text-anchor="middle" font-size="16">Score: {critique_result["score"]}/100</text>'
-    )
-
-    # Draw violations
+_CRITIQUE_SVG = SvgTemplate("\n".join([
+    '<svg xmlns="http://www.w3.org/2000/svg" width="600" height="400" viewBox="0 0 600 400">',
+    '<rect width="100%" height="100%" fill="#f8f8f8" stroke="#333" stroke-width="2"/>',
+    '<text x="300" y="30" text-anchor="middle" font-size="20" font-weight="bold">Placement Critique</text>',
+    # Status indicator
+    '<rect x="250" y="50" width="100" height="30" fill="{status_color}" rx="5"/>',
+    '<text x="300" y="70" text-anchor="middle" font-size="14" fill="white">{status_text}</text>',
+    '<text x="300" y="110" text-anchor="middle" font-size="16">Score: {score}/100</text>',
+    '{violations}',
+    '<text x="50" y="320" font-size="14">Phase Imbalance: {imbalance:.2f}%</text>',
+    '<text x="50" y="340" font-size="14">Total Heat: {heat:.1f}W</text>',
+    '</svg>',
+]))
+
+def _generate_critique_svg(critique_result: Dict, violations: Optional[List[Dict]] = None) -> str:
+    """Generate SVG visualization highlighting violations (default: ``violation_details``)."""
+    if violations is None:
+        violations = critique_result.get("violation_details", [])
+    rows = []
     y_pos = 150
-    for i, violation in enumerate(violations[:5]):  # Show first 5 violations
+    for violation in violations[:5]:  # Show first 5 violations
         if isinstance(violation, dict):
-            svg_parts.append(
-                f'<circle cx="50" cy="{y_pos}" r="8" fill="#f44336"/>'
-            )
             msg = violation.get("message", "")[:50] if violation.get("message") else ""
-            svg_parts.append(
-                f'<text x="70" y="{y_pos + 5}" font-size="12">{violation.get("type", "unknown")}: {msg}...</text>'
+            rows.append(f'<circle cx="50" cy="{y_pos}" r="8" fill="#f44336"/>')
+            rows.append(
+                f'<text x="70" y="{y_pos + 5}" font-size="12">'
+                f'{escape(str(violation.get("type", "unknown")))}: {escape(msg)}...</text>'
             )
             y_pos += 30
 
-    # Draw metrics
-    svg_parts.append(
-        f'<text x="50" y="320" font-size="14">Phase Imbalance: {critique_result.get("phase_imbalance_pct", 0):.2f}%</text>'
-    )
-    svg_parts.append(
-        f'<text x="50" y="340" font-size="14">Total Heat: {critique_result.get("total_heat_w", 0):.1f}W</text>'
+    return _CRITIQUE_SVG.render(
+        status_color="#4caf50" if critique_result["passed"] else "#f44336",
+        status_text="PASSED" if critique_result["passed"] else "FAILED",
+        score=critique_result["score"],
+        violations=Markup("\n".join(rows)),
+        imbalance=critique_result.get("phase_imbalance_pct", 0),
+        heat=critique_result.get("total_heat_w", 0),
     )
 
-    svg_parts.append('</svg>')
-    return '\n'.join(svg_parts)
+def write_outputs(work: Path, result: dict) -> Path:
+    """Write critique JSON and its evidence artefacts under ``work``."""
+    out = work / "placement" / "breaker_critic.json"
+    write_json(out, result)
+
+    # Generate JSON evidence
+    evidence_data = {
+        "pass": result["passed"],
+        "score": result["score"],
+        "violations_count": len(result["violations"]),
+        "warnings_count": len(result["warnings"]),
+        "phase_imbalance": result["phase_imbalance_pct"]
+    }
+    make_evidence(out.with_suffix(""), evidence_data, "json")
+
+    # Generate SVG visualization if there are violations
+    if result.get("violation_details"):
+        svg_path = write_svg(out.with_suffix(".svg"), _generate_critique_svg, result, source=out)
+        if svg_path:
+            log(f"Critique visualization saved to {svg_path}", "INFO")
+
+    return out
 
 def main():
     ap = arg_parser()
@@ -196,25 +216,7 @@ def main():
 
     with metrics.timer("breaker_critic"):
         result = critique_placement(work)
-        out = work / "placement" / "breaker_critic.json"
-        write_json(out, result)
-
-        # Generate JSON evidence
-        evidence_data = {
-            "pass": result["passed"],
-            "score": result["score"],
-            "violations_count": len(result["violations"]),
-            "warnings_count": len(result["warnings"]),
-            "phase_imbalance": result["phase_imbalance_pct"]
-        }
-        make_evidence(out.with_suffix(""), evidence_data, "json")
-
-        # Generate SVG visualization if there are violations
-        if result.get("violation_details"):
-            svg_content = _generate_critique_svg(result, result["violation_details"])
-            svg_path = out.with_suffix(".svg")
-            write_text(svg_path, svg_content)
-            log(f"Critique visualization saved to {svg_path}", "INFO")
+        write_outputs(work, result)
 
         # Log summary
         if result["passed"]:
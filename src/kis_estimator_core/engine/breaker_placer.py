@@ -16,14 +16,31 @@ from _util_io import (
     log,
     arg_parser
 )
+from _svg import evidence_available, svg_mode
 from pathlib import Path as _P
 
-# Optional CP-SAT import
-try:
-    from ortools.sat.python import cp_model
-except ImportError:
-    cp_model = None
-    log("WARNING: OR-Tools not available, using fallback placement", "WARN")
+# Optional CP-SAT import, deferred until the first solve so that importing
+# this module (or the in-process pipeline) does not pay for OR-Tools
+_UNLOADED = object()
+_cp_model = _UNLOADED
+
+def _load_cp_model():
+    """Return ``ortools.sat.python.cp_model``, or None when OR-Tools is missing."""
+    global _cp_model
+    if _cp_model is _UNLOADED:
+        try:
+            from ortools.sat.python import cp_model
+        except ImportError:
+            cp_model = None
+            log("WARNING: OR-Tools not available, using fallback placement", "WARN")
+        _cp_model = cp_model
+    return _cp_model
+
+def __getattr__(name):
+    # Backwards compatible ``breaker_placer.cp_model``
+    if name == "cp_model":
+        return _load_cp_model()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Type definitions
 class BreakerSpec:
@@ -76,6 +93,7 @@ def _calculate_phase_imbalance(loads: Dict[str, float]) -> float:
 
 def _solve_with_cp_sat(breakers: List[BreakerSpec], panel: PanelSpec, seed: int) -> Optional[PlacementResult]:
     """Solve placement using OR-Tools CP-SAT solver."""
+    cp_model = _load_cp_model()
     if cp_model is None or not breakers:
         return None
 
@@ -296,7 +314,7 @@ def optimize_placement(work_dir) -> dict:
     best_result = None
 
     # Try CP-SAT with multiple seeds
-    if cp_model is not None:
+    if _load_cp_model() is not None:
         seeds = [42, 123, 789]  # 3 seed exploration
         for seed in seeds:
             log(f"Trying CP-SAT with seed {seed}", "INFO")
@@ -327,6 +345,48 @@ def optimize_placement(work_dir) -> dict:
 
     return result_dict
 
+def write_outputs(work: Path, result: dict) -> Path:
+    """Write placement JSON and its evidence artefacts under ``work``."""
+    out = work / "placement" / "breaker_placement.json"
+    write_json(out, result)
+
+    # Generate evidence
+    evidence_data = {
+        "phase_imbalance_pct": result["phase_imbalance_pct"],
+        "clearances_ok": result["clearances_violation"] == 0,
+        "thermal_ok": result["thermal_violation"] == 0,
+        "total_breakers": len(result["slots"])
+    }
+    make_evidence(out.with_suffix(""), evidence_data)
+
+    # --- Ensure minimal SVG exists (audit: SVG missing) ---
+    svg_path = out.with_suffix(".svg")
+    if svg_mode() == "eager" and not evidence_available(svg_path):
+        try:
+            svg_path.parent.mkdir(parents=True, exist_ok=True)
+            # very small, self-contained SVG with key metrics
+            _txt = (
+                f"solver={result.get('solver')}, "
+                f"imb={result.get('phase_imbalance_pct')}%, "
+                f"clear={result.get('clearances_violation')}, "
+                f"thermal={result.get('thermal_violation')}, "
+                f"n={len(result.get('slots', []))}"
+            )
+            svg = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="160">'
+                '<rect width="640" height="160" fill="#ffffff" stroke="#222"/>'
+                '<text x="20" y="50" font-family="Arial" font-size="18">breaker-placer</text>'
+                f'<text x="20" y="90" font-family="Arial" font-size="14">{_txt}</text>'
+                "</svg>"
+            )
+            svg_path.write_text(svg, encoding="utf-8")
+        except Exception:
+            # do not fail pipeline for SVG rendering
+            pass
+
+    return out
+
 def main():
     """CLI entry point."""
     ap = arg_parser()
@@ -337,43 +397,7 @@ def main():
 
     with metrics.timer("breaker_placer"):
         result = optimize_placement(work)
-        out = work / "placement" / "breaker_placement.json"
-        write_json(out, result)
-
-        # Generate evidence
-        evidence_data = {
-            "phase_imbalance_pct": result["phase_imbalance_pct"],
-            "clearances_ok": result["clearances_violation"] == 0,
-            "thermal_ok": result["thermal_violation"] == 0,
-            "total_breakers": len(result["slots"])
-        }
-        make_evidence(out.with_suffix(""), evidence_data)
-
-        # --- Ensure minimal SVG exists (audit: SVG missing) ---
-        svg_path = out.with_suffix(".svg")
-        if not svg_path.exists():
-            try:
-                svg_path.parent.mkdir(parents=True, exist_ok=True)
-                # very small, self-contained SVG with key metrics
-                _txt = (
-                    f"solver={result.get('solver')}, "
-                    f"imb={result.get('phase_imbalance_pct')}%, "
-                    f"clear={result.get('clearances_violation')}, "
-                    f"thermal={result.get('thermal_violation')}, "
-                    f"n={len(result.get('slots', []))}"
-                )
-                svg = (
-                    '<?xml version="1.0" encoding="UTF-8"?>'
-                    '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="160">'
-                    '<rect width="640" height="160" fill="#ffffff" stroke="#222"/>'
-                    '<text x="20" y="50" font-family="Arial" font-size="18">breaker-placer</text>'
-                    f'<text x="20" y="90" font-family="Arial" font-size="14">{_txt}</text>'
-                    "</svg>"
-                )
-                svg_path.write_text(svg, encoding="utf-8")
-            except Exception:
-                # do not fail pipeline for SVG rendering
-                pass
+        write_outputs(work, result)
 
         log(f"OK breaker-placer (imbalance={result['phase_imbalance_pct']}%)")
 
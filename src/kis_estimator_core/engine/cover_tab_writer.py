@@ -13,6 +13,7 @@ from _util_io import (
     make_evidence,
     log,
 )
+from _svg import evidence_available, svg_mode
 
 def _safe_get(d: Dict, path: str, default=None):
     cur = d
@@ -90,6 +91,43 @@ def _build_cover_payload(work_dir: Path) -> Dict[str, Any]:
         }
     }
 
+def write_outputs(work: Path, payload: Dict[str, Any]) -> Path:
+    """Write cover tab JSON and its evidence artefacts under ``work``."""
+    out = work / "cover" / "cover_tab.json"
+    write_json(out, payload)
+
+    # evidence + 최소 SVG 보장
+    make_evidence(out.with_suffix(""), {
+        "project": payload["cover_data"]["project"]["title"],
+        "client": payload["cover_data"]["project"]["client"],
+        "total":  payload["cover_data"]["financial"]["total"],
+        "prepared_by": payload["cover_data"]["signature"]["prepared_by"],
+        "project_number": payload["cover_data"]["project"]["number"],
+        "date": payload["cover_data"]["project"]["date"],
+        "subtotal": payload["cover_data"]["financial"]["totals"]["subtotal"],
+        "vat": payload["cover_data"]["financial"]["totals"]["vat"],
+        "compliance": payload["compliance"]["pass"],
+    })
+
+    svg_path = out.with_suffix(".svg")
+    if svg_mode() == "eager" and not evidence_available(svg_path):
+        try:
+            svg = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="180">'
+                '<rect width="640" height="180" fill="#fff" stroke="#222"/>'
+                '<text x="20" y="40" font-family="Arial" font-size="18">cover-tab</text>'
+                f'<text x="20" y="80" font-family="Arial" font-size="14">project={payload["cover_data"]["project"]["title"]}</text>'
+                f'<text x="20" y="105" font-family="Arial" font-size="14">client={payload["cover_data"]["project"]["client"]}</text>'
+                f'<text x="20" y="130" font-family="Arial" font-size="14">total={payload["cover_data"]["financial"]["total"]}</text>'
+                '</svg>'
+            )
+            svg_path.write_text(svg, encoding="utf-8")
+        except Exception:
+            pass
+
+    return out
+
 def main() -> None:
     ap = arg_parser()
     args = ap.parse_args()
@@ -99,38 +137,7 @@ def main() -> None:
     metrics = MetricsCollector()
     with metrics.timer("cover_tab_writer"):
         payload = _build_cover_payload(work)
-        out = work / "cover" / "cover_tab.json"
-        write_json(out, payload)
-
-        # evidence + 최소 SVG 보장
-        make_evidence(out.with_suffix(""), {
-            "project": payload["cover_data"]["project"]["title"],
-            "client": payload["cover_data"]["project"]["client"],
-            "total":  payload["cover_data"]["financial"]["total"],
-            "prepared_by": payload["cover_data"]["signature"]["prepared_by"],
-            "project_number": payload["cover_data"]["project"]["number"],
-            "date": payload["cover_data"]["project"]["date"],
-            "subtotal": payload["cover_data"]["financial"]["totals"]["subtotal"],
-            "vat": payload["cover_data"]["financial"]["totals"]["vat"],
-            "compliance": payload["compliance"]["pass"],
-        })
-
-        svg_path = out.with_suffix(".svg")
-        if not svg_path.exists():
-            try:
-                svg = (
-                    '<?xml version="1.0" encoding="UTF-8"?>'
-                    '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="180">'
-                    '<rect width="640" height="180" fill="#fff" stroke="#222"/>'
-                    '<text x="20" y="40" font-family="Arial" font-size="18">cover-tab</text>'
-                    f'<text x="20" y="80" font-family="Arial" font-size="14">project={payload["cover_data"]["project"]["title"]}</text>'
-                    f'<text x="20" y="105" font-family="Arial" font-size="14">client={payload["cover_data"]["project"]["client"]}</text>'
-                    f'<text x="20" y="130" font-family="Arial" font-size="14">total={payload["cover_data"]["financial"]["total"]}</text>'
-                    '</svg>'
-                )
-                svg_path.write_text(svg, encoding="utf-8")
-            except Exception:
-                pass
+        write_outputs(work, payload)
 
         if payload["compliance"]["pass"]:
             log("OK cover-tab-writer")
@@ -140,4 +147,4 @@ def main() -> None:
     metrics.save()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 import json
+import os
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Tuple
-from _util_io import write_json, read_json, make_evidence, log, write_text, arg_parser, MetricsCollector
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+from _util_io import write_json, read_json, make_evidence, log, arg_parser, MetricsCollector
+from _svg import Markup, SvgTemplate, available_evidence, escape, write_svg
 
 # Required fields for documents
 REQUIRED_FIELDS = {
@@ -20,85 +23,198 @@ REQUIRED_FIELDS = {
                ("format_lint.errors", "format_lint.errors")]
 }
 
-def lint_documents(work_dir) -> dict:
-    """Final document quality check with detailed error reporting."""
-    work_path = Path(work_dir)
+# Documents checked, relative to the work directory
+DOCUMENTS = {
+    "enclosure": "enclosure/enclosure_plan.json",
+    "placement": "placement/breaker_placement.json",
+    "critic": "placement/breaker_critic.json",
+    "format": "format/estimate_format.json",
+    "cover": "cover/cover_tab.json",
+    "spatial": "spatial/spatial_report.json",
+}
+
+# Evidence files per document: (directory, [svg name, evidence JSON name])
+_EVIDENCE_FILES = {
+    doc_name: (os.path.dirname(rel), [stem + ".svg", stem + "_evidence.json"])
+    for doc_name, rel in DOCUMENTS.items()
+    for stem in [os.path.splitext(os.path.basename(rel))[0]]
+}
+
+# Marker for a document that exists but is not valid JSON
+_INVALID = object()
+
+def _compile_field(field_path: str) -> Callable[[Any], Any]:
+    """
+    Accessor for a dotted field path, split once.
+
+    Mirrors the original walk: a missing key reads as ``{}``, and the
+    accessor returns None only when it meets an explicit null or a
+    non-dict on the way.
+    """
+    parts = tuple(field_path.split("."))
+
+    def get(data):
+        value = data
+        for part in parts:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part, {})
+            if value is None:
+                return None
+        return value
+
+    return get
+
+# REQUIRED_FIELDS compiled once at import: {doc: [(accessor, display_name)]}
+_REQUIRED_ACCESSORS = {
+    doc: [(_compile_field(field_path), display_name) for field_path, display_name in fields]
+    for doc, fields in REQUIRED_FIELDS.items()
+}
+
+def _check_enclosure(data: Dict, errors: List, warnings: List):
+    fit_score = data.get("selected_sku", {}).get("fit_score", 0)
+    if fit_score < 0.93:
+        errors.append(f"Enclosure fit_score {fit_score:.3f} below 0.93 threshold")
+        errors.append({
+            "doc": "enclosure",
+            "field": "fit_score",
+            "value": fit_score,
+            "threshold": 0.93,
+            "cause": "Suboptimal enclosure selection"
+        })
+
+def _check_placement(data: Dict, errors: List, warnings: List):
+    imbalance = data.get("phase_imbalance_pct", 100)
+    if imbalance > 4.0:
+        errors.append(f"Phase imbalance {imbalance:.2f}% exceeds 4.0%")
+    if data.get("clearances_violation", 1) > 0:
+        errors.append(f"Clearance violations: {data.get('clearances_violation')}")
+    if data.get("thermal_violation", 1) > 0:
+        errors.append(f"Thermal violations: {data.get('thermal_violation')}")
+
+def _check_critic(data: Dict, errors: List, warnings: List):
+    if not data.get("critic_pass", False) and not data.get("passed", False):
+        warnings.append(f"Critic validation failed: {len(data.get('violations', []))} violations")
+
+def _check_format(data: Dict, errors: List, warnings: List):
+    lint_errors = data.get("format_lint", {}).get("errors", 0)
+    if lint_errors > 0:
+        errors.append(f"Format lint errors: {lint_errors}")
+        for err in data.get("format_lint", {}).get("error_details", [])[:3]:
+            errors.append(f"  - {err}")
+
+def _check_cover(data: Dict, errors: List, warnings: List):
+    if not data.get("compliance", {}).get("pass", True):
+        errors.append(f"Cover compliance failed")
+
+# Document-specific checks
+_DOC_CHECKS = {
+    "enclosure": _check_enclosure,
+    "placement": _check_placement,
+    "critic": _check_critic,
+    "format": _check_format,
+    "cover": _check_cover,
+}
+
+def _field_completeness(cover_data: Any) -> Dict[str, bool]:
+    """Required cover fields present (all False for a missing/invalid cover)."""
+    field_checks = {
+        "project_name": False,
+        "client": False,
+        "totals": False,
+        "signature": False,
+        "date": False,
+        "project_number": False
+    }
+    if cover_data is None or cover_data is _INVALID:
+        return field_checks
+
+    try:
+        project = cover_data.get("cover_data", {}).get("project", {})
+        financial = cover_data.get("cover_data", {}).get("financial", {})
+        signature = cover_data.get("cover_data", {}).get("signature", {})
+
+        field_checks["project_name"] = bool(project.get("title"))
+        field_checks["client"] = bool(project.get("client"))
+        field_checks["date"] = bool(project.get("date"))
+        field_checks["project_number"] = bool(project.get("number"))
+        field_checks["totals"] = bool(financial.get("totals"))
+        field_checks["signature"] = bool(signature.get("prepared_by"))
+    except Exception:
+        pass
+    return field_checks
+
+def load_documents(work_dir, preloaded: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Read each lint document once.
+
+    Args:
+        work_dir: Work directory
+        preloaded: Documents already in memory (e.g. pipeline stage results),
+            by document name; only the others are read from disk
+
+    Returns:
+        dict: document name → parsed JSON, None when missing, or an
+        ``(_INVALID, message)`` tuple when unreadable
+    """
+    work = os.fspath(work_dir)
+    preloaded = preloaded or {}
+    documents = {}
+    for doc_name, rel in DOCUMENTS.items():
+        if preloaded.get(doc_name) is not None:
+            documents[doc_name] = preloaded[doc_name]
+            continue
+        try:
+            with open(os.path.join(work, rel), "rb") as f:
+                documents[doc_name] = json.loads(f.read())
+        except FileNotFoundError:
+            documents[doc_name] = None
+        except Exception as e:
+            documents[doc_name] = (_INVALID, str(e))
+    return documents
+
+def lint_loaded(work_dir, documents: Mapping[str, Any]) -> dict:
+    """
+    Lint documents that are already loaded (see ``load_documents``).
+
+    All per-document checks run in one pass over ``documents``; evidence
+    files are looked up with one directory listing per stage directory.
+    """
+    work = os.fspath(work_dir)
 
     errors = []
     warnings = []
     overflow_risks = []
     font_substitutions = []
-    
-    # Check all generated documents
-    documents = {
-        "enclosure": work_path / "enclosure" / "enclosure_plan.json",
-        "placement": work_path / "placement" / "breaker_placement.json",
-        "critic": work_path / "placement" / "breaker_critic.json",
-        "format": work_path / "format" / "estimate_format.json",
-        "cover": work_path / "cover" / "cover_tab.json",
-        "spatial": work_path / "spatial" / "spatial_report.json"
-    }
-    
     doc_status = {}
-    
-    for doc_name, doc_path in documents.items():
-        if not doc_path.exists():
+    cover_data = None
+
+    for doc_name in DOCUMENTS:
+        data = documents.get(doc_name)
+        if data is None:
             errors.append(f"Missing document: {doc_name}")
             doc_status[doc_name] = "MISSING"
             continue
-        
+        if isinstance(data, tuple) and data and data[0] is _INVALID:
+            errors.append(f"Invalid JSON in {doc_name}: {data[1]}")
+            doc_status[doc_name] = "INVALID"
+            if doc_name == "cover":
+                cover_data = _INVALID
+            continue
+
         try:
-            data = read_json(doc_path)
             doc_status[doc_name] = "OK"
+            if doc_name == "cover":
+                cover_data = data
 
             # Check required fields for each document type
-            if doc_name in REQUIRED_FIELDS:
-                for field_path, display_name in REQUIRED_FIELDS[doc_name]:
-                    value = data
-                    for part in field_path.split('.'):
-                        value = value.get(part, {}) if isinstance(value, dict) else None
-                        if value is None:
-                            break
-
-                    if value is None:
-                        errors.append(f"Missing required field: {display_name} in {doc_name}")
-
-            # Document-specific checks
-            if doc_name == "enclosure":
-                fit_score = data.get("selected_sku", {}).get("fit_score", 0)
-                if fit_score < 0.93:
-                    errors.append(f"Enclosure fit_score {fit_score:.3f} below 0.93 threshold")
-                    errors.append({
-                        "doc": "enclosure",
-                        "field": "fit_score",
-                        "value": fit_score,
-                        "threshold": 0.93,
-                        "cause": "Suboptimal enclosure selection"
-                    })
+            for get, display_name in _REQUIRED_ACCESSORS.get(doc_name, ()):
+                if get(data) is None:
+                    errors.append(f"Missing required field: {display_name} in {doc_name}")
 
-            elif doc_name == "placement":
-                imbalance = data.get("phase_imbalance_pct", 100)
-                if imbalance > 4.0:
-                    errors.append(f"Phase imbalance {imbalance:.2f}% exceeds 4.0%")
-                if data.get("clearances_violation", 1) > 0:
-                    errors.append(f"Clearance violations: {data.get('clearances_violation')}")
-                if data.get("thermal_violation", 1) > 0:
-                    errors.append(f"Thermal violations: {data.get('thermal_violation')}")
-
-            elif doc_name == "critic":
-                if not data.get("critic_pass", False) and not data.get("passed", False):
-                    warnings.append(f"Critic validation failed: {len(data.get('violations', []))} violations")
-
-            elif doc_name == "format":
-                lint_errors = data.get("format_lint", {}).get("errors", 0)
-                if lint_errors > 0:
-                    errors.append(f"Format lint errors: {lint_errors}")
-                    for err in data.get("format_lint", {}).get("error_details", [])[:3]:
-                        errors.append(f"  - {err}")
-
-            elif doc_name == "cover":
-                if not data.get("compliance", {}).get("pass", True):
-                    errors.append(f"Cover compliance failed")
+            check = _DOC_CHECKS.get(doc_name)
+            if check is not None:
+                check(data, errors, warnings)
 
             # Check for text overflow risks
             for key, value in data.items():
@@ -113,44 +229,18 @@ def lint_documents(work_dir) -> dict:
         except Exception as e:
             errors.append(f"Invalid JSON in {doc_name}: {str(e)}")
             doc_status[doc_name] = "INVALID"
-    
-    # Check evidence files
-    evidence_count = 0
-    for doc_path in documents.values():
-        if doc_path.exists():
-            svg_path = doc_path.with_suffix(".svg")
-            json_path = doc_path.parent / (doc_path.stem + "_evidence.json")
-            if svg_path.exists():
-                evidence_count += 1
-            if json_path.exists():
-                evidence_count += 1
-    
-    # Comprehensive field completeness checks
-    field_checks = {
-        "project_name": False,
-        "client": False,
-        "totals": False,
-        "signature": False,
-        "date": False,
-        "project_number": False
-    }
 
-    cover_file = documents["cover"]
-    if cover_file.exists():
-        try:
-            cover_data = read_json(cover_file)
-            project = cover_data.get("cover_data", {}).get("project", {})
-            financial = cover_data.get("cover_data", {}).get("financial", {})
-            signature = cover_data.get("cover_data", {}).get("signature", {})
-
-            field_checks["project_name"] = bool(project.get("title"))
-            field_checks["client"] = bool(project.get("client"))
-            field_checks["date"] = bool(project.get("date"))
-            field_checks["project_number"] = bool(project.get("number"))
-            field_checks["totals"] = bool(financial.get("totals"))
-            field_checks["signature"] = bool(signature.get("prepared_by"))
-        except:
-            pass
+    # Check evidence files (deferred or lazily recorded ones count as present)
+    evidence_paths = [
+        os.path.join(work, directory, name)
+        for doc_name, (directory, names) in _EVIDENCE_FILES.items()
+        if documents.get(doc_name) is not None
+        for name in names
+    ]
+    evidence_count = len(available_evidence(evidence_paths))
+
+    # Comprehensive field completeness checks (cover already loaded above)
+    field_checks = _field_completeness(cover_data)
 
     incomplete_fields = [k for k, v in field_checks.items() if not v]
     if incomplete_fields:
@@ -158,17 +248,17 @@ def lint_documents(work_dir) -> dict:
 
     # Font substitution check (simulated)
     for doc_name in ["cover", "format"]:
-        doc_path = documents.get(doc_name)
-        if doc_path and doc_path.exists():
+        doc_path = os.path.join(work, DOCUMENTS[doc_name])
+        if documents.get(doc_name) is not None:
             # Simulate font check
-            if "Arial" not in str(doc_path):  # Placeholder logic
+            if "Arial" not in doc_path:  # Placeholder logic
                 font_substitutions.append({
                     "doc": doc_name,
                     "original_font": "Calibri",
                     "substituted_font": "Arial",
                     "reason": "Font not embedded"
                 })
-    
+
     # Calculate quality metrics
     total_errors = len([e for e in errors if isinstance(e, str)])
     total_warnings = len(warnings)
@@ -192,81 +282,191 @@ def lint_documents(work_dir) -> dict:
         "status": "PASS" if total_errors == 0 else "FAIL",
         "quality_score": quality_score,
         "validation_summary": {
-            "documents_checked": len(documents),
+            "documents_checked": len(DOCUMENTS),
             "documents_valid": sum(1 for v in doc_status.values() if v == "OK"),
             "required_fields_complete": sum(1 for v in field_checks.values() if v),
             "required_fields_total": len(field_checks)
         }
     }
-    
+
     return result
 
-def _generate_lint_report_svg(result: Dict) -> str:
-    """Generate SVG visualization of lint results."""
-    svg_parts = [
-        '<svg xmlns="http://www.w3.org/2000/svg" width="700" height="500" viewBox="0 0 700 500">',
-        '<rect width="100%" height="100%" fill="#f9f9f9" stroke="#333" stroke-width="2"/>',
-        '<text x="350" y="30" text-anchor="middle" font-size="22" font-weight="bold">Document Lint Report</text>'
-    ]
+def lint_documents(work_dir, documents: Optional[Mapping[str, Any]] = None) -> dict:
+    """
+    Final document quality check with detailed error reporting.
+
+    Args:
+        work_dir: Work directory holding the stage JSON files
+        documents: Stage results already in memory, by document name
+            (enclosure/placement/critic/format/cover/spatial); documents
+            not given are read from ``work_dir``
+    """
+    return lint_loaded(work_dir, load_documents(work_dir, documents))
+
+def _lint_one(work_dir: str) -> dict:
+    """``lint_documents`` for batch workers: a crash becomes an ERROR result."""
+    try:
+        return lint_documents(work_dir)
+    except Exception as e:
+        return {"status": "ERROR", "pass": False, "error": f"{type(e).__name__}: {e}"}
+
+def lint_many(work_dirs: Iterable, max_workers: int = 4, use_processes: bool = True,
+              report: Optional[Path] = None) -> Dict[str, dict]:
+    """
+    Lint many quotes' work directories on a worker pool.
+
+    Workers import this module once, so the compiled rules are built once
+    per worker and reused for every quote it handles; work directories are
+    handed out in chunks to keep pool overhead per quote small. A quote
+    whose lint crashes gets an ``ERROR`` result instead of failing the batch.
+
+    Args:
+        work_dirs: Work directories, one per quote
+        max_workers: Pool size
+        use_processes: Lint on processes (JSON parsing is CPU-bound);
+            threads otherwise
+        report: Optional consolidated report (see ``write_lint_report``)
+
+    Returns:
+        dict: work directory (str) → lint result, in input order
+    """
+    work_dirs = [str(w) for w in work_dirs]
+    if use_processes and len(work_dirs) > 1:
+        pool = ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        pool = ThreadPoolExecutor(max_workers=max_workers)
+    chunksize = max(1, len(work_dirs) // (max_workers * 4))
+    with pool:
+        results = dict(zip(work_dirs, pool.map(_lint_one, work_dirs, chunksize=chunksize)))
+
+    if report is not None:
+        write_lint_report(results, report)
+    return results
+
+def lint_summary(work_dir: str, result: Dict) -> Dict[str, Any]:
+    """One report row: the per-quote status of a lint result."""
+    return {
+        "work_dir": work_dir,
+        "status": result.get("status", "ERROR"),
+        "pass": bool(result.get("pass", False)),
+        "errors": result.get("errors"),
+        "warnings": result.get("warnings"),
+        "quality_score": result.get("quality_score"),
+        "evidence_files": result.get("evidence_files"),
+        "documents_valid": result.get("validation_summary", {}).get("documents_valid"),
+        "error_details": [e for e in result.get("error_details", []) if isinstance(e, str)]
+                         or ([result["error"]] if "error" in result else []),
+    }
 
-    # Status indicator
-    status_color = "#4caf50" if result["pass"] else "#f44336"
-    status_text = "PASS" if result["pass"] else "FAIL"
-    svg_parts.append(
-        f'<rect x="300" y="50" width="100" height="35" fill="{status_color}" rx="5"/>'
-    )
-    svg_parts.append(
-        f'<text x="350" y="73" text-anchor="middle" font-size="16" fill="white">{status_text}</text>'
-    )
+def write_lint_report(results: Mapping[str, Dict], path: Path) -> Path:
+    """
+    Write one row per quote (``lint_summary``) to a consolidated report.
 
-    # Quality score
-    svg_parts.append(
-        f'<text x="350" y="115" text-anchor="middle" font-size="18">Quality Score: {result["quality_score"]}/100</text>'
-    )
+    ``.parquet`` is written with polars; any other suffix as JSON Lines.
+
+    Raises:
+        RuntimeError: Parquet requested but polars is not installed
+    """
+    path = Path(path)
+    rows = [lint_summary(work_dir, result) for work_dir, result in results.items()]
+    path.parent.mkdir(parents=True, exist_ok=True)
 
-    # Document status grid
-    y_pos = 150
-    svg_parts.append('<text x="50" y="' + str(y_pos) + '" font-size="16" font-weight="bold">Document Status:</text>')
-    y_pos += 25
+    if path.suffix == ".parquet":
+        try:
+            import polars as pl
+        except ImportError as e:
+            raise RuntimeError("Parquet lint reports need polars; use a .jsonl report") from e
+        pl.DataFrame(rows, schema={
+            "work_dir": pl.Utf8, "status": pl.Utf8, "pass": pl.Boolean,
+            "errors": pl.Int64, "warnings": pl.Int64, "quality_score": pl.Int64,
+            "evidence_files": pl.Int64, "documents_valid": pl.Int64,
+            "error_details": pl.List(pl.Utf8),
+        }).write_parquet(path)
+    else:
+        with open(path, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row, ensure_ascii=False) + "\n")
+
+    passed = sum(1 for row in rows if row["pass"])
+    log(f"Lint report: {passed}/{len(rows)} quotes passed → {path}")
+    return path
+
+_LINT_REPORT_SVG = SvgTemplate("\n".join([
+    '<svg xmlns="http://www.w3.org/2000/svg" width="700" height="500" viewBox="0 0 700 500">',
+    '<rect width="100%" height="100%" fill="#f9f9f9" stroke="#333" stroke-width="2"/>',
+    '<text x="350" y="30" text-anchor="middle" font-size="22" font-weight="bold">Document Lint Report</text>',
+    '<rect x="300" y="50" width="100" height="35" fill="{status_color}" rx="5"/>',
+    '<text x="350" y="73" text-anchor="middle" font-size="16" fill="white">{status_text}</text>',
+    '<text x="350" y="115" text-anchor="middle" font-size="18">Quality Score: {quality_score}/100</text>',
+    '<text x="50" y="150" font-size="16" font-weight="bold">Document Status:</text>',
+    '{documents}',
+    '<text x="400" y="150" font-size="16" font-weight="bold">Issues:</text>',
+    '<text x="400" y="175" font-size="14">Errors: {errors}</text>',
+    '<text x="400" y="195" font-size="14">Warnings: {warnings}</text>',
+    '<text x="400" y="215" font-size="14">Evidence Files: {evidence_files}</text>',
+    '{completeness}</svg>',
+]))
+_COMPLETENESS_BAR_WIDTH = 300
+_COMPLETENESS_SVG = SvgTemplate(
+    '<text x="50" y="380" font-size="14">Field Completeness: {complete}/{total}</text>\n'
+    f'<rect x="50" y="400" width="{_COMPLETENESS_BAR_WIDTH}" height="20" fill="#e0e0e0" stroke="#333"/>\n'
+    '<rect x="50" y="400" width="{filled_width}" height="20" fill="#4caf50"/>\n'
+)
 
+def _generate_lint_report_svg(result: Dict) -> str:
+    """Generate SVG visualization of lint results."""
+    documents = []
+    y_pos = 175
     for doc, status in result.get("documents", {}).items():
         color = "#4caf50" if status == "OK" else "#f44336" if status == "MISSING" else "#ff9800"
-        svg_parts.append(
-            f'<circle cx="70" cy="{y_pos}" r="6" fill="{color}"/>'
-        )
-        svg_parts.append(
-            f'<text x="90" y="{y_pos + 5}" font-size="14">{doc}: {status}</text>'
-        )
+        documents.append(f'<circle cx="70" cy="{y_pos}" r="6" fill="{color}"/>')
+        documents.append(f'<text x="90" y="{y_pos + 5}" font-size="14">{escape(str(doc))}: {escape(str(status))}</text>')
         y_pos += 25
 
-    # Error summary
-    y_pos = 150
-    svg_parts.append(f'<text x="400" y="{y_pos}" font-size="16" font-weight="bold">Issues:</text>')
-    y_pos += 25
-    svg_parts.append(f'<text x="400" y="{y_pos}" font-size="14">Errors: {result["errors"]}</text>')
-    y_pos += 20
-    svg_parts.append(f'<text x="400" y="{y_pos}" font-size="14">Warnings: {result["warnings"]}</text>')
-    y_pos += 20
-    svg_parts.append(f'<text x="400" y="{y_pos}" font-size="14">Evidence Files: {result["evidence_files"]}</text>')
-
     # Field completeness bar
-    y_pos = 380
     complete = sum(1 for v in result.get("field_completeness", {}).values() if v)
     total = len(result.get("field_completeness", {}))
+    completeness = ""
     if total > 0:
-        bar_width = 300
-        filled_width = int((complete / total) * bar_width)
-        svg_parts.append(f'<text x="50" y="{y_pos}" font-size="14">Field Completeness: {complete}/{total}</text>')
-        y_pos += 20
-        svg_parts.append(
-            f'<rect x="50" y="{y_pos}" width="{bar_width}" height="20" fill="#e0e0e0" stroke="#333"/>'
-        )
-        svg_parts.append(
-            f'<rect x="50" y="{y_pos}" width="{filled_width}" height="20" fill="#4caf50"/>'
+        completeness = _COMPLETENESS_SVG.render(
+            complete=complete,
+            total=total,
+            filled_width=int((complete / total) * _COMPLETENESS_BAR_WIDTH),
         )
 
-    svg_parts.append('</svg>')
-    return '\n'.join(svg_parts)
+    return _LINT_REPORT_SVG.render(
+        status_color="#4caf50" if result["pass"] else "#f44336",
+        status_text="PASS" if result["pass"] else "FAIL",
+        quality_score=result["quality_score"],
+        documents=Markup("\n".join(documents)),
+        errors=result["errors"],
+        warnings=result["warnings"],
+        evidence_files=result["evidence_files"],
+        completeness=Markup(completeness),
+    )
+
+def write_outputs(work: Path, result: Dict) -> Path:
+    """Write lint result JSON and its evidence artefacts under ``work``."""
+    out = work / "lint" / "doc_lint_result.json"
+    write_json(out, result)
+
+    # Generate JSON evidence
+    evidence_data = {
+        "errors": result["errors"],
+        "warnings": result["warnings"],
+        "documents_ok": sum(1 for v in result['documents'].values() if v == 'OK'),
+        "documents_total": len(result['documents']),
+        "quality_score": result["quality_score"],
+        "status": "PASS" if result["pass"] else "FAIL"
+    }
+    make_evidence(out.with_suffix(""), evidence_data, "json")
+
+    # Generate SVG report
+    svg_path = write_svg(out.with_suffix(".svg"), _generate_lint_report_svg, result, source=out)
+    if svg_path:
+        log(f"Lint report visualization saved to {svg_path}", "INFO")
+
+    return out
 
 def main():
     """CLI entry point."""
@@ -278,25 +478,7 @@ def main():
 
     with metrics.timer("doc_lint_guard"):
         result = lint_documents(work)
-        out = work / "lint" / "doc_lint_result.json"
-        write_json(out, result)
-
-        # Generate JSON evidence
-        evidence_data = {
-            "errors": result["errors"],
-            "warnings": result["warnings"],
-            "documents_ok": sum(1 for v in result['documents'].values() if v == 'OK'),
-            "documents_total": len(result['documents']),
-            "quality_score": result["quality_score"],
-            "status": "PASS" if result["pass"] else "FAIL"
-        }
-        make_evidence(out.with_suffix(""), evidence_data, "json")
-
-        # Generate SVG report
-        svg_content = _generate_lint_report_svg(result)
-        svg_path = out.with_suffix(".svg")
-        write_text(svg_path, svg_content)
-        log(f"Lint report visualization saved to {svg_path}", "INFO")
+        write_outputs(work, result)
 
         # Log summary
         if result["pass"]:
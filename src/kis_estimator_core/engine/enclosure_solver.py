@@ -2,6 +2,7 @@
 from pathlib import Path
 import json, time, random
 from _util_io import ensure_dir, write_json, read_json, make_evidence, arg_parser, MetricsCollector, log
+from _svg import evidence_available, svg_mode
 from pathlib import Path as _P
 
 def calculate_enclosure(work_dir: Path, rules_dir: Path) -> dict:
@@ -63,6 +64,44 @@ def calculate_enclosure(work_dir: Path, rules_dir: Path) -> dict:
     
     return result
 
+def write_outputs(work: Path, result: dict) -> Path:
+    """Write enclosure plan JSON and its evidence artefacts under ``work``."""
+    out = work / "enclosure" / "enclosure_plan.json"
+    write_json(out, result)
+
+    # Generate evidence with key metrics
+    evidence_data = {
+        "fit_score": result["selected_sku"]["fit_score"],
+        "ip_rating": result["requirements"]["ip_rating"],
+        "zones": len(result["zones"]),
+        "violations": len(result["violations"])
+    }
+    make_evidence(out.with_suffix(""), evidence_data)
+
+    # --- Ensure minimal SVG exists (audit: SVG missing) ---
+    svg_path = out.with_suffix(".svg")
+    if svg_mode() == "eager" and not evidence_available(svg_path):
+        try:
+            svg_path.parent.mkdir(parents=True, exist_ok=True)
+            sku = result.get("selected_sku", {})
+            _txt = (
+                f"sku={sku.get('id','?')}, fit={sku.get('fit_score','?')}, "
+                f"{sku.get('width_mm','?')}x{sku.get('height_mm','?')}mm"
+            )
+            svg = (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="160">'
+                '<rect width="640" height="160" fill="#ffffff" stroke="#222"/>'
+                '<text x="20" y="50" font-family="Arial" font-size="18">enclosure-solver</text>'
+                f'<text x="20" y="90" font-family="Arial" font-size="14">{_txt}</text>'
+                "</svg>"
+            )
+            svg_path.write_text(svg, encoding="utf-8")
+        except Exception:
+            pass
+
+    return out
+
 def main():
     ap = arg_parser()
     args = ap.parse_args()
@@ -73,39 +112,7 @@ def main():
     
     with metrics.timer("enclosure_solver"):
         result = calculate_enclosure(work, rules)
-        out = work / "enclosure" / "enclosure_plan.json"
-        write_json(out, result)
-        
-        # Generate evidence with key metrics
-        evidence_data = {
-            "fit_score": result["selected_sku"]["fit_score"],
-            "ip_rating": result["requirements"]["ip_rating"],
-            "zones": len(result["zones"]),
-            "violations": len(result["violations"])
-        }
-        make_evidence(out.with_suffix(""), evidence_data)
-
-        # --- Ensure minimal SVG exists (audit: SVG missing) ---
-        svg_path = out.with_suffix(".svg")
-        if not svg_path.exists():
-            try:
-                svg_path.parent.mkdir(parents=True, exist_ok=True)
-                sku = result.get("selected_sku", {})
-                _txt = (
-                    f"sku={sku.get('id','?')}, fit={sku.get('fit_score','?')}, "
-                    f"{sku.get('width_mm','?')}x{sku.get('height_mm','?')}mm"
-                )
-                svg = (
-                    '<?xml version="1.0" encoding="UTF-8"?>'
-                    '<svg xmlns="http://www.w3.org/2000/svg" width="640" height="160">'
-                    '<rect width="640" height="160" fill="#ffffff" stroke="#222"/>'
-                    '<text x="20" y="50" font-family="Arial" font-size="18">enclosure-solver</text>'
-                    f'<text x="20" y="90" font-family="Arial" font-size="14">{_txt}</text>'
-                    "</svg>"
-                )
-                svg_path.write_text(svg, encoding="utf-8")
-            except Exception:
-                pass
+        write_outputs(work, result)
         
         if result["constraints_satisfied"]:
             log(f"OK enclosure-solver (fit_score={result['selected_sku']['fit_score']})")
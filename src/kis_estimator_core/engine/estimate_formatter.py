@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
+import hashlib
+import importlib.util
 import json
+import threading
 import time
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from _util_io import write_json, read_json, make_evidence, log, write_text, arg_parser, MetricsCollector
-
-# Try to import openpyxl for Excel manipulation
-try:
-    import openpyxl
-    from openpyxl.workbook.defined_name import DefinedName
-    from openpyxl.utils import quote_sheetname, absolute_coordinate
-    HAS_OPENPYXL = True
-except ImportError:
-    HAS_OPENPYXL = False
-    log("WARNING: openpyxl not available, using fallback formatting", "WARN")
+from _util_io import write_json, read_json, make_evidence, log, arg_parser, MetricsCollector
+from _svg import SvgTemplate, write_svg
+from _xlsx_template import (
+    CompiledTemplate, ItemRegion, column_letter, compile_template, read_cells, read_snapshot,
+    shift_refs, write_workbook,
+)
+from _pricing import compare_cells, load_markup, price_items
+
+# openpyxl is optional and heavy; workbooks are written by the streaming
+# template writer, so its availability is only reported
+_HAS_OPENPYXL = None
+
+def _has_openpyxl() -> bool:
+    """Whether openpyxl is installed (checked once, without importing it)."""
+    global _HAS_OPENPYXL
+    if _HAS_OPENPYXL is None:
+        _HAS_OPENPYXL = importlib.util.find_spec("openpyxl") is not None
+    return _HAS_OPENPYXL
+
+def __getattr__(name):
+    # Backwards compatible ``estimate_formatter.HAS_OPENPYXL``
+    if name == "HAS_OPENPYXL":
+        return _has_openpyxl()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Named range specification
 class NamedRangeSpec:
@@ -64,64 +80,166 @@ def _load_named_ranges(templates_dir: Path) -> List[NamedRangeSpec]:
 
     return ranges
 
-def _apply_named_ranges_with_openpyxl(
-    workbook_path: Path, range_specs: List[NamedRangeSpec], estimate_data: Dict
-) -> Tuple[int, List[str]]:
-    """Apply named ranges using openpyxl library."""
-    if not HAS_OPENPYXL or not workbook_path.exists():
-        return 0, [spec.name for spec in range_specs]
+TEMPLATE_FILES = ("NamedRanges.yaml", "EstimateTemplate.xlsx")
 
-    failed = []
-    applied = 0
+class EstimateTemplate:
+    """Named ranges and compiled workbook of one templates directory."""
+    def __init__(self, range_specs: List[NamedRangeSpec],
+                 workbook: Optional[CompiledTemplate] = None, error: Optional[str] = None):
+        self.range_specs = range_specs
+        self.workbook = workbook
+        self.error = error
+
+def _file_stat(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+def _snapshot(path: Path) -> Optional[bytes]:
+    return read_snapshot(path) if path.exists() else None
+
+def _digest(data: Optional[bytes]) -> Optional[str]:
+    return hashlib.sha256(data).hexdigest() if data is not None else None
+
+class TemplateRegistry:
+    """Cache of compiled estimate templates per templates directory.
+
+    Entries are checked by mtime+size on every lookup; a changed stat falls
+    back to a SHA-256 of the file so touched-but-identical templates are
+    not recompiled. The workbook is compiled from the same locked snapshot
+    that was hashed, so the cached template never mixes two versions of
+    the file. Compiled templates are shared read-only between estimates;
+    each write streams its own copy.
+    """
+    def __init__(self):
+        self._entries: Dict[Path, Dict] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, templates_dir: Path) -> EstimateTemplate:
+        key = Path(templates_dir).resolve()
+        files = [key / name for name in TEMPLATE_FILES]
+        stats = [_file_stat(f) for f in files]
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry["stats"] == stats:
+                self.hits += 1
+                return entry["template"]
+
+            snapshots = [_snapshot(f) for f in files]
+            hashes = [_digest(data) for data in snapshots]
+            if entry and entry["hashes"] == hashes:
+                entry["stats"] = stats
+                self.hits += 1
+                return entry["template"]
+
+            self.misses += 1
+            template = _compile_estimate_template(key, snapshots[1])
+            self._entries[key] = {"stats": stats, "hashes": hashes, "template": template}
+            return template
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+def _compile_estimate_template(templates_dir: Path, snapshot: Optional[bytes]) -> EstimateTemplate:
+    """Parse NamedRanges.yaml and the workbook snapshot once."""
+    range_specs = _load_named_ranges(templates_dir)
+    if snapshot is None:
+        return EstimateTemplate(range_specs)
 
     try:
-        wb = openpyxl.load_workbook(workbook_path)
-
-        # Remove existing named ranges
-        for named_range in list(wb.defined_names):
-            del wb.defined_names[named_range]
-
-        # Add new named ranges
-        for spec in range_specs:
-            try:
-                # Create fully qualified reference
-                ref = f"{quote_sheetname(spec.sheet)}!{absolute_coordinate(spec.ref)}"
-
-                # Create defined name
-                defined_name = DefinedName(spec.name, attr_text=ref)
-                wb.defined_names.append(defined_name)
-                applied += 1
-
-                # Set cell value if specified
-                if spec.value and spec.sheet in wb.sheetnames:
-                    ws = wb[spec.sheet]
-                    cell = ws[spec.ref]
-
-                    # Map values from estimate_data
-                    if spec.name == "Project.Name":
-                        cell.value = estimate_data.get("project_name", "")
-                    elif spec.name == "Project.Client":
-                        cell.value = estimate_data.get("client", "")
-                    elif spec.name == "Totals.Net":
-                        cell.value = estimate_data.get("subtotal", 0)
-                    elif spec.name == "Totals.VAT":
-                        cell.value = estimate_data.get("vat", 0)
-                    elif spec.name == "Totals.Total":
-                        cell.value = estimate_data.get("total", 0)
-
-            except Exception as e:
-                log(f"Failed to apply range {spec.name}: {e}", "WARN")
-                failed.append(spec.name)
-
-        # Save workbook
-        wb.save(workbook_path)
-        wb.close()
+        workbook = compile_template(templates_dir / "EstimateTemplate.xlsx",
+                                    {spec.sheet for spec in range_specs}, snapshot)
+    except ValueError as e:
+        return EstimateTemplate(range_specs, error=str(e))
+    return EstimateTemplate(range_specs, workbook)
+
+# Process-wide registry used by format_estimate
+TEMPLATES = TemplateRegistry()
+
+# Named ranges whose cells are filled from estimate data
+RANGE_FIELDS = {
+    "Project.Name": "project_name",
+    "Project.Client": "client",
+    "Project.Date": "date",
+    "Project.Number": "project_number",
+    "Totals.Net": "subtotal",
+    "Totals.VAT": "vat",
+    "Totals.Total": "total",
+}
+
+# Item fields written left to right from Items.Start
+ITEM_FIELDS = ("no", "desc", "spec", "unit", "qty", "unit_price", "remark", "total")
+
+# Totals cells are written from the pricing kernel (markups applied), not
+# the stated values
+KERNEL_FIELDS = {"Totals.Net": "subtotal", "Totals.VAT": "vat", "Totals.Total": "total"}
+
+# Item fields cross-checked in the workbook ("total" against the kernel)
+CHECKED_ITEM_FIELDS = ("desc", "qty", "unit_price", "total")
+
+def _numbered_items(items: List[Dict], line_totals: Optional[List[float]] = None):
+    """Item rows with a running line number and missing totals filled in."""
+    for no, item in enumerate(items, start=1):
+        row = item if "no" in item else {"no": no, **item}
+        if line_totals is not None and row.get("total") is None:
+            row = {**row, "total": line_totals[no - 1]}
+        yield row
+
+def _item_region(range_specs: List[NamedRangeSpec]) -> Optional[ItemRegion]:
+    specs = {spec.name: spec for spec in range_specs}
+    start, end = specs.get("Items.Start"), specs.get("Items.End")
+    if start and end and start.sheet == end.sheet:
+        return ItemRegion(start.sheet, start.ref, end.ref, ITEM_FIELDS)
+    return None
+
+def _apply_named_ranges_streaming(
+    compiled: CompiledTemplate, out_path: Path,
+    range_specs: List[NamedRangeSpec], estimate_data: Dict,
+    line_totals: Optional[List[float]] = None
+) -> Tuple[int, List[str], Optional[int]]:
+    """Write the estimate into a copy of the compiled template.
+
+    Line items are streamed into the Items.Start–Items.End region; scalar
+    ranges are filled from ``RANGE_FIELDS`` (or the spec's own value).
+
+    Returns:
+        (applied count, failed range names, rows added below the item
+        region or None if the workbook could not be written)
+    """
+    failed = []
+    names = {}
+    cells: Dict[str, Dict] = {}
+
+    for spec in range_specs:
+        if spec.sheet not in compiled.sheet_parts:
+            failed.append(spec.name)
+            continue
+        names[spec.name] = (spec.sheet, spec.ref)
+
+        value = estimate_data.get(RANGE_FIELDS[spec.name]) if spec.name in RANGE_FIELDS else spec.value
+        if value is not None and not spec.name.startswith("Items."):
+            cells.setdefault(spec.sheet, {})[spec.ref] = value
 
+    region = _item_region(range_specs)
+    if region is not None and region.sheet not in compiled.sheet_parts:
+        region = None
+
+    try:
+        added = write_workbook(
+            compiled, out_path, cells, names, region,
+            _numbered_items(estimate_data.get("items", []), line_totals),
+        )
     except Exception as e:
         log(f"Workbook operation failed: {e}", "ERROR")
-        return 0, [spec.name for spec in range_specs]
+        return 0, [spec.name for spec in range_specs], None
 
-    return applied, failed
+    return len(names), failed, added
 
 def _map_ranges(range_specs: List[NamedRangeSpec], workbook_state: Dict) -> Tuple[int, List[str]]:
     """Fallback named range mapping without openpyxl."""
@@ -141,33 +259,68 @@ def _map_ranges(range_specs: List[NamedRangeSpec], workbook_state: Dict) -> Tupl
 
     return applied, failed
 
-def _validate_sample_cells(estimate_data: Dict) -> Tuple[int, List[Dict]]:
-    """Validate 5 sample cells against expected values."""
-    sample_cells = [
-        {"ref": "B3", "sheet": "Cover", "expected": estimate_data.get("project_name", ""),
-         "actual": estimate_data.get("project_name", "")},
-        {"ref": "B4", "sheet": "Cover", "expected": estimate_data.get("client", ""),
-         "actual": estimate_data.get("client", "")},
-        {"ref": "H52", "sheet": "Estimate", "expected": estimate_data.get("subtotal", 0),
-         "actual": estimate_data.get("subtotal", 0)},
-        {"ref": "H53", "sheet": "Estimate", "expected": estimate_data.get("vat", 0),
-         "actual": estimate_data.get("vat", 0)},
-        {"ref": "H54", "sheet": "Estimate", "expected": estimate_data.get("total", 0),
-         "actual": estimate_data.get("total", 0)},
-    ]
-
-    differences = 0
-    for cell in sample_cells:
-        if cell["expected"] != cell["actual"]:
-            differences += 1
-            cell["match"] = False
-        else:
-            cell["match"] = True
+def _cell_values(estimate_data: Dict, pricing: Dict) -> Dict:
+    """Estimate data as written to the workbook: totals from the pricing kernel."""
+    return {**estimate_data, **{field: pricing[field] for field in KERNEL_FIELDS.values()}}
 
-    return differences, sample_cells
+def _cell_plan(range_specs: List[NamedRangeSpec], estimate_data: Dict,
+               pricing: Dict, rows_added: int = 0) -> List[Tuple[str, str, object, object]]:
+    """Every checked cell as (sheet, ref, expected, stated).
 
-def format_estimate(work_dir, templates_dir=None) -> dict:
-    """Format estimate with named ranges and validation."""
+    ``estimate_data`` holds the values written (see ``_cell_values``);
+    line totals are expected to match the pricing kernel.
+    """
+    region = _item_region(range_specs)
+    plan = []
+
+    for spec in range_specs:
+        if spec.name not in RANGE_FIELDS or estimate_data.get(RANGE_FIELDS[spec.name]) is None:
+            continue
+        value = estimate_data[RANGE_FIELDS[spec.name]]
+        ref = spec.ref.replace("$", "")
+        if region is not None and spec.sheet == region.sheet:
+            ref = shift_refs(ref, region.end_row, rows_added)
+        plan.append((spec.sheet, ref, value, value))
+
+    if region is not None:
+        columns = {field: column_letter(region.start_col + i) for i, field in enumerate(region.fields)}
+        checked = [f for f in CHECKED_ITEM_FIELDS if f in columns]
+        items = estimate_data.get("items", [])
+        for row, (item, line_total) in enumerate(zip(items, pricing["line_totals"]), start=region.start_row):
+            for field in checked:
+                stated = item.get(field)
+                expected = line_total if field == "total" else stated
+                if expected is not None:
+                    plan.append((region.sheet, f"{columns[field]}{row}", expected,
+                                 line_total if stated is None and field == "total" else stated))
+
+    return plan
+
+def _verify_cells(plan: List[Tuple[str, str, object, object]],
+                  workbook_path: Optional[Path]) -> Tuple[int, List[Dict]]:
+    """Compare every planned cell with the written workbook in one pass.
+
+    Without a workbook the stated estimate values stand in for the cells.
+    """
+    expected = [(sheet, ref, value) for sheet, ref, value, _ in plan]
+    if workbook_path is not None:
+        actual = read_cells(workbook_path, {sheet for sheet, _, _, _ in plan})
+    else:
+        actual = {(sheet, ref): stated for sheet, ref, _, stated in plan}
+    return compare_cells(expected, actual)
+
+def format_estimate(work_dir, templates_dir=None, output_path=None, rules_dir=None) -> dict:
+    """Format estimate with named ranges and validation.
+
+    When ``EstimateTemplate.xlsx`` exists it is compiled once and the filled
+    workbook is streamed to ``output_path`` (default
+    ``<work>/format/estimate.xlsx``). Totals are priced column-wise with the
+    ``pricing.markup`` rules from ``rules_dir``; the Totals cells carry the
+    priced (marked-up) values, every value written is read back and checked
+    (template formulas are left to Excel's recalculation and not checked),
+    and the stated subtotal/VAT are linted against the priced ones, so a
+    stated subtotal must include the markup.
+    """
     work_path = Path(work_dir)
     templates_path = Path(templates_dir) if templates_dir else Path("KIS/Templates")
 
@@ -194,44 +347,60 @@ def format_estimate(work_dir, templates_dir=None) -> dict:
             "total": 2860000
         }
 
-    # Load named range specifications
-    range_specs = _load_named_ranges(templates_path)
-
-    # Try to apply to actual Excel file if exists
-    excel_file = templates_path / "EstimateTemplate.xlsx"
-    if excel_file.exists() and HAS_OPENPYXL:
-        applied_count, failed_ranges = _apply_named_ranges_with_openpyxl(
-            excel_file, range_specs, estimate_data
+    # Named ranges and compiled workbook come from the template registry
+    template = TEMPLATES.get(templates_path)
+    range_specs = template.range_specs
+
+    # Price all lines at once
+    items = estimate_data.get("items", [])
+    pricing = price_items(items, load_markup(rules_dir))
+    cell_values = _cell_values(estimate_data, pricing)
+
+    # Stream into a copy of the Excel template if it exists
+    workbook_path = Path(output_path) if output_path else work_path / "format" / "estimate.xlsx"
+    workbook = None
+    if template.workbook is not None:
+        applied_count, failed_ranges, rows_added = _apply_named_ranges_streaming(
+            template.workbook, workbook_path, range_specs, cell_values, pricing["line_totals"]
         )
+        if rows_added is not None:
+            workbook = {"path": str(workbook_path), "rows_added": rows_added}
+    elif template.error:
+        log(f"Workbook operation failed: {template.error}", "ERROR")
+        applied_count, failed_ranges = 0, [spec.name for spec in range_specs]
     else:
         # Fallback simulation
         workbook_state = {
             "cells": {
                 "Cover!B3": estimate_data.get("project_name"),
                 "Cover!B4": estimate_data.get("client"),
-                "Estimate!H52": estimate_data.get("subtotal"),
-                "Estimate!H53": estimate_data.get("vat"),
-                "Estimate!H54": estimate_data.get("total"),
+                "Estimate!H52": cell_values["subtotal"],
+                "Estimate!H53": cell_values["vat"],
+                "Estimate!H54": cell_values["total"],
             }
         }
         applied_count, failed_ranges = _map_ranges(range_specs, workbook_state)
 
-    # Validate sample cells
-    cell_diff, sample_cells = _validate_sample_cells(estimate_data)
+    # Cross-check every written cell against the kernel
+    plan = _cell_plan(range_specs, cell_values, pricing, workbook["rows_added"] if workbook else 0)
+    cell_diff, diff_cells = _verify_cells(plan, workbook_path if workbook else None)
 
     # Lint checks
     errors = []
     warnings = []
 
-    # Check totals calculation
-    calculated_total = sum(item.get("total", 0) for item in estimate_data.get("items", []))
-    if abs(calculated_total - estimate_data.get("subtotal", 0)) > 1:
-        errors.append(f"Subtotal mismatch: calculated {calculated_total} vs stated {estimate_data.get('subtotal')}")
+    # Check line and subtotal calculation
+    if pricing["stated_mismatches"]:
+        errors.append(f"Line total mismatch on {len(pricing['stated_mismatches'])} item(s)")
+    if abs(pricing["subtotal"] - estimate_data.get("subtotal", 0)) > 1:
+        errors.append(
+            f"Subtotal mismatch: calculated {pricing['subtotal']} "
+            f"(net {pricing['net']} + markup {pricing['markup']}) vs stated {estimate_data.get('subtotal')}"
+        )
 
-    # Check VAT calculation (10%)
-    expected_vat = estimate_data.get("subtotal", 0) * 0.1
-    if abs(expected_vat - estimate_data.get("vat", 0)) > 1:
-        warnings.append(f"VAT calculation variance: expected {expected_vat:.0f}")
+    # Check VAT calculation (10% of the priced subtotal)
+    if abs(pricing["vat"] - estimate_data.get("vat", 0)) > 1:
+        warnings.append(f"VAT calculation variance: expected {pricing['vat']:.0f}")
 
     # Check required fields
     required_fields = ["project_name", "client", "subtotal", "vat", "total"]
@@ -260,66 +429,74 @@ def format_estimate(work_dir, templates_dir=None) -> dict:
             "error_details": errors,
             "warning_details": warnings
         },
+        "pricing": {k: v for k, v in pricing.items() if k not in ("line_totals", "stated_mismatches")},
         "sample_cells": {
-            "checked": len(sample_cells),
+            "checked": len(plan),
             "diff": cell_diff,
-            "cells": sample_cells,
-            "match_rate": (len(sample_cells) - cell_diff) / len(sample_cells) if sample_cells else 0
+            "cells": diff_cells,
+            "match_rate": (len(plan) - cell_diff) / len(plan) if plan else 0
         },
         "validation_pass": lint_errors == 0 and cell_diff == 0,
-        "openpyxl_available": HAS_OPENPYXL
+        "workbook": workbook,
+        "openpyxl_available": _has_openpyxl()
     }
 
     return result
 
+_ESTIMATE_SVG = SvgTemplate("\n".join([
+    '<svg xmlns="http://www.w3.org/2000/svg" width="500" height="400" viewBox="0 0 500 400">',
+    '<rect width="100%" height="100%" fill="#f0f9ff" stroke="#333" stroke-width="2"/>',
+    '<text x="250" y="30" text-anchor="middle" font-size="20" font-weight="bold">Estimate Format Report</text>',
+    '<rect x="200" y="50" width="100" height="30" fill="{status_color}" rx="5"/>',
+    '<text x="250" y="70" text-anchor="middle" font-size="14" fill="white">{status_text}</text>',
+    '<text x="50" y="120" font-size="16" font-weight="bold">Named Ranges:</text>',
+    '<text x="70" y="145" font-size="14">Applied: {applied}/{total}</text>',
+    '<text x="70" y="165" font-size="14">Coverage: {rate:.0f}%</text>',
+    '<text x="50" y="205" font-size="16" font-weight="bold">Format Lint:</text>',
+    '<text x="70" y="230" font-size="14">Errors: {errors}</text>',
+    '<text x="70" y="250" font-size="14">Warnings: {warnings}</text>',
+    '<text x="50" y="290" font-size="16" font-weight="bold">Sample Cells:</text>',
+    '<text x="70" y="315" font-size="14">Checked: {checked}</text>',
+    '<text x="70" y="335" font-size="14">Differences: {diff}</text>',
+    '</svg>',
+]))
+
 def _generate_estimate_svg(result: Dict) -> str:
     """Generate SVG visualization of estimate formatting results."""
-    svg_parts = [
-        '<svg xmlns="http://www.w3.org/2000/svg" width="500" height="400" viewBox="0 0 500 400">',
-        '<rect width="100%" height="100%" fill="#f0f9ff" stroke="#333" stroke-width="2"/>',
-        '<text x="250" y="30" text-anchor="middle" font-size="20" font-weight="bold">Estimate Format Report</text>'
-    ]
-
-    # Status indicator
-    status_color = "#4caf50" if result["validation_pass"] else "#f44336"
-    status_text = "PASS" if result["validation_pass"] else "FAIL"
-    svg_parts.append(
-        f'<rect x="200" y="50" width="100" height="30" fill="{status_color}" rx="5"/>'
-    )
-    svg_parts.append(
-        f'<text x="250" y="70" text-anchor="middle" font-size="14" fill="white">{status_text}</text>'
-    )
-
-    # Named ranges info
-    y = 120
-    svg_parts.append(f'<text x="50" y="{y}" font-size="16" font-weight="bold">Named Ranges:</text>')
-    y += 25
     nr = result.get("named_ranges", {})
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Applied: {nr.get("applied", 0)}/{nr.get("total", 0)}</text>')
-    y += 20
-    rate = nr.get("injection_rate", 0) * 100
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Coverage: {rate:.0f}%</text>')
-
-    # Lint info
-    y += 40
-    svg_parts.append(f'<text x="50" y="{y}" font-size="16" font-weight="bold">Format Lint:</text>')
-    y += 25
     lint = result.get("format_lint", {})
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Errors: {lint.get("errors", 0)}</text>')
-    y += 20
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Warnings: {lint.get("warnings", 0)}</text>')
-
-    # Sample cells
-    y += 40
-    svg_parts.append(f'<text x="50" y="{y}" font-size="16" font-weight="bold">Sample Cells:</text>')
-    y += 25
     cells = result.get("sample_cells", {})
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Checked: {cells.get("checked", 0)}</text>')
-    y += 20
-    svg_parts.append(f'<text x="70" y="{y}" font-size="14">Differences: {cells.get("diff", 0)}</text>')
+    return _ESTIMATE_SVG.render(
+        status_color="#4caf50" if result["validation_pass"] else "#f44336",
+        status_text="PASS" if result["validation_pass"] else "FAIL",
+        applied=nr.get("applied", 0),
+        total=nr.get("total", 0),
+        rate=nr.get("injection_rate", 0) * 100,
+        errors=lint.get("errors", 0),
+        warnings=lint.get("warnings", 0),
+        checked=cells.get("checked", 0),
+        diff=cells.get("diff", 0),
+    )
+
+def write_outputs(work: Path, result: Dict) -> Path:
+    """Write estimate format JSON and its evidence artefacts under ``work``."""
+    out = work / "format" / "estimate_format.json"
+    write_json(out, result)
+
+    # Generate evidence
+    evidence_data = {
+        "named_ranges_injected": result["named_ranges"]["applied"],
+        "named_ranges_total": result["named_ranges"]["total"],
+        "lint_errors": result["format_lint"]["errors"],
+        "sample_cells_diff": result["sample_cells"]["diff"],
+        "validation": "PASS" if result["validation_pass"] else "FAIL"
+    }
+    make_evidence(out.with_suffix(""), evidence_data, "json")
 
-    svg_parts.append('</svg>')
-    return '\n'.join(svg_parts)
+    # Generate SVG visualization
+    write_svg(out.with_suffix(".svg"), _generate_estimate_svg, result, source=out)
+
+    return out
 
 def main():
     """CLI entry point."""
@@ -327,28 +504,13 @@ def main():
     args = ap.parse_args()
     work = Path(args.work) if hasattr(args, 'work') else Path("KIS/Work/current")
     templates = Path(args.templates) if hasattr(args, 'templates') else Path("KIS/Templates")
+    rules = Path(args.rules) if hasattr(args, 'rules') else Path("KIS/Rules")
 
     metrics = MetricsCollector()
 
     with metrics.timer("estimate_formatter"):
-        result = format_estimate(work, templates)
-        out = work / "format" / "estimate_format.json"
-        write_json(out, result)
-
-        # Generate evidence
-        evidence_data = {
-            "named_ranges_injected": result["named_ranges"]["applied"],
-            "named_ranges_total": result["named_ranges"]["total"],
-            "lint_errors": result["format_lint"]["errors"],
-            "sample_cells_diff": result["sample_cells"]["diff"],
-            "validation": "PASS" if result["validation_pass"] else "FAIL"
-        }
-        make_evidence(out.with_suffix(""), evidence_data, "json")
-
-        # Generate SVG visualization
-        svg_content = _generate_estimate_svg(result)
-        svg_path = out.with_suffix(".svg")
-        write_text(svg_path, svg_content)
+        result = format_estimate(work, templates, rules_dir=rules)
+        write_outputs(work, result)
 
         # Log summary
         if result["validation_pass"]:
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""kis-engine: single-process runner for the FIX-4 engine stages.
+
+Usage:
+    kis_engine.py run [--work DIR] [--templates DIR] [--rules DIR]
+                      [--stages enclosure_solver,breaker_placer,...]
+                      [--jobs N] [--threads-only] [--force]
+                      [--svg eager|defer|lazy|skip] [--bundle]
+    kis_engine.py evidence [--work DIR] [PATH ...]
+    kis_engine.py lint [--root DIR] [--jobs N] [--threads-only] [--report FILE] [WORK ...]
+
+Every engine module is imported once and the selected stages run in this
+interpreter, instead of one process (and one OR-Tools/openpyxl import) per
+stage script. ``evidence`` renders artefacts recorded by a ``--svg lazy``
+run (all pending ones, or only the given paths). ``lint`` runs the document
+lint over many quotes' work directories on a worker pool and writes one
+consolidated JSONL/Parquet report.
+"""
+import argparse
+import os
+
+from _util_io import METRICS_PATH, arg_parser, log, MetricsCollector
+import _evidence
+from _bundle import close_bundle, open_bundle
+from _svg import SVG_MODES, render_deferred_svg, svg_mode
+
+import doc_lint_guard
+import pipeline
+
+# Quality gates checked after a run: stage -> its pass/fail result key (the
+# exit codes of the former breaker_critic.py / doc_lint_guard.py scripts)
+GATES = {"breaker_critic": "passed", "doc_lint_guard": "pass"}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="kis-engine")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", parents=[arg_parser()], add_help=False,
+                         help="Run engine stages in process")
+    run.add_argument("--stages", default="",
+                     help=f"Comma-separated subset of: {','.join(pipeline.STAGES)}")
+    run.add_argument("--jobs", type=int, default=1,
+                     help="Run independent stages concurrently on N workers (default: 1, sequential)")
+    run.add_argument("--threads-only", action="store_true",
+                     help="With --jobs, run CPU-bound stages on threads instead of processes")
+    run.add_argument("--force", action="store_true",
+                     help="Re-run stages even when their inputs are unchanged")
+    run.add_argument("--svg", choices=SVG_MODES, default=svg_mode(),
+                     help="Evidence: write per stage (eager), after all stages (defer), "
+                          "record in the evidence manifest for on-demand rendering (lazy) "
+                          "or skip SVGs (skip); default from KIS_EVIDENCE_SVG")
+    run.add_argument("--bundle", action="store_true",
+                     help="Write evidence into one <work>/evidence.zip instead of many files")
+
+    evidence = sub.add_parser("evidence", help="Render lazily recorded evidence artefacts")
+    evidence.add_argument("--work", default="KIS/Work/current")
+    evidence.add_argument("paths", nargs="*",
+                          help="Artefacts to render (default: every pending one under --work)")
+
+    lint = sub.add_parser("lint", help="Lint many quotes' work directories")
+    lint.add_argument("work_dirs", nargs="*", help="Quote work directories")
+    lint.add_argument("--root", help="Also lint every subdirectory of DIR")
+    lint.add_argument("--jobs", type=int, default=os.cpu_count() or 1,
+                      help="Worker pool size (default: CPU count)")
+    lint.add_argument("--threads-only", action="store_true",
+                      help="Lint on threads instead of processes")
+    lint.add_argument("--report", help="Consolidated report (.jsonl, or .parquet with polars)")
+    return ap
+
+
+def cmd_run(args) -> int:
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    try:
+        pipeline.select_stages(stages)
+    except ValueError as e:
+        log(str(e), "ERROR")
+        return 2
+
+    metrics = MetricsCollector()
+    try:
+        if args.jobs > 1:
+            results = pipeline.run_dag(args.work, args.templates, args.rules, stages=stages, metrics=metrics,
+                                       max_workers=args.jobs, use_processes=not args.threads_only,
+                                       force=args.force, svg=args.svg, bundle=args.bundle)
+        else:
+            results = pipeline.run_stages(args.work, args.templates, args.rules, stages=stages, metrics=metrics,
+                                          force=args.force, svg=args.svg, bundle=args.bundle)
+        if args.svg == "defer":
+            with metrics.timer("evidence_svg"):
+                bundle_token = open_bundle(args.work) if args.bundle else None
+                try:
+                    render_deferred_svg()
+                finally:
+                    if bundle_token is not None:
+                        close_bundle(bundle_token)
+    finally:
+        for name, step in metrics.metrics["steps"].items():
+            log(f"{name}: {step['ms']:.1f}ms {step['status']}")
+        metrics.save()
+        log(f"metrics: run {metrics.run_id} appended to {METRICS_PATH}")
+
+    failed = [stage for stage, key in GATES.items() if stage in results and not results[stage][key]]
+    if failed:
+        log(f"Quality gates failed: {', '.join(failed)}", "ERROR")
+        return 1
+    return 0
+
+
+def cmd_evidence(args) -> int:
+    try:
+        if args.paths:
+            written = [_evidence.materialize(path) for path in args.paths]
+        else:
+            written = _evidence.materialize_all(args.work)
+    except FileNotFoundError as e:
+        log(str(e), "ERROR")
+        return 1
+
+    for path in written:
+        log(f"evidence: {path}")
+    return 0
+
+
+def cmd_lint(args) -> int:
+    work_dirs = list(args.work_dirs)
+    if args.root:
+        work_dirs += sorted(e.path for e in os.scandir(args.root) if e.is_dir())
+    if not work_dirs:
+        log("No work directories to lint", "ERROR")
+        return 2
+
+    results = doc_lint_guard.lint_many(work_dirs, max_workers=args.jobs,
+                                       use_processes=not args.threads_only,
+                                       report=args.report)
+    failed = [work for work, result in results.items() if not result.get("pass")]
+    log(f"lint: {len(results) - len(failed)}/{len(results)} passed")
+    return 1 if failed else 0
+
+
+def main():
+    """CLI entry point."""
+    args = build_parser().parse_args()
+    if args.command == "run":
+        return cmd_run(args)
+    if args.command == "evidence":
+        return cmd_evidence(args)
+    if args.command == "lint":
+        return cmd_lint(args)
+    return 2
+
+
+if __name__ == "__main__":
+    exit(main())
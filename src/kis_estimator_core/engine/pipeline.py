@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""In-process FIX-4 pipeline passes.
+
+Stages hand their result dicts to each other directly instead of writing
+JSON and re-reading it in the next stage; files are written once, at the
+end, as evidence.
+"""
+import concurrent.futures as cf
+import contextvars
+import functools
+import hashlib
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from _util_io import arg_parser, log, read_json, write_json, MetricsCollector
+from _bundle import close_bundle, open_bundle
+from _svg import render_deferred_svg, reset_svg_mode, set_svg_mode, svg_mode
+
+import breaker_critic
+import breaker_placer
+import cover_tab_writer
+import doc_lint_guard
+import enclosure_solver
+import estimate_formatter
+import spatial_assistant
+
+
+class Stage:
+    """Engine stage: a compute function, its evidence writer and declared I/O.
+
+    ``inputs``/``outputs`` are paths relative to the work directory; a stage
+    depends on every other stage whose outputs it reads. ``templates`` and
+    ``rules`` name files under the templates/rules directories that also
+    feed the stage's content hash. ``executor`` is "process" for CPU-bound
+    stages and "thread" for I/O-bound ones.
+    """
+    def __init__(
+        self,
+        name: str,
+        compute: Callable[[Dict], dict],
+        write: Callable[[Path, dict], Path],
+        inputs: Iterable[str] = (),
+        outputs: Iterable[str] = (),
+        templates: Iterable[str] = (),
+        rules: Iterable[str] = (),
+        executor: str = "thread",
+    ):
+        self.name = name
+        self.compute = compute  # ctx -> result dict
+        self.write = write      # (work, result) -> output path
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        self.templates = tuple(templates)
+        self.rules = tuple(rules)
+        self.executor = executor
+
+
+MANIFEST = ".meta/stage_manifest.json"
+
+ENCLOSURE_PLAN = "enclosure/enclosure_plan.json"
+PLACEMENT = "placement/breaker_placement.json"
+CRITIQUE = "placement/breaker_critic.json"
+SPATIAL_REPORT = "spatial/spatial_report.json"
+ESTIMATE_FORMAT = "format/estimate_format.json"
+COVER_TAB = "cover/cover_tab.json"
+LINT_RESULT = "lint/doc_lint_result.json"
+
+# Lint document name → stage producing it; the lint stage reuses their
+# in-memory results instead of re-reading the JSON files.
+LINT_SOURCES = {
+    "enclosure": "enclosure_solver",
+    "placement": "breaker_placer",
+    "critic": "breaker_critic",
+    "format": "estimate_formatter",
+    "cover": "cover_tab_writer",
+    "spatial": "spatial_assistant",
+}
+
+# FIX-4 stages in canonical execution order. ``ctx["results"]`` carries the
+# results of stages already run in this process, so placement is handed to
+# the critic and spatial checker without a JSON round trip.
+STAGES: Dict[str, Stage] = {
+    stage.name: stage
+    for stage in [
+        Stage("enclosure_solver",
+              lambda ctx: enclosure_solver.calculate_enclosure(ctx["work"], ctx["rules"]),
+              enclosure_solver.write_outputs,
+              inputs=["input/enclosure_spec.json"],
+              outputs=[ENCLOSURE_PLAN]),
+        Stage("breaker_placer",
+              lambda ctx: breaker_placer.optimize_placement(ctx["work"]),
+              breaker_placer.write_outputs,
+              inputs=["input/breakers.json"],
+              outputs=[PLACEMENT],
+              executor="process"),
+        Stage("breaker_critic",
+              lambda ctx: breaker_critic.critique_placement(
+                  ctx["work"], placement=ctx["results"].get("breaker_placer")),
+              breaker_critic.write_outputs,
+              inputs=[PLACEMENT],
+              outputs=[CRITIQUE]),
+        Stage("spatial_assistant",
+              lambda ctx: spatial_assistant.spatial_check(
+                  ctx["work"], placement=ctx["results"].get("breaker_placer")),
+              spatial_assistant.write_outputs,
+              inputs=[PLACEMENT],
+              outputs=[SPATIAL_REPORT]),
+        Stage("estimate_formatter",
+              lambda ctx: estimate_formatter.format_estimate(
+                  ctx["work"], ctx["templates"], rules_dir=ctx["rules"]),
+              estimate_formatter.write_outputs,
+              inputs=["input/estimate.json"],
+              outputs=[ESTIMATE_FORMAT],
+              templates=["NamedRanges.yaml", "EstimateTemplate.xlsx"],
+              rules=["business_rules.yaml"]),
+        Stage("cover_tab_writer",
+              lambda ctx: cover_tab_writer._build_cover_payload(ctx["work"]),
+              cover_tab_writer.write_outputs,
+              inputs=[ESTIMATE_FORMAT, ENCLOSURE_PLAN],
+              outputs=[COVER_TAB]),
+        Stage("doc_lint_guard",
+              lambda ctx: doc_lint_guard.lint_documents(
+                  ctx["work"],
+                  documents={doc: ctx["results"].get(stage) for doc, stage in LINT_SOURCES.items()}),
+              doc_lint_guard.write_outputs,
+              inputs=[ENCLOSURE_PLAN, PLACEMENT, CRITIQUE, ESTIMATE_FORMAT, COVER_TAB, SPATIAL_REPORT],
+              outputs=[LINT_RESULT]),
+    ]
+}
+
+
+def stage_dependencies(stages: Iterable[Stage]) -> Dict[str, Set[str]]:
+    """Map each stage name to the names of the selected stages it reads from.
+
+    Inputs produced by a stage outside the selection are expected on disk.
+    """
+    stages = list(stages)
+    producers = {out: stage.name for stage in stages for out in stage.outputs}
+    return {
+        stage.name: {producers[i] for i in stage.inputs if i in producers} - {stage.name}
+        for stage in stages
+    }
+
+
+def select_stages(names: Optional[Iterable[str]] = None) -> list:
+    """Resolve stage names to ``Stage`` objects in canonical order.
+
+    Raises:
+        ValueError: If a name is not a known stage
+    """
+    if not names:
+        return list(STAGES.values())
+
+    wanted = set(names)
+    unknown = wanted - set(STAGES)
+    if unknown:
+        raise ValueError(
+            f"Unknown stage(s): {', '.join(sorted(unknown))}. "
+            f"Must be one of: {', '.join(STAGES)}"
+        )
+    return [stage for name, stage in STAGES.items() if name in wanted]
+
+
+class StageManifest:
+    """Per-work-dir record of the input hash of each stage's last successful run."""
+    def __init__(self, work: Path):
+        self.path = work / MANIFEST
+        self.work = work
+        self.entries = read_json(self.path).get("stages", {})
+        self._lock = threading.Lock()
+
+    def is_fresh(self, stage: Stage, fingerprint: str) -> bool:
+        entry = self.entries.get(stage.name, {})
+        return entry.get("hash") == fingerprint and all(
+            (self.work / out).exists() for out in stage.outputs
+        )
+
+    def record(self, stage: Stage, fingerprint: str):
+        with self._lock:
+            self.entries[stage.name] = {"hash": fingerprint, "ts": int(time.time())}
+
+    def save(self):
+        with self._lock:
+            write_json(self.path, {"stages": self.entries})
+
+
+def _hash_file(h, label: str, path: Path):
+    h.update(label.encode("utf-8") + b"\0")
+    if path.is_file():
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+    else:
+        h.update(b"<missing>")
+    h.update(b"\0")
+
+
+@functools.lru_cache(maxsize=1)
+def engine_digest() -> str:
+    """SHA256 over the shared engine helpers (``_*.py``: I/O, SVG, workbook,
+    pricing, bundle, ...) that every stage runs, computed once per process.
+    """
+    h = hashlib.sha256()
+    for path in sorted(Path(__file__).parent.glob("_*.py")):
+        if not path.name.startswith("__"):
+            _hash_file(h, path.name, path)
+    return h.hexdigest()
+
+
+def stage_fingerprint(stage: Stage, ctx: Dict) -> str:
+    """SHA256 over a stage's input files, templates/rules assets, source code
+    and evidence mode/destination (a "skip" run leaves no SVGs for an eager
+    run to reuse, a file run no bundle members for a bundled one).
+    """
+    h = hashlib.sha256()
+    h.update(f"svg:{ctx['svg']}\0bundle:{bool(ctx['bundle'])}\0".encode("utf-8"))
+    for rel in stage.inputs:
+        _hash_file(h, f"work:{rel}", ctx["work"] / rel)
+    for rel in stage.templates:
+        _hash_file(h, f"templates:{rel}", ctx["templates"] / rel)
+    for rel in stage.rules:
+        _hash_file(h, f"rules:{rel}", ctx["rules"] / rel)
+    # Code changes (the stage's module or shared helpers) invalidate cached outputs too
+    _hash_file(h, "source", Path(sys.modules[stage.write.__module__].__file__))
+    h.update(f"engine:{engine_digest()}\0".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _execute_stage(name: str, ctx: Dict, in_worker: bool = False) -> dict:
+    """Compute and write one stage; module-level so process pools can pickle it.
+
+    In a worker process the parent's SVG mode and evidence bundle are
+    applied first, and SVGs deferred there are written before returning
+    (the queue would otherwise die with the worker).
+    """
+    if in_worker:
+        # A fresh context per task, so nothing carries over to the worker's next stage
+        return contextvars.Context().run(_execute_in_worker, name, ctx)
+    stage = STAGES[name]
+    result = stage.compute(ctx)
+    stage.write(ctx["work"], result)
+    return result
+
+
+def _execute_in_worker(name: str, ctx: Dict) -> dict:
+    set_svg_mode(ctx["svg"])
+    if ctx["bundle"]:
+        open_bundle(ctx["work"])
+    result = _execute_stage(name, ctx)
+    render_deferred_svg()
+    return result
+
+
+def _run_stage(
+    stage: Stage,
+    ctx: Dict,
+    metrics: MetricsCollector,
+    manifest: StageManifest,
+    force: bool,
+    procs: Optional[cf.ProcessPoolExecutor] = None,
+) -> dict:
+    """Run one stage, or reuse its outputs when its input hash is unchanged."""
+    fingerprint = stage_fingerprint(stage, ctx)
+    if not force and manifest.is_fresh(stage, fingerprint):
+        metrics.skip(stage.name)
+        return read_json(ctx["work"] / stage.outputs[0])
+
+    with metrics.timer(stage.name):
+        if procs is not None and stage.executor == "process":
+            result = procs.submit(_execute_stage, stage.name, ctx, True).result()
+        else:
+            result = _execute_stage(stage.name, ctx)
+
+    manifest.record(stage, fingerprint)
+    return result
+
+
+def run_stages(
+    work_dir,
+    templates_dir="KIS/Templates",
+    rules_dir="KIS/Rules",
+    stages: Optional[Iterable[str]] = None,
+    metrics: Optional[MetricsCollector] = None,
+    force: bool = False,
+    svg: Optional[str] = None,
+    bundle: bool = False,
+) -> Dict[str, dict]:
+    """Run the selected FIX-4 stages in this process.
+
+    Each stage is timed under its own name in ``metrics``; a failing stage
+    stops the run and re-raises after its timing is recorded. A stage whose
+    input hash matches its last successful run (see ``StageManifest``) is
+    skipped and its previous output reused, unless ``force`` is set.
+    ``svg`` sets the evidence mode for this run (eager/defer/lazy/skip,
+    see ``_svg``; the caller's mode is restored afterwards);
+    with "defer" the SVGs are queued for ``render_deferred_svg``, with
+    "lazy" they are recorded for ``_evidence.materialize``. ``bundle``
+    writes evidence into ``<work>/evidence.zip`` (see ``_bundle``) instead
+    of one file per artefact.
+
+    Returns:
+        dict mapping stage name to its result
+    """
+    metrics = metrics or MetricsCollector()
+    svg_token = set_svg_mode(svg) if svg is not None else None
+    ctx = {
+        "work": Path(work_dir),
+        "templates": Path(templates_dir),
+        "rules": Path(rules_dir),
+        "svg": svg_mode(),
+        "bundle": bundle,
+        "results": {},
+    }
+    manifest = StageManifest(ctx["work"])
+    bundle_token = open_bundle(ctx["work"]) if bundle else None
+
+    try:
+        for stage in select_stages(stages):
+            ctx["results"][stage.name] = _run_stage(stage, ctx, metrics, manifest, force)
+    finally:
+        if bundle_token is not None:
+            close_bundle(bundle_token)
+        if svg_token is not None:
+            reset_svg_mode(svg_token)
+        manifest.save()
+
+    return ctx["results"]
+
+
+def run_dag(
+    work_dir,
+    templates_dir="KIS/Templates",
+    rules_dir="KIS/Rules",
+    stages: Optional[Iterable[str]] = None,
+    metrics: Optional[MetricsCollector] = None,
+    max_workers: int = 4,
+    use_processes: bool = True,
+    force: bool = False,
+    svg: Optional[str] = None,
+    bundle: bool = False,
+) -> Dict[str, dict]:
+    """Run the selected stages concurrently as their dependencies allow.
+
+    A stage starts as soon as every selected stage it reads from has
+    finished, so wall time approaches the critical path
+    (placement → critic/spatial → lint) rather than the sum of all stages.
+    Stages declared ``executor="process"`` run in a process pool when
+    ``use_processes`` is set; all others run on threads. Unchanged stages
+    are skipped and ``svg``/``bundle`` applied as in ``run_stages``.
+
+    Returns:
+        dict mapping stage name to its result
+
+    Raises:
+        Exception: The first stage failure; stages not yet started are cancelled
+    """
+    metrics = metrics or MetricsCollector()
+    svg_token = set_svg_mode(svg) if svg is not None else None
+    selected = select_stages(stages)
+    pending = stage_dependencies(selected)
+    base_ctx = {
+        "work": Path(work_dir),
+        "templates": Path(templates_dir),
+        "rules": Path(rules_dir),
+        "svg": svg_mode(),
+        "bundle": bundle,
+    }
+    manifest = StageManifest(base_ctx["work"])
+    bundle_token = open_bundle(base_ctx["work"]) if bundle else None
+    results: Dict[str, dict] = {}
+
+    procs = cf.ProcessPoolExecutor(max_workers=max_workers) if use_processes and any(
+        stage.executor == "process" for stage in selected) else None
+
+    def run_timed(name: str, deps: Set[str]) -> dict:
+        ctx = dict(base_ctx, results={d: results[d] for d in deps})
+        return _run_stage(STAGES[name], ctx, metrics, manifest, force, procs)
+
+    try:
+        with cf.ThreadPoolExecutor(max_workers=max_workers) as threads:
+            running: Dict[cf.Future, str] = {}
+            while pending or running:
+                ready = [name for name, deps in pending.items() if deps <= results.keys()]
+                for name in ready:
+                    # Copy the caller's context so stage spans nest under its span and
+                    # stages see this run's SVG mode and bundle
+                    running[threads.submit(contextvars.copy_context().run,
+                                           run_timed, name, pending.pop(name))] = name
+
+                done, _ = cf.wait(running, return_when=cf.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception:
+                        for other in running:
+                            other.cancel()
+                        raise
+    finally:
+        if procs is not None:
+            procs.shutdown(cancel_futures=True)
+        if bundle_token is not None:
+            close_bundle(bundle_token)
+        if svg_token is not None:
+            reset_svg_mode(svg_token)
+        manifest.save()
+
+    # Report results in canonical stage order
+    return {stage.name: results[stage.name] for stage in selected}
+
+
+def run_fused_validation(work_dir, write: bool = True) -> Dict[str, dict]:
+    """Run placement → critic → spatial on one in-memory placement result.
+
+    Args:
+        work_dir: Work directory holding ``input/`` and receiving outputs
+        write: Write the three stage JSON files and evidence when done
+
+    Returns:
+        dict with ``placement``, ``critic`` and ``spatial`` results
+    """
+    work = Path(work_dir)
+
+    placement = breaker_placer.optimize_placement(work)
+    critique = breaker_critic.critique_placement(work, placement=placement)
+    spatial = spatial_assistant.spatial_check(work, placement=placement)
+
+    if write:
+        breaker_placer.write_outputs(work, placement)
+        breaker_critic.write_outputs(work, critique)
+        spatial_assistant.write_outputs(work, spatial)
+
+    return {"placement": placement, "critic": critique, "spatial": spatial}
+
+
+def main():
+    """CLI entry point."""
+    ap = arg_parser()
+    args = ap.parse_args()
+    work = Path(args.work)
+
+    metrics = MetricsCollector()
+
+    with metrics.timer("fused_validation"):
+        results = run_fused_validation(work)
+
+        if results["critic"]["passed"] and results["spatial"]["pass"]:
+            log(f"OK fused-validation (imbalance={results['placement']['phase_imbalance_pct']}%)")
+        else:
+            log("WARN fused-validation: critic or spatial checks failed", "WARN")
+
+    metrics.save()
+    return 0 if results["critic"]["passed"] else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -3,7 +3,8 @@ import json
 import time
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from _util_io import ensure_dir, write_json, write_text, make_evidence, log, arg_parser
+from _util_io import ensure_dir, write_json, make_evidence, log, arg_parser
+from _svg import Markup, SvgTemplate, write_svg
 
 # Parameterized thresholds
 PANEL_PITCH_MM = 45  # Standard panel rail pitch
@@ -115,13 +116,19 @@ def _check_panel_boundaries(volumes: List[BreakerVolume]) -> Tuple[int, List[Dic
 
     return violation_count, violations
 
-def spatial_check(work_dir) -> Dict:
-    """Perform 2.5D spatial validation of breaker placement."""
+def spatial_check(work_dir, placement: Optional[Dict] = None) -> Dict:
+    """Perform 2.5D spatial validation of breaker placement.
+
+    When ``placement`` is given (in-process pipeline), it is used instead of
+    re-reading ``breaker_placement.json``.
+    """
     work_path = Path(work_dir)
 
     # Load placement data
     placement_file = work_path / "placement" / "breaker_placement.json"
-    if placement_file.exists():
+    if placement is not None:
+        placement_data = placement
+    elif placement_file.exists():
         placement_data = json.loads(placement_file.read_text())
     else:
         # Generate sample placement
@@ -197,67 +204,47 @@ def spatial_check(work_dir) -> Dict:
 
     return result
 
+# Panel outline and rail grid only depend on the panel constants
+_SPATIAL_SVG = SvgTemplate("\n".join([
+    f'<svg xmlns="http://www.w3.org/2000/svg" width="{PANEL_WIDTH_MM}" height="{PANEL_HEIGHT_MM}" viewBox="0 0 {PANEL_WIDTH_MM} {PANEL_HEIGHT_MM}">',
+    '<rect width="100%" height="100%" fill="#f5f5f5" stroke="#333" stroke-width="2"/>',
+    '<text x="10" y="25" font-size="18" font-weight="bold">2.5D Spatial Analysis</text>',
+    *(
+        f'<line x1="{x}" y1="0" x2="{x}" y2="{PANEL_HEIGHT_MM}" stroke="#ddd" stroke-width="0.5"/>'
+        for x in range(PANEL_PITCH_MM, PANEL_WIDTH_MM // PANEL_PITCH_MM * PANEL_PITCH_MM, PANEL_PITCH_MM)
+    ),
+    '{clearance_zones}',
+    '<rect x="10" y="40" width="200" height="30" fill="{status_color}" rx="5"/>',
+    '<text x="110" y="60" text-anchor="middle" font-size="14" fill="white">{status_text}</text>',
+    '<text x="10" y="100" font-size="12">Clearance Violations: {clearance_violations}</text>',
+    '<text x="10" y="120" font-size="12">Boundary Violations: {boundary_violations}</text>',
+    '<text x="10" y="140" font-size="12">Breakers Checked: {breakers_checked}</text>',
+    '</svg>',
+]))
+
 def _generate_spatial_svg(result: Dict) -> str:
     """Generate SVG visualization of spatial analysis."""
-    svg_parts = [
-        f'<svg xmlns="http://www.w3.org/2000/svg" width="{PANEL_WIDTH_MM}" height="{PANEL_HEIGHT_MM}" viewBox="0 0 {PANEL_WIDTH_MM} {PANEL_HEIGHT_MM}">',
-        '<rect width="100%" height="100%" fill="#f5f5f5" stroke="#333" stroke-width="2"/>',
-        '<text x="10" y="25" font-size="18" font-weight="bold">2.5D Spatial Analysis</text>'
-    ]
-
-    # Draw grid lines
-    for i in range(1, PANEL_WIDTH_MM // PANEL_PITCH_MM):
-        x = i * PANEL_PITCH_MM
-        svg_parts.append(
-            f'<line x1="{x}" y1="0" x2="{x}" y2="{PANEL_HEIGHT_MM}" stroke="#ddd" stroke-width="0.5"/>'
-        )
-
     # Draw clearance zones if violations exist
+    zones = []
     for violation in result.get("clearance_details", [])[:3]:
         if "position_1" in violation:
             x, y, z = violation["position_1"]
-            svg_parts.append(
+            zones.append(
                 f'<rect x="{x-5}" y="{y-5}" width="{HORIZONTAL_CLEARANCE_MM+10}" '
                 f'height="100" fill="red" opacity="0.2" stroke="red" stroke-width="2"/>'
             )
 
-    # Status indicator
-    status_color = "#4caf50" if result["pass"] else "#f44336"
-    status_text = "PASS" if result["pass"] else "VIOLATIONS DETECTED"
-    svg_parts.append(
-        f'<rect x="10" y="40" width="200" height="30" fill="{status_color}" rx="5"/>'
-    )
-    svg_parts.append(
-        f'<text x="110" y="60" text-anchor="middle" font-size="14" fill="white">{status_text}</text>'
-    )
-
-    # Metrics
-    y_pos = 100
-    svg_parts.append(
-        f'<text x="10" y="{y_pos}" font-size="12">Clearance Violations: {result["clearance_violations"]}</text>'
-    )
-    y_pos += 20
-    svg_parts.append(
-        f'<text x="10" y="{y_pos}" font-size="12">Boundary Violations: {result["boundary_violations"]}</text>'
-    )
-    y_pos += 20
-    svg_parts.append(
-        f'<text x="10" y="{y_pos}" font-size="12">Breakers Checked: {result["breakers_checked"]}</text>'
+    return _SPATIAL_SVG.render(
+        clearance_zones=Markup("\n".join(zones)),
+        status_color="#4caf50" if result["pass"] else "#f44336",
+        status_text="PASS" if result["pass"] else "VIOLATIONS DETECTED",
+        clearance_violations=result["clearance_violations"],
+        boundary_violations=result["boundary_violations"],
+        breakers_checked=result["breakers_checked"],
     )
 
-    svg_parts.append('</svg>')
-    return '\n'.join(svg_parts)
-
-def main():
-    """CLI entry point."""
-    ap = arg_parser()
-    args = ap.parse_args()
-    work = Path(args.work) if hasattr(args, 'work') else Path("KIS/Work/current")
-
-    # Perform spatial analysis
-    result = spatial_check(work)
-
-    # Save results
+def write_outputs(work: Path, result: Dict) -> Path:
+    """Write spatial report JSON and its evidence artefacts under ``work``."""
     out = work / "spatial" / "spatial_report.json"
     write_json(out, result)
 
@@ -272,10 +259,23 @@ def main():
     make_evidence(out.with_suffix(""), evidence_data, "json")
 
     # Generate SVG visualization
-    svg_content = _generate_spatial_svg(result)
-    svg_path = out.with_suffix(".svg")
-    write_text(svg_path, svg_content)
-    log(f"Spatial visualization saved to {svg_path}", "INFO")
+    svg_path = write_svg(out.with_suffix(".svg"), _generate_spatial_svg, result, source=out)
+    if svg_path:
+        log(f"Spatial visualization saved to {svg_path}", "INFO")
+
+    return out
+
+def main():
+    """CLI entry point."""
+    ap = arg_parser()
+    args = ap.parse_args()
+    work = Path(args.work) if hasattr(args, 'work') else Path("KIS/Work/current")
+
+    # Perform spatial analysis
+    result = spatial_check(work)
+
+    # Save results
+    write_outputs(work, result)
 
     # Log summary
     if result["pass"]:
@@ -1,14 +1,6 @@
 """Stub namespace for estimator FIX-4 MCP components."""
 
-from . import (
-    breaker_critic,
-    breaker_placer,
-    cover_tab_writer,
-    doc_lint_guard,
-    enclosure_solver,
-    estimate_formatter,
-    evidence,
-)
+import importlib
 
 __all__ = [
     "breaker_critic",
@@ -19,3 +11,10 @@ __all__ = [
     "estimate_formatter",
     "evidence",
 ]
+
+
+def __getattr__(name):
+    # Submodules load on first access so importing the namespace stays cheap
+    if name in __all__:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
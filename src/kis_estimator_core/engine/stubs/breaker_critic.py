@@ -4,10 +4,11 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
-import polars as pl
-
+from .._lazy import lazy_module
 from . import evidence
 
+pl = lazy_module("polars")
+
 
 THRESHOLD_BALANCE = 0.05
 
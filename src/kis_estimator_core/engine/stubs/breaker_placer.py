@@ -5,11 +5,12 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Dict, List, Mapping
 
-import polars as pl
-from ortools.sat.python import cp_model
-
+from .._lazy import lazy_module
 from . import evidence
 
+pl = lazy_module("polars")
+cp_model = lazy_module("ortools.sat.python.cp_model")
+
 
 @dataclass
 class AssignmentResult:
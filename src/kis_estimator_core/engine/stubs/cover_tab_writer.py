@@ -5,10 +5,11 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict
 
-import polars as pl
-
+from .._lazy import lazy_module
 from . import evidence
 
+pl = lazy_module("polars")
+
 
 def generate(formatter_payload: Dict[str, Any], case_id: str = evidence.CASE_DEFAULT) -> Dict[str, Any]:
     document = formatter_payload.get("document", {})
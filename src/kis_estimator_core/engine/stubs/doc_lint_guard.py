@@ -6,10 +6,11 @@ import math
 import re
 from typing import Any, Dict, List
 
-import polars as pl
-
+from .._lazy import lazy_module
 from . import evidence
 
+pl = lazy_module("polars")
+
 
 def _hex_to_rgb(color: str) -> tuple[float, float, float]:
     color = color.strip().lstrip("#")
@@ -5,12 +5,13 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict, List
 
-import duckdb
-import polars as pl
-
+from .._lazy import lazy_module
 from ..util import guard
 from . import evidence
 
+duckdb = lazy_module("duckdb")
+pl = lazy_module("polars")
+
 CATALOG_DIR = Path(__file__).resolve().parents[3] / "Templates" / "catalog"
 ENCLOSURE_CATALOG = CATALOG_DIR / "enclosures.csv"
 
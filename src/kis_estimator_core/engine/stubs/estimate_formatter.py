@@ -5,11 +5,12 @@ from __future__ import annotations
 from datetime import datetime
 from typing import Any, Dict
 
-import polars as pl
-
+from .._lazy import lazy_module
 from ..util import templates
 from . import evidence
 
+pl = lazy_module("polars")
+
 
 def _loads_frame(loads: list[dict[str, Any]]) -> pl.DataFrame:
     frame = pl.from_dicts(loads)
@@ -3,15 +3,21 @@
 from __future__ import annotations
 
 import base64
+import json
+import os
 import re
 from datetime import datetime
+from io import BytesIO
 from pathlib import Path
 from typing import Dict, Iterable, List, Mapping, MutableMapping
 
-import polars as pl  # type: ignore
-
+from .. import _evidence
+from .._bundle import BUNDLE_NAME, EvidenceBundle
+from .._lazy import lazy_module
 from ..util import guard, io
 
+pl = lazy_module("polars")
+
 CASE_DEFAULT = "2025-0001"
 _PNG_PIXEL = base64.b64decode(
     "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVQI12P4//8/AwAI/AL+XgKp5wAAAABJRU5ErkJggg=="
@@ -34,6 +40,48 @@ def _sanitise(name: str) -> str:
     return re.sub(r"[^A-Za-z0-9_-]", "_", name)
 
 
+def _lazy_default() -> bool:
+    return os.environ.get("KIS_EVIDENCE_SVG") == "lazy"
+
+
+def _bundle_default() -> bool:
+    return os.environ.get("KIS_EVIDENCE_BUNDLE") == "1"
+
+
+def _stage_svg(stage: str, timestamp: str) -> bytes:
+    return (
+        "<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"320\" height=\"80\">"
+        f"<rect width=\"320\" height=\"80\" fill=\"#f2f6ff\"/>"
+        f"<text x=\"16\" y=\"30\" font-size=\"14\" fill=\"#003366\">{stage} snapshot</text>"
+        f"<text x=\"16\" y=\"60\" font-size=\"12\" fill=\"#003366\">{timestamp}</text></svg>"
+    ).encode("utf-8")
+
+
+# Renderers for artefacts deferred through ``_evidence.record``
+
+
+def _render_stage_svg(data: Mapping[str, str]) -> bytes:
+    return _stage_svg(data["stage"], data["timestamp"])
+
+
+def _render_png(data: object) -> bytes:
+    return _PNG_PIXEL
+
+
+def _render_json(data: Mapping[str, object]) -> bytes:
+    return _json_bytes(data)
+
+
+def _bundled(bundle: EvidenceBundle, path: Path, data: bytes) -> str:
+    guard.ensure_whitelisted(path)
+    bundle.add(path.name, data)
+    return f"{bundle.path}#{path.name}"
+
+
+def _json_bytes(data: Mapping[str, object]) -> bytes:
+    return json.dumps(dict(data), ensure_ascii=False, indent=2, default=str).encode("utf-8")
+
+
 def write_stage(
     stage: str,
     payload: Mapping[str, object],
@@ -41,42 +89,91 @@ def write_stage(
     case_id: str = CASE_DEFAULT,
     inputs: Mapping[str, MutableMapping[str, object]] | None = None,
     tables: Mapping[str, pl.DataFrame] | None = None,
+    lazy: bool | None = None,
+    bundle: bool | None = None,
 ) -> List[str]:
-    """Persist evidence artefacts for a stage, including inputs and tables."""
+    """Persist evidence artefacts for a stage, including inputs and tables.
+
+    With ``lazy`` (default: ``KIS_EVIDENCE_SVG=lazy``) the SVG, PNG and input
+    snapshots are recorded in the case's ``_evidence`` manifest and produced
+    by ``materialize`` when first requested. Tables are still written: their
+    parquet file is already the compact, typed form.
+
+    With ``bundle`` (default: ``KIS_EVIDENCE_BUNDLE=1``) the artefacts that
+    are written go into the case's single ``evidence.zip`` instead of
+    separate files, and are returned as ``<bundle>#<member>``.
+    """
     # [REAL-LOGIC] Ensure every stage produces structured artefacts for auditability
+    lazy = _lazy_default() if lazy is None else lazy
+    bundle = _bundle_default() if bundle is None else bundle
     root = _evidence_root(case_id)
+    target = EvidenceBundle(root / BUNDLE_NAME) if bundle else None
     timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%S%f")
     artefacts: List[str] = []
 
     json_path = root / f"{stage}_{timestamp}.json"
-    io.write_json(json_path, dict(payload))
-    artefacts.append(str(json_path))
+    if target is not None:
+        artefacts.append(_bundled(target, json_path, _json_bytes(payload)))
+    else:
+        io.write_json(json_path, dict(payload))
+        artefacts.append(str(json_path))
 
     svg_stub = root / f"{stage}_{timestamp}.svg"
-    svg_content = (
-        "<svg xmlns=\"http://www.w3.org/2000/svg\" width=\"320\" height=\"80\">"
-        f"<rect width=\"320\" height=\"80\" fill=\"#f2f6ff\"/>"
-        f"<text x=\"16\" y=\"30\" font-size=\"14\" fill=\"#003366\">{stage} snapshot</text>"
-        f"<text x=\"16\" y=\"60\" font-size=\"12\" fill=\"#003366\">{timestamp}</text></svg>"
-    ).encode("utf-8")
-    _write_binary(svg_stub, svg_content)
-    artefacts.append(str(svg_stub))
+    if lazy:
+        guard.ensure_whitelisted(svg_stub)
+        _evidence.record(svg_stub, _render_stage_svg, {"stage": stage, "timestamp": timestamp})
+        artefacts.append(str(svg_stub))
+    elif target is not None:
+        artefacts.append(_bundled(target, svg_stub, _stage_svg(stage, timestamp)))
+    else:
+        _write_binary(svg_stub, _stage_svg(stage, timestamp))
+        artefacts.append(str(svg_stub))
 
     png_stub = root / f"{stage}_{timestamp}.png"
-    _write_binary(png_stub, _PNG_PIXEL)
-    artefacts.append(str(png_stub))
+    if lazy:
+        guard.ensure_whitelisted(png_stub)
+        _evidence.record(png_stub, _render_png)
+        artefacts.append(str(png_stub))
+    elif target is not None:
+        artefacts.append(_bundled(target, png_stub, _PNG_PIXEL))
+    else:
+        _write_binary(png_stub, _PNG_PIXEL)
+        artefacts.append(str(png_stub))
 
     if inputs:
         for name, snapshot in inputs.items():
             snap_path = root / f"{stage}_{_sanitise(name)}_{timestamp}.json"
-            io.write_json(snap_path, dict(snapshot))
-            artefacts.append(str(snap_path))
+            if lazy:
+                guard.ensure_whitelisted(snap_path)
+                _evidence.record(snap_path, _render_json, dict(snapshot))
+                artefacts.append(str(snap_path))
+            elif target is not None:
+                artefacts.append(_bundled(target, snap_path, _json_bytes(snapshot)))
+            else:
+                io.write_json(snap_path, dict(snapshot))
+                artefacts.append(str(snap_path))
 
     if tables:
         for name, frame in tables.items():
             table_path = root / f"{stage}_{_sanitise(name)}_{timestamp}.parquet"
             guard.ensure_whitelisted(table_path)
-            frame.write_parquet(table_path)  # [REAL-LOGIC] Persist analytical tables for traceability
-            artefacts.append(str(table_path))
+            if target is not None:
+                buffer = BytesIO()
+                frame.write_parquet(buffer)
+                artefacts.append(_bundled(target, table_path, buffer.getvalue()))
+            else:
+                frame.write_parquet(table_path)  # [REAL-LOGIC] Persist analytical tables for traceability
+                artefacts.append(str(table_path))
 
     return artefacts
+
+
+def materialize(path: str | Path) -> Path:
+    """Produce a lazily recorded artefact (no-op if it already exists).
+
+    Raises:
+        FileNotFoundError: The artefact was never recorded
+    """
+    path = Path(path)
+    guard.ensure_whitelisted(path)
+    return _evidence.materialize(path)
@@ -12,6 +12,9 @@ import pytest
 from api.services.document_service import (
     create_signed_url,
     upload_evidence,
+    upload_evidence_batch,
+    upload_evidence_file,
+    verify_evidence_bulk,
     verify_evidence_integrity,
 )
 
@@ -216,6 +219,66 @@ async def test_multiple_stage_evidence():
     assert len(hashes) == len(set(hashes)), "Hashes should be unique"
 
 
+@pytest.mark.asyncio
+async def test_batch_stage_evidence():
+    """Test uploading all FIX-4 stages in one batch (one INSERT)"""
+    quote_id = str(uuid.uuid4())
+    stages = ["enclosure", "breaker", "critic", "format", "cover", "lint"]
+    artifacts = [
+        {"stage": stage, "file_bytes": json.dumps({"stage": stage}).encode("utf-8"), "ext": "json"}
+        for stage in stages
+    ]
+
+    results = await upload_evidence_batch(quote_id, artifacts)
+
+    assert [r["stage"] for r in results] == stages, "Results should keep input order"
+    assert len({r["id"] for r in results}) == len(stages), "IDs should be unique"
+    for stage in stages:
+        verification = await verify_evidence_integrity(quote_id, stage)
+        assert verification["valid"], f"Batch evidence for {stage} should verify"
+
+
+@pytest.mark.asyncio
+async def test_batch_rejects_invalid_stage_before_upload():
+    """Test one invalid artefact fails the whole batch up front"""
+    quote_id = str(uuid.uuid4())
+    artifacts = [
+        {"stage": "enclosure", "file_bytes": b"ok", "ext": "json"},
+        {"stage": "invalid_stage", "file_bytes": b"bad", "ext": "json"},
+    ]
+
+    with pytest.raises(ValueError, match="Invalid stage"):
+        await upload_evidence_batch(quote_id, artifacts)
+
+
+@pytest.mark.asyncio
+async def test_file_evidence_streamed(tmp_path):
+    """Test large file evidence is hashed from disk and verified from a streamed download"""
+    quote_id = str(uuid.uuid4())
+    file_path = tmp_path / "drawing.dxf"
+    file_path.write_bytes(b"0\nSECTION\n" * 500_000)
+
+    result = await upload_evidence_file(quote_id, "enclosure", file_path, "dxf")
+    assert result["sha256"] == hashlib.sha256(file_path.read_bytes()).hexdigest()
+
+    verification = await verify_evidence_integrity(quote_id, "enclosure")
+    assert verification["valid"], "Streamed verification should match the upload hash"
+
+
+@pytest.mark.asyncio
+async def test_bulk_verification_uses_cache():
+    """Test a second bulk audit skips downloads of unchanged objects"""
+    quote_id = str(uuid.uuid4())
+    await upload_evidence(quote_id, "lint", b"bulk audit evidence", "json")
+
+    first = await verify_evidence_bulk(page_size=100)
+    assert not first["mismatched"], "Freshly uploaded evidence should verify"
+    assert first["checked"] >= 1
+
+    second = await verify_evidence_bulk(page_size=100)
+    assert second["cached"] >= 1, "Unchanged objects should be served from the verification cache"
+
+
 @pytest.mark.asyncio
 async def test_evidence_path_structure():
     """Test evidence path follows required structure"""
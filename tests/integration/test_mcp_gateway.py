@@ -0,0 +1,175 @@
+"""
+Integration tests for the MCP gateway transport
+Runs MCPGatewayClient against the local stand-in gateway
+"""
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+from aiohttp.test_utils import TestServer
+
+from api.integrations import mcp_client as mcp_client_module
+from api.integrations.mcp_client import MCPGatewayClient, MCPTransport, shared_call_cache
+from api.integrations.mcp_gateway_stub import create_app
+from api.services import enclosure_service, layout_service
+
+pytestmark = pytest.mark.integration
+
+
+@pytest.fixture(autouse=True)
+def empty_call_cache():
+    shared_call_cache.clear()
+    yield
+    shared_call_cache.clear()
+
+
+async def _start(fail_first: int = 0):
+    server = TestServer(create_app(fail_first=fail_first))
+    await server.start_server()
+    return server, str(server.make_url("")).rstrip("/")
+
+
+@pytest.mark.asyncio
+async def test_calls_reuse_one_pooled_connection():
+    """Sequential tool calls ride one keep-alive connection"""
+    server, url = await _start()
+    transport = MCPTransport()
+    client = MCPGatewayClient(base_url=url, transport=transport)
+    try:
+        await client.connect()
+        for tool in ("enclosure.solve", "layout.place_breakers", "doc.lint"):
+            result = await client.call_tool(tool, {"quote": 1})
+        assert result["valid"] is True
+
+        stats = server.app["stats"]
+        assert stats["calls"] == 3
+        assert len(stats["peers"]) == 1
+    finally:
+        await client.disconnect()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_services_share_one_transport():
+    """Clients built by different services share the session until the last disconnects"""
+    server, url = await _start()
+    transport = MCPTransport()
+    first = MCPGatewayClient(base_url=url, transport=transport)
+    second = MCPGatewayClient(base_url=url, transport=transport)
+    try:
+        await first.connect()
+        await second.connect()
+        await first.call_tool("enclosure.solve", {"a": 1})
+        await second.call_tool("doc.lint", {"b": 2})
+        assert len(server.app["stats"]["peers"]) == 1
+
+        await first.disconnect()
+        assert transport._session is not None
+        await second.disconnect()
+        assert transport._session is None
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_call_without_connect_holds_transport():
+    """A client that skips connect() still keeps the session open until it disconnects"""
+    server, url = await _start()
+    transport = MCPTransport()
+    with pytest.raises(RuntimeError):
+        transport.session
+    lazy = MCPGatewayClient(base_url=url, transport=transport)
+    other = MCPGatewayClient(base_url=url, transport=transport)
+    try:
+        await lazy.call_tool("enclosure.solve", {"a": 1})
+        await other.connect()
+        await other.disconnect()
+        assert transport._session is not None
+        await lazy.call_tool("doc.lint", {"b": 2})
+
+        await lazy.disconnect()
+        assert transport._session is None
+    finally:
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_retries_gateway_errors_and_sends_trace_headers(monkeypatch):
+    """503s are retried; idempotency and trace context travel as headers"""
+    server, url = await _start(fail_first=2)
+    client = MCPGatewayClient(base_url=url, transport=MCPTransport(), api_key="secret")
+    client.retry_delay = 0
+    try:
+        await client.connect()
+        result = await client.call_tool(
+            "enclosure.solve", {"a": 1}, idempotency_key="idem-1", trace_id="trace-1"
+        )
+        assert result["sku"] == "ENC-2000x800x400"
+
+        stats = server.app["stats"]
+        assert stats["calls"] == 3 and stats["failures"] == 2
+        request = stats["requests"][-1]
+        headers = request["headers"]
+        assert headers["Idempotency-Key"] == "idem-1"
+        assert headers["Authorization"] == "Bearer secret"
+        assert headers["X-Trace-Id"] == request["body"]["trace_id"]
+        assert headers["traceparent"].split("-")[1] == request["body"]["trace_id"]
+    finally:
+        await client.disconnect()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_gateway_error_surfaces_after_retries():
+    server, url = await _start(fail_first=10)
+    client = MCPGatewayClient(base_url=url, transport=MCPTransport())
+    client.retry_delay = 0
+    try:
+        await client.connect()
+        with pytest.raises(RuntimeError):
+            await client.call_tool("enclosure.solve", {"a": 1})
+        assert server.app["stats"]["calls"] == client.retry_attempts
+    finally:
+        await client.disconnect()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_identical_pure_calls_served_from_cache():
+    """Pure tools are keyed on their payload; other tools always reach the gateway"""
+    server, url = await _start()
+    client = MCPGatewayClient(base_url=url, transport=MCPTransport())
+    try:
+        await client.connect()
+        first = await client.call_tool("enclosure.solve", {"panels": [{"w": 1, "h": 2}]})
+        again = await client.call_tool("enclosure.solve", {"panels": [{"h": 2, "w": 1}]})
+        assert again == first
+        assert server.app["stats"]["calls"] == 1
+        sent = server.app["stats"]["requests"][0]["headers"]["Idempotency-Key"]
+        assert len(sent) == 64  # canonical payload hash
+
+        await client.call_tool("estimate.format", {"q": 1})
+        await client.call_tool("estimate.format", {"q": 1})
+        assert server.app["stats"]["calls"] == 3
+    finally:
+        await client.disconnect()
+        await server.close()
+
+
+@pytest.mark.asyncio
+async def test_services_call_the_gateway_through_the_shared_client(monkeypatch):
+    """Service modules go through the module-level MCPGatewayClient"""
+    server, url = await _start()
+    client = mcp_client_module.mcp_client
+    monkeypatch.setattr(client, "base_url", url)
+    monkeypatch.setattr(client, "transport", MCPTransport())
+    try:
+        enclosure = await enclosure_service.solve([{"id": "b1"}])
+        placement = await layout_service.place_breakers([{"id": "b1"}], {"width": 800, "height": 600})
+        assert enclosure["sku"] == "ENC-2000x800x400"
+        assert len(placement["placement"]) == 3
+        assert server.app["stats"]["calls"] == 2
+        assert len(server.app["stats"]["peers"]) == 1
+    finally:
+        await client.disconnect()
+        await server.close()
@@ -0,0 +1,233 @@
+"""Estimate Service Tests - FIX-4 call plan with a fake MCP gateway"""
+import asyncio
+
+import httpx
+import pytest
+
+from api import tracing
+from api.config import config
+from api.integrations.mcp_gateway_stub import mock_tool_result
+from api.main import app
+from api.services import document_service, estimate_service
+
+PAYLOAD = {
+    "customer": {"name": "Test Customer"},
+    "panels": [{"name": "Main", "breakers": [{"id": "b1"}, {"id": "b2"}]}],
+    "currency": "KRW",
+}
+
+
+class FakeGateway:
+    """``call_tool`` stand-in recording when each tool starts, ends or is cancelled"""
+
+    def __init__(self, results=None, delays=None):
+        self.results = results or {}
+        self.delays = delays or {}
+        self.events = []
+        self.cancelled = []
+
+    async def call_tool(self, tool, params):
+        self.events.append(("start", tool))
+        try:
+            await asyncio.sleep(self.delays.get(tool, 0.01))
+        except asyncio.CancelledError:
+            self.cancelled.append(tool)
+            raise
+        self.events.append(("end", tool))
+        return self.results.get(tool, mock_tool_result(tool, params))
+
+    def at(self, event, tool):
+        return self.events.index((event, tool))
+
+
+@pytest.fixture
+def exports(monkeypatch):
+    calls = []
+
+    async def export_pdf_xlsx(quote_id, quote_data):
+        calls.append(quote_id)
+        return {"pdf": {"path": "p.pdf"}, "xlsx": {"path": "p.xlsx"}}
+
+    monkeypatch.setattr(document_service, "export_pdf_xlsx", export_pdf_xlsx)
+    return calls
+
+
+def _use(monkeypatch, gateway):
+    monkeypatch.setattr(estimate_service.mcp_client, "call_tool", gateway.call_tool)
+
+
+@pytest.mark.asyncio
+async def test_plan_runs_in_dependency_order(monkeypatch, exports):
+    """Each call starts after its inputs; independent calls overlap"""
+    gateway = FakeGateway(delays={"layout.balance_phases": 0.05})
+    _use(monkeypatch, gateway)
+
+    result = await estimate_service.create_quote(PAYLOAD)
+
+    at = gateway.at
+    assert at("end", "enclosure.solve") < at("start", "layout.place_breakers")
+    for tool in ("layout.balance_phases", "layout.check_clearance", "estimate.format"):
+        assert at("end", "layout.place_breakers") < at("start", tool)
+    for tool in ("estimate.format", "layout.balance_phases", "layout.check_clearance"):
+        assert at("end", tool) < at("start", "doc.cover_generate")
+    assert at("end", "doc.cover_generate") < at("start", "doc.apply_branding")
+    for tool in ("doc.lint", "doc.policy_check"):
+        assert at("end", "doc.apply_branding") < at("start", tool)
+    # estimate.format runs alongside the slower phase balance check
+    assert at("start", "estimate.format") < at("end", "layout.balance_phases")
+
+    assert result["all_gates_pass"] is True
+    assert set(result["gates"]) == {
+        "enclosure_fit", "phase_balance", "clearance", "formula_preservation", "lint", "policy",
+    }
+    assert list(result["evidence"]["stages"]) == ["enclosure", "breaker", "critic", "format", "cover", "lint"]
+    assert exports == [result["quoteId"]]
+
+
+@pytest.mark.asyncio
+async def test_progress_is_monotonic_over_concurrent_calls(monkeypatch, exports):
+    _use(monkeypatch, FakeGateway())
+    queue = asyncio.Queue()
+
+    await estimate_service.create_quote(PAYLOAD, queue)
+
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    progress = [e["progress"] for e in events]
+    assert progress == sorted(progress)
+    assert [e["stage"] for e in events if e["status"] == "completed"][-2:] == ["export", "done"]
+    assert {"input", "enclosure", "layout", "format", "cover", "lint"} <= {e["stage"] for e in events}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("failing, failed_result, sibling", [
+    ("doc.lint", {"errors": 2, "warnings": 0}, "doc.policy_check"),
+    ("doc.policy_check", {"violations": 1}, "doc.lint"),
+])
+async def test_failed_gate_cancels_the_rest_of_the_plan(monkeypatch, exports, failing, failed_result, sibling):
+    """A lint or policy failure cancels the other check and skips the export"""
+    gateway = FakeGateway(results={failing: failed_result}, delays={sibling: 5.0})
+    _use(monkeypatch, gateway)
+    queue = asyncio.Queue()
+
+    with pytest.raises(ValueError, match="Quality gate"):
+        await asyncio.wait_for(estimate_service.create_quote(PAYLOAD, queue), timeout=2.0)
+
+    assert gateway.cancelled == [sibling]
+    assert ("end", sibling) not in gateway.events
+    assert exports == []
+    events = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert events[-1]["type"] == "ERROR"
+
+
+@pytest.fixture
+def stored_evidence(monkeypatch):
+    batches = []
+
+    async def upload_evidence_batch(quote_id, artifacts, concurrency=8):
+        batches.append((quote_id, artifacts))
+        return [{"id": "e1", "path": f"evidence/quote/{quote_id}/profile/x.json", "sha256": "0" * 64}]
+
+    monkeypatch.setattr(document_service, "upload_evidence_batch", upload_evidence_batch)
+    monkeypatch.setattr(config, "PROFILE_TOKEN", "s3cret")
+    return batches
+
+
+def _post_estimate(headers, raise_app_exceptions=True):
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=raise_app_exceptions)
+
+    async def post():
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/v1/estimate", json=PAYLOAD, headers=headers)
+
+    return post()
+
+
+@pytest.mark.asyncio
+async def test_profiled_estimate_stores_profile_evidence(monkeypatch, exports, stored_evidence):
+    """X-Profile with the right token attaches the stored profile to the quote"""
+    _use(monkeypatch, FakeGateway())
+
+    response = await _post_estimate({"X-Profile": "sample", "X-Profile-Token": "s3cret"})
+
+    assert response.status_code == 201
+    body = response.json()
+    [(quote_id, [artifact])] = stored_evidence
+    assert quote_id == body["quoteId"]
+    assert artifact["stage"] == "profile"
+    assert artifact["meta"]["trigger"] == "header"
+    assert body["evidence"]["profile"]["path"].startswith(f"evidence/quote/{quote_id}/profile/")
+
+
+@pytest.mark.asyncio
+async def test_profile_header_needs_the_token(monkeypatch, exports, stored_evidence):
+    _use(monkeypatch, FakeGateway())
+
+    response = await _post_estimate({"X-Profile": "sample", "X-Profile-Token": "wrong"})
+
+    assert response.status_code == 201
+    assert "profile" not in response.json()["evidence"]
+    assert stored_evidence == []
+
+
+@pytest.mark.asyncio
+async def test_failed_estimate_still_stores_its_profile(monkeypatch, exports, stored_evidence):
+    """A gate failure returns 500 and keeps the profile of the failed run"""
+    _use(monkeypatch, FakeGateway(results={"doc.lint": {"errors": 1, "warnings": 0}}))
+
+    response = await _post_estimate(
+        {"X-Profile": "sample", "X-Profile-Token": "s3cret"}, raise_app_exceptions=False,
+    )
+
+    assert response.status_code == 500
+    assert [artifact["stage"] for _, [artifact] in stored_evidence] == ["profile"]
+    assert exports == []
+
+
+class _Collect(tracing.SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exported():
+    exporter = _Collect()
+    tracing.configure(exporter)
+    yield exporter.spans
+    tracing.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_gateway_calls_are_traced_under_their_stage(monkeypatch, exports, exported):
+    """The shared client's mcp.call_tool spans nest in the request's stage spans"""
+    client = estimate_service.mcp_client
+    sent = []
+    execute = client._execute_tool_call
+
+    async def execute_tool_call(request_data, timeout):
+        sent.append(request_data)
+        return await execute(request_data, timeout)
+
+    monkeypatch.setattr(client, "base_url", "")
+    monkeypatch.setattr(client, "_execute_tool_call", execute_tool_call)
+    client.call_cache.clear()
+    trace_id = "0af7651916cd43dd8448eb211c80319c"
+
+    response = await _post_estimate({"traceparent": f"00-{trace_id}-b7ad6b7169203331-01"})
+    tracing.force_flush()
+
+    assert response.status_code == 201
+    by_id = {span.span_id: span for span in exported}
+    [request_span] = [span for span in exported if span.name == "POST /v1/estimate"]
+    calls = [span for span in exported if span.name == "mcp.call_tool"]
+    assert sorted(span.attributes["mcp.tool"] for span in calls) == sorted(estimate_service.PROGRESS_STAGES)
+    for call in calls:
+        stage = by_id[call.parent_id]
+        assert stage.name.startswith("stage.")
+        assert stage.parent_id == request_span.span_id
+        assert call.trace_id == trace_id
+    # Gateway requests carry the call span's context, not the request's
+    traceparents = {f"00-{trace_id}-{call.span_id}-01" for call in calls}
+    assert {request["traceparent"] for request in sent} == traceparents
@@ -1,7 +1,17 @@
 """Evidence Integrity Tests - SHA256 verification"""
 import hashlib
+import io
+import zipfile
+
 import pytest
-from api.services.document_service import upload_evidence, verify_evidence_integrity
+from api.services.document_service import (
+    bundle_index,
+    hash_file,
+    hash_stream,
+    upload_evidence,
+    upload_evidence_bundle,
+    verify_evidence_integrity,
+)
 
 pytestmark = pytest.mark.asyncio
 
@@ -50,3 +60,48 @@ async def test_evidence_path_structure():
     sha256_part = path.split("/")[-1].replace(f".{ext}", "")
     assert len(sha256_part) == 64
     assert sha256_part == result["sha256"]
+
+
+def _bundle_bytes(members: dict) -> bytes:
+    """Build an evidence bundle (zip with a SHA256 comment per member)"""
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for name, data in members.items():
+            info = zipfile.ZipInfo(name)
+            info.comment = b"sha256:" + hashlib.sha256(data).hexdigest().encode()
+            zf.writestr(info, data)
+    return buffer.getvalue()
+
+
+def test_bundle_index():
+    """Bundle index maps member names to their SHA256"""
+    members = {"placement/breaker_critic.svg": b"<svg/>", "lint/doc_lint_result_evidence.json": b"{}"}
+    index = bundle_index(_bundle_bytes(members))
+
+    assert index == {name: hashlib.sha256(data).hexdigest() for name, data in members.items()}
+    with pytest.raises(ValueError):
+        bundle_index(b"not a zip")
+
+
+@pytest.mark.asyncio
+async def test_evidence_bundle_upload():
+    """Whole-quote bundle uploads as one object with its member index"""
+    quote_id = "test-bundle-123"
+    bundle = _bundle_bytes({"enclosure/enclosure_plan.svg": b"<svg/>", "cover/cover_tab.png": b""})
+
+    result = await upload_evidence_bundle(quote_id, bundle)
+
+    assert result["path"] == f"evidence/quote/{quote_id}/bundle/{hashlib.sha256(bundle).hexdigest()}.zip"
+    assert result["stage"] == "bundle"
+    assert result["members"] == 2
+
+
+def test_streaming_hashes_match(tmp_path):
+    """Chunked file and stream hashing agree with a one-shot SHA256"""
+    data = bytes(range(256)) * 10_000
+    file_path = tmp_path / "evidence.pdf"
+    file_path.write_bytes(data)
+    expected = (hashlib.sha256(data).hexdigest(), len(data))
+
+    assert hash_file(file_path) == expected
+    assert hash_stream(data[i:i + 4096] for i in range(0, len(data), 4096)) == expected
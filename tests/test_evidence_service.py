@@ -0,0 +1,311 @@
+"""Evidence Service Tests - uploads and integrity checks against in-memory storage and DB"""
+import hashlib
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from api import storage as storage_module
+from api.services import document_service
+
+
+class FakeStorage:
+    """In-memory evidence bucket with the StorageClient methods the service uses"""
+
+    def __init__(self):
+        self.objects = {}
+        self.fail_paths = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.streamed_uploads = []
+        self.download_chunk_sizes = []
+        self.etags = {}
+        self.downloads = 0
+        self._lock = threading.Lock()
+
+    def upload_file(self, path, file_data, content_type="application/octet-stream"):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(0.01)
+            if any(path.endswith(suffix) for suffix in self.fail_paths):
+                raise IOError(f"upload refused: {path}")
+            self.objects[path] = bytes(file_data)
+            self.etags[path] = "v1"
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return {"path": path, "uploaded": True}
+
+    def upload_path(self, path, local_path, content_type="application/octet-stream"):
+        with open(local_path, "rb") as f:
+            self.objects[path] = b"".join(iter(lambda: f.read(64 * 1024), b""))
+        self.streamed_uploads.append(path)
+        return {"path": path, "uploaded": True}
+
+    def download_stream(self, path, chunk_size=1024 * 1024):
+        self.downloads += 1
+        self.download_chunk_sizes.append(chunk_size)
+        data = self.objects[path]
+        for start in range(0, len(data), chunk_size):
+            yield data[start:start + chunk_size]
+
+    def stat(self, path):
+        if path not in self.objects:
+            raise FileNotFoundError(f"Object not found: {path}")
+        return {"etag": self.etags.get(path), "last_modified": None, "size": len(self.objects[path])}
+
+    def replace(self, path, data, etag):
+        self.objects[path] = data
+        self.etags[path] = etag
+
+
+class FakeResult:
+    def __init__(self, rows=()):
+        self._rows = list(rows)
+
+    def scalars(self):
+        return SimpleNamespace(all=lambda: list(self._rows))
+
+    def fetchone(self):
+        return self._rows[0] if self._rows else None
+
+    def fetchall(self):
+        return [SimpleNamespace(_mapping=row) for row in self._rows]
+
+
+class FakeDB:
+    """evidence_blobs / evidence_verifications tables for the statements the service issues"""
+
+    def __init__(self):
+        self.blobs = []
+        self.inserts = 0
+        self.verifications = {}
+        self.pages = 0
+        self.upserts = 0
+
+    def __call__(self):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, db):
+        self.db = db
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def commit(self):
+        pass
+
+    async def execute(self, query, params):
+        sql = str(query)
+        if "WHERE quote_id = :quote_id AND stage = :stage" in sql:
+            matches = [
+                (row["path"], row["sha256"]) for row in self.db.blobs
+                if row["quote_id"] == params["quote_id"] and row["stage"] == params["stage"]
+            ]
+            return FakeResult(matches[-1:])
+        if "LEFT JOIN estimator.evidence_verifications" in sql:
+            self.db.pages += 1
+            after, page_size = params["after"], params["page_size"]
+            page = []
+            for row in sorted(self.db.blobs, key=lambda r: r["id"]):
+                if after is None or row["id"] > after:
+                    version, sha256 = self.db.verifications.get(row["id"], (None, None))
+                    page.append({**row, "object_version": version, "verified_sha256": sha256})
+            return FakeResult(page[:page_size])
+        if "INSERT INTO estimator.evidence_verifications" in sql:
+            self.db.upserts += 1
+            for key in params:
+                if key.startswith("blob_id_"):
+                    i = key[len("blob_id_"):]
+                    self.db.verifications[params[key]] = (params[f"object_version_{i}"], params[f"sha256_{i}"])
+            return FakeResult()
+        assert "INSERT INTO estimator.evidence_blobs" in sql
+        self.db.inserts += 1
+        count = sum(1 for key in params if key.startswith("id_"))
+        rows = [
+            {column: params[f"{column}_{i}"] for column in ("id", "quote_id", "stage", "path", "sha256", "meta")}
+            for i in range(count)
+        ]
+        self.db.blobs.extend(rows)
+        return FakeResult(row["id"] for row in rows)
+
+
+@pytest.fixture
+def storage(monkeypatch):
+    fake = FakeStorage()
+    monkeypatch.setattr(document_service, "storage_client", fake)
+    return fake
+
+
+@pytest.fixture
+def db(monkeypatch):
+    fake = FakeDB()
+    monkeypatch.setattr(document_service, "AsyncSessionLocal", fake)
+    return fake
+
+
+def _artifacts(n):
+    return [
+        {"stage": "enclosure", "file_bytes": f"evidence-{i}".encode(), "ext": "json", "meta": {"n": i}}
+        for i in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_batch_uploads_every_artifact_and_inserts_once(storage, db):
+    """All artefacts are stored and recorded with one multi-row INSERT"""
+    quote_id = str(uuid.uuid4())
+    artifacts = _artifacts(3)
+
+    results = await document_service.upload_evidence_batch(quote_id, artifacts)
+
+    assert [r["sha256"] for r in results] == [
+        hashlib.sha256(a["file_bytes"]).hexdigest() for a in artifacts
+    ]
+    assert [r["path"] for r in results] == [
+        f"evidence/quote/{quote_id}/enclosure/{r['sha256']}.json" for r in results
+    ]
+    assert db.inserts == 1
+    assert [row["id"] for row in db.blobs] == [r["id"] for r in results]
+    assert [row["meta"] for row in db.blobs] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert {r["path"]: storage.objects[r["path"]] for r in results} == {
+        r["path"]: a["file_bytes"] for r, a in zip(results, artifacts)
+    }
+
+
+@pytest.mark.asyncio
+async def test_batch_bounds_concurrent_uploads(storage, db):
+    await document_service.upload_evidence_batch("q", _artifacts(8), concurrency=2)
+
+    assert len(storage.objects) == 8
+    assert 1 <= storage.max_in_flight <= 2
+
+
+@pytest.mark.asyncio
+async def test_batch_validates_before_uploading(storage, db):
+    """A bad stage fails the batch before anything is stored"""
+    artifacts = _artifacts(2) + [{"stage": "nope", "file_bytes": b"x", "ext": "json"}]
+
+    with pytest.raises(ValueError):
+        await document_service.upload_evidence_batch("q", artifacts)
+
+    assert storage.objects == {}
+    assert db.inserts == 0
+
+
+@pytest.mark.asyncio
+async def test_batch_upload_failure_skips_insert(storage, db):
+    """No evidence_blobs row is written when any upload fails"""
+    artifacts = _artifacts(3)
+    storage.fail_paths.add(hashlib.sha256(b"evidence-1").hexdigest() + ".json")
+
+    with pytest.raises(RuntimeError):
+        await document_service.upload_evidence_batch("q", artifacts)
+
+    assert db.inserts == 0
+
+
+@pytest.mark.asyncio
+async def test_empty_batch_is_a_no_op(storage, db):
+    assert await document_service.upload_evidence_batch("q", []) == []
+    assert db.inserts == 0
+
+
+@pytest.mark.asyncio
+async def test_file_evidence_is_hashed_and_uploaded_from_disk(storage, db, tmp_path):
+    """upload_evidence_file streams the file; its hash matches a one-shot SHA256"""
+    data = bytes(range(256)) * 20_000
+    file_path = tmp_path / "drawing.dxf"
+    file_path.write_bytes(data)
+
+    result = await document_service.upload_evidence_file("q", "cover", file_path, "dxf")
+
+    assert result["sha256"] == hashlib.sha256(data).hexdigest()
+    assert storage.streamed_uploads == [result["path"]]
+    assert storage.objects[result["path"]] == data
+    assert db.blobs[0]["path"] == result["path"]
+
+
+@pytest.mark.asyncio
+async def test_integrity_check_hashes_a_streamed_download(storage, db):
+    """verify_evidence_integrity hashes the object chunk by chunk"""
+    data = b"x" * (3 * document_service.EVIDENCE_CHUNK_SIZE + 17)
+    uploaded = await document_service.upload_evidence("q", "format", data, "pdf")
+
+    result = await document_service.verify_evidence_integrity("q", "format")
+    assert result["valid"] is True
+    assert result["computed_hash"] == uploaded["sha256"]
+    assert storage.download_chunk_sizes == [document_service.EVIDENCE_CHUNK_SIZE]
+
+    storage.objects[uploaded["path"]] = data[:-1] + b"y"
+    result = await document_service.verify_evidence_integrity("q", "format")
+    assert result["valid"] is False
+
+
+def test_storage_download_stream_yields_chunks(monkeypatch):
+    """StorageClient.download_stream streams the signed URL body in chunk_size pieces"""
+    body = bytes(range(256)) * 40
+    transport = httpx.MockTransport(lambda request: httpx.Response(200, content=body))
+
+    def stream(method, url, **kwargs):
+        kwargs.pop("timeout", None)
+        return httpx.Client(transport=transport).stream(method, url, **kwargs)
+
+    client = storage_module.StorageClient.__new__(storage_module.StorageClient)
+    client.bucket = "evidence"
+    monkeypatch.setattr(client, "create_signed_url", lambda path, expires_in=600: "https://storage.test/o")
+    monkeypatch.setattr(storage_module.httpx, "stream", stream)
+
+    chunks = list(client.download_stream("quote/q/format/x.pdf", chunk_size=1000))
+
+    assert b"".join(chunks) == body
+    assert all(len(chunk) == 1000 for chunk in chunks[:-1])
+
+
+@pytest.mark.asyncio
+async def test_bulk_audit_pages_and_caches_verified_blobs(storage, db):
+    """Keyset pages cover every blob; unchanged objects are not downloaded again"""
+    results = await document_service.upload_evidence_batch("q", _artifacts(5))
+
+    first = await document_service.verify_evidence_bulk(page_size=2)
+    assert (first["checked"], first["verified"], first["cached"]) == (5, 5, 0)
+    assert first["mismatched"] == [] and first["errors"] == []
+    assert db.pages == 4  # three pages, then the empty one
+    assert set(db.verifications) == {r["id"] for r in results}
+    assert storage.downloads == 5
+
+    tampered = results[1]
+    storage.replace(tampered["path"], b"tampered", etag="v2")
+    second = await document_service.verify_evidence_bulk(page_size=2)
+    assert (second["checked"], second["verified"], second["cached"]) == (5, 0, 4)
+    assert second["mismatched"] == [{
+        "id": tampered["id"],
+        "path": tampered["path"],
+        "stored_hash": tampered["sha256"],
+        "computed_hash": hashlib.sha256(b"tampered").hexdigest(),
+    }]
+    assert storage.downloads == 6
+
+
+@pytest.mark.asyncio
+async def test_bulk_audit_without_cache_and_with_missing_objects(storage, db):
+    """use_cache=False re-downloads everything; storage errors are reported per blob"""
+    results = await document_service.upload_evidence_batch("q", _artifacts(3))
+    await document_service.verify_evidence_bulk()
+    del storage.objects[results[2]["path"]]
+
+    summary = await document_service.verify_evidence_bulk(use_cache=False)
+
+    assert (summary["checked"], summary["verified"], summary["cached"]) == (3, 2, 0)
+    assert [e["id"] for e in summary["errors"]] == [results[2]["id"]]
+    assert storage.downloads == 5
@@ -0,0 +1,76 @@
+"""
+KIS Estimator - MCP Idempotency Cache Tests
+Canonical keys, LRU size bound, TTL expiry and hit/miss metrics
+"""
+
+import pytest
+
+from api.integrations.idempotency_cache import IdempotencyCache, canonical_key
+from api.metrics import CACHE_ENTRIES, CACHE_EVICTIONS, CACHE_REQUESTS
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_canonical_key_ignores_dict_order():
+    a = canonical_key("enclosure.solve", {"panels": [{"w": 1, "h": 2}], "ip": "IP54"})
+    b = canonical_key("enclosure.solve", {"ip": "IP54", "panels": [{"h": 2, "w": 1}]})
+    assert a == b
+    assert a != canonical_key("enclosure.validate", {"ip": "IP54", "panels": [{"h": 2, "w": 1}]})
+    assert a != canonical_key("enclosure.solve", {"ip": "IP55", "panels": [{"h": 2, "w": 1}]})
+
+
+def test_hits_return_copies_and_count():
+    cache = IdempotencyCache("t_copies")
+    cache.set("k", {"fit_score": 0.95, "dims": [1, 2]})
+
+    first = cache.get("k")
+    first["dims"].append(3)
+    assert cache.get("k") == {"fit_score": 0.95, "dims": [1, 2]}
+    assert cache.get("missing") is None
+
+    assert CACHE_REQUESTS.value(cache="t_copies", result="hit") == 2
+    assert CACHE_REQUESTS.value(cache="t_copies", result="miss") == 1
+
+
+def test_size_bound_evicts_least_recently_used():
+    cache = IdempotencyCache("t_lru", max_entries=3)
+    for i in range(3):
+        cache.set(f"k{i}", i)
+    assert cache.get("k0") == 0  # k1 becomes least recently used
+
+    for i in range(3, 100):
+        cache.set(f"k{i}", i)
+        assert len(cache) <= 3
+
+    assert cache.get("k1") is None
+    assert cache.get("k99") == 99
+    assert CACHE_ENTRIES.value(cache="t_lru") == 3
+    assert CACHE_EVICTIONS.value(cache="t_lru", reason="capacity") == 97
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = IdempotencyCache("t_ttl", ttl_seconds=60, clock=clock)
+    cache.set("old", 1)
+    clock.now += 30
+    cache.set("young", 2)
+
+    clock.now += 31
+    assert cache.get("old") is None
+    assert cache.get("young") == 2
+
+    clock.now += 60
+    cache.set("new", 3)  # insert sweeps the expired cold end
+    assert len(cache) == 1
+    assert CACHE_EVICTIONS.value(cache="t_ttl", reason="expired") == 2
+
+
+def test_max_entries_validated():
+    with pytest.raises(ValueError):
+        IdempotencyCache("t_invalid", max_entries=0)
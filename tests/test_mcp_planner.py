@@ -0,0 +1,102 @@
+"""
+KIS Estimator - MCP Call Planner Tests
+Independent tool calls overlap; dependencies, bounds and failures hold
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from api.integrations.mcp_planner import MCPCallPlan
+
+DELAY = 0.05
+
+
+def _recording_caller(log, delay=DELAY):
+    in_flight = {"now": 0, "max": 0}
+
+    async def call_tool(tool, params):
+        in_flight["now"] += 1
+        in_flight["max"] = max(in_flight["max"], in_flight["now"])
+        log.append(("start", tool))
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            in_flight["now"] -= 1
+        log.append(("end", tool))
+        return {"tool": tool, "params": params}
+
+    return call_tool, in_flight
+
+
+def _lint_plan(**kwargs):
+    plan = MCPCallPlan(**kwargs)
+    plan.add("cover", "doc.cover_generate", {"customer": "c"})
+    plan.add("lint", "doc.lint", lambda r: {"document": r["cover"]}, after=["cover"])
+    plan.add("policy", "doc.policy_check", lambda r: {"document": r["cover"]}, after=["cover"])
+    return plan
+
+
+def test_independent_calls_run_concurrently():
+    log = []
+    call_tool, in_flight = _recording_caller(log)
+    plan = _lint_plan()
+
+    start = time.perf_counter()
+    results = asyncio.run(plan.run(call_tool))
+    elapsed = time.perf_counter() - start
+
+    # cover, then lint || policy: two round trips, not three
+    assert elapsed < 2.8 * DELAY
+    assert in_flight["max"] == 2
+    assert results["lint"]["params"] == {"document": results["cover"]}
+    assert plan.critical_path() == ["cover", "lint"]
+
+
+def test_dependencies_finish_before_dependents_start():
+    log = []
+    call_tool, _ = _recording_caller(log, delay=0.01)
+    asyncio.run(_lint_plan().run(call_tool))
+
+    cover_end = log.index(("end", "doc.cover_generate"))
+    assert log.index(("start", "doc.lint")) > cover_end
+    assert log.index(("start", "doc.policy_check")) > cover_end
+
+
+def test_concurrency_is_bounded():
+    log = []
+    call_tool, in_flight = _recording_caller(log, delay=0.01)
+    plan = MCPCallPlan(max_concurrency=2)
+    for i in range(6):
+        plan.add(f"n{i}", "rag.verify", {"i": i})
+
+    results = asyncio.run(plan.run(call_tool))
+    assert len(results) == 6
+    assert in_flight["max"] == 2
+
+
+def test_failed_check_cancels_pending_calls():
+    log = []
+    call_tool, _ = _recording_caller(log, delay=0.01)
+
+    def reject(result):
+        raise ValueError("Document lint errors: 1")
+
+    plan = MCPCallPlan()
+    plan.add("lint", "doc.lint", {}, check=reject)
+    plan.add("slow", "doc.policy_check", {})
+    plan.add("after", "doc.apply_branding", {}, after=["lint"])
+
+    with pytest.raises(ValueError, match="lint errors"):
+        asyncio.run(plan.run(call_tool))
+    assert ("start", "doc.apply_branding") not in log
+
+
+def test_unknown_or_duplicate_dependencies_rejected():
+    plan = MCPCallPlan()
+    plan.add("a", "doc.lint", {})
+    with pytest.raises(ValueError):
+        plan.add("a", "doc.lint", {})
+    with pytest.raises(ValueError):
+        plan.add("b", "doc.lint", {}, after=["missing"])
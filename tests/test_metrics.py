@@ -0,0 +1,93 @@
+"""
+KIS Estimator - /metrics Registry Tests
+Prometheus text exposition of histograms, counters and scrape-time gauges
+"""
+
+import asyncio
+
+import pytest
+
+from api.metrics import Registry, record_cache, registry, stage_timer
+
+
+@pytest.fixture
+def reg():
+    return Registry()
+
+
+def _sample(text: str, prefix: str) -> float:
+    line = next(line for line in text.splitlines() if line.startswith(prefix + " "))
+    return float(line.rsplit(" ", 1)[1])
+
+
+def test_histogram_buckets_are_cumulative(reg):
+    hist = reg.histogram("t_seconds", "test", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        hist.observe(value, route="/v1/estimate")
+
+    text = reg.render()
+    assert "# TYPE t_seconds histogram" in text
+    assert _sample(text, 't_seconds_bucket{route="/v1/estimate",le="0.1"}') == 1
+    assert _sample(text, 't_seconds_bucket{route="/v1/estimate",le="1.0"}') == 3
+    assert _sample(text, 't_seconds_bucket{route="/v1/estimate",le="+Inf"}') == 4
+    assert _sample(text, 't_seconds_count{route="/v1/estimate"}') == 4
+    assert _sample(text, 't_seconds_sum{route="/v1/estimate"}') == pytest.approx(4.05)
+
+
+def test_labels_must_match(reg):
+    counter = reg.counter("t_total", "test", ("tool",))
+    with pytest.raises(ValueError):
+        counter.inc(route="/x")
+
+
+def test_same_name_returns_same_metric(reg):
+    assert reg.counter("t_total", "test") is reg.counter("t_total", "test")
+    with pytest.raises(ValueError):
+        reg.gauge("t_total", "test")
+
+
+def test_label_values_escaped(reg):
+    reg.counter("t_total", "test", ("tool",)).inc(tool='a"b\\c')
+    assert 't_total{tool="a\\"b\\\\c"} 1' in reg.render()
+
+
+def test_collectors_run_at_scrape(reg):
+    gauge = reg.gauge("t_pool", "test", ("state",))
+    calls = []
+
+    def collect():
+        calls.append(1)
+        gauge.set(len(calls), state="checked_out")
+
+    def broken():
+        raise RuntimeError("pool gone")
+
+    reg.register_collector(broken)
+    reg.register_collector(collect)
+    assert _sample(reg.render(), 't_pool{state="checked_out"}') == 1
+    assert _sample(reg.render(), 't_pool{state="checked_out"}') == 2
+
+
+def test_cache_hit_ratio():
+    for hit in (True, True, True, False):
+        record_cache("test_ratio", hit)
+
+    text = registry.render()
+    assert _sample(text, 'kis_cache_requests_total{cache="test_ratio",result="hit"}') == 3
+    assert _sample(text, 'kis_cache_hit_ratio{cache="test_ratio"}') == 0.75
+
+
+def test_stage_timer_records_outcome():
+    async def stage(fail: bool):
+        with stage_timer("test_stage"):
+            await asyncio.sleep(0)
+            if fail:
+                raise ValueError("gate failed")
+
+    asyncio.run(stage(False))
+    with pytest.raises(ValueError):
+        asyncio.run(stage(True))
+
+    text = registry.render()
+    assert _sample(text, 'kis_estimate_stage_duration_seconds_count{stage="test_stage",outcome="ok"}') == 1
+    assert _sample(text, 'kis_estimate_stage_duration_seconds_count{stage="test_stage",outcome="error"}') == 1
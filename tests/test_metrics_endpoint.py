@@ -0,0 +1,60 @@
+"""
+KIS Estimator - /metrics scrape through the app
+Request and stage histograms recorded by the middleware and the pipeline
+"""
+
+import httpx
+import pytest
+
+from api.integrations.mcp_gateway_stub import mock_tool_result
+from api.main import app
+from api.metrics import CONTENT_TYPE
+from api.services import document_service, estimate_service
+
+
+@pytest.fixture
+def client():
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+@pytest.fixture
+def offline_pipeline(monkeypatch):
+    """Gateway results and exports without the MCP gateway or Supabase"""
+    async def call_tool(tool, params):
+        return mock_tool_result(tool, params)
+
+    async def export_pdf_xlsx(quote_id, quote_data):
+        return {"pdf": {"path": "p.pdf"}, "xlsx": {"path": "p.xlsx"}}
+
+    monkeypatch.setattr(estimate_service.mcp_client, "call_tool", call_tool)
+    monkeypatch.setattr(document_service, "export_pdf_xlsx", export_pdf_xlsx)
+
+
+@pytest.mark.asyncio
+async def test_scrape_reports_requests_by_route_template(client):
+    async with client:
+        assert (await client.get("/healthz")).status_code == 200
+        assert (await client.get("/v1/estimate/q-123")).status_code == 200
+        response = await client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE
+    text = response.text
+    assert "# TYPE kis_http_request_duration_seconds histogram" in text
+    assert 'kis_http_request_duration_seconds_count{method="GET",route="/healthz",status="200"}' in text
+    # Path parameters are folded into the template, not one series per id
+    assert 'route="/v1/estimate/{id}"' in text
+    assert "q-123" not in text
+
+
+@pytest.mark.asyncio
+async def test_scrape_reports_pipeline_stages(client, offline_pipeline):
+    payload = {"customer": {"name": "Test"}, "panels": [{"name": "Main", "breakers": []}]}
+    async with client:
+        await client.post("/v1/estimate", json=payload)
+        text = (await client.get("/metrics")).text
+
+    for stage in ("input", "enclosure", "export"):
+        assert f'kis_estimate_stage_duration_seconds_count{{stage="{stage}",outcome="ok"}}' in text
+    assert 'route="/v1/estimate",status="' in text
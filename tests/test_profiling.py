@@ -0,0 +1,118 @@
+"""
+KIS Estimator - Quote Profiling Tests
+Header- and threshold-triggered profiles captured as evidence artefacts
+"""
+
+import asyncio
+import marshal
+import pstats
+import threading
+import time
+
+import pytest
+
+from api.profiling import profile_call, profile_mode, requested_profile
+
+
+def _busy(ms: float) -> None:
+    """Hold the event loop thread (CPU work the sampler can see)."""
+    end = time.perf_counter() + ms / 1000
+    while time.perf_counter() < end:
+        pass
+
+
+async def _slow_stage(ms: float) -> None:
+    await asyncio.sleep(0)
+    _busy(ms)
+
+
+def _run(mode=None, threshold_ms=0, work_ms=0):
+    async def main():
+        async with profile_call(mode, threshold_ms=threshold_ms, interval_ms=1) as capture:
+            await _slow_stage(work_ms)
+        return capture
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("value,mode", [
+    ("cprofile", "cprofile"),
+    ("Sample", "sample"),
+    ("1", "sample"),
+    ("", None),
+    (None, None),
+    ("flame", None),
+])
+def test_profile_mode(value, mode):
+    assert profile_mode(value) == mode
+
+
+@pytest.mark.parametrize("headers,token,mode", [
+    ({"X-Profile": "cprofile", "X-Profile-Token": "s3cret"}, "s3cret", "cprofile"),
+    ({"X-Profile": "cprofile", "X-Profile-Token": "wrong"}, "s3cret", None),
+    ({"X-Profile": "sample"}, "s3cret", None),
+    ({"X-Profile": "sample", "X-Profile-Token": ""}, "", None),
+])
+def test_header_requires_profile_token(headers, token, mode):
+    assert requested_profile(headers, token) == mode
+
+
+def test_fast_call_under_threshold_not_profiled():
+    capture = _run(threshold_ms=500, work_ms=1)
+    assert capture.artifact is None
+    assert capture.mode is None
+
+
+def test_threshold_starts_sampler():
+    capture = _run(threshold_ms=20, work_ms=150)
+
+    artifact = capture.artifact
+    assert artifact["stage"] == "profile" and artifact["ext"] == "folded"
+    assert artifact["meta"]["trigger"] == "threshold"
+    assert artifact["meta"]["started_after_ms"] >= 20
+    assert artifact["meta"]["samples"] > 0
+    assert b"_busy" in artifact["file_bytes"]
+
+
+def test_header_sample():
+    capture = _run(mode="sample", work_ms=50)
+
+    assert capture.artifact["meta"]["trigger"] == "header"
+    lines = capture.artifact["file_bytes"].decode().splitlines()
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in lines)
+
+
+def test_header_cprofile_is_pstats(tmp_path):
+    capture = _run(mode="cprofile", work_ms=10)
+
+    assert capture.artifact["ext"] == "prof"
+    path = tmp_path / "quote.prof"
+    path.write_bytes(capture.artifact["file_bytes"])
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "_busy" for func in stats.stats)
+    assert marshal.loads(capture.artifact["file_bytes"]) == stats.stats
+
+
+def test_overlapping_cprofile_falls_back_to_sampler():
+    async def one():
+        async with profile_call("cprofile", interval_ms=1) as capture:
+            await asyncio.sleep(0.02)
+            _busy(10)
+        return capture
+
+    async def main():
+        return await asyncio.gather(one(), one())
+
+    first, second = asyncio.run(main())
+    assert sorted(c.artifact["ext"] for c in (first, second)) == ["folded", "prof"]
+
+    # The lock is released: a later call gets cProfile again
+    assert _run(mode="cprofile", work_ms=1).artifact["ext"] == "prof"
+
+
+def test_cancelled_deadline_never_samples():
+    capture = _run(threshold_ms=20, work_ms=1)
+    time.sleep(0.06)
+
+    assert capture.artifact is None
+    assert not any(t.name == "kis-profile-sampler" for t in threading.enumerate())
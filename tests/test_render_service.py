@@ -0,0 +1,105 @@
+"""Document Rendering Tests - Jinja2 HTML, XLSX and worker pool"""
+import io
+
+import pytest
+
+from api.services.render_service import DocumentRenderer, build_context, context_to_xlsx
+
+pytestmark = pytest.mark.asyncio
+
+QUOTE = {
+    "customer": {"name": "테스트 고객 <A&B>"},
+    "items": [
+        {"name": "Main Breaker", "spec": "4P 100A", "qty": 1, "unit_price": 120000},
+        {"desc": "Branch Breaker", "spec": "2P 20A", "qty": 12, "unit_price": 8000, "total": 96000},
+    ],
+}
+
+
+def fake_pdf(html: str, base_url=None) -> bytes:
+    """Stand-in converter so tests do not need weasyprint"""
+    return b"%PDF-" + html.encode("utf-8")
+
+
+def failing_pdf(html: str, base_url=None) -> bytes:
+    raise ValueError("converter crashed")
+
+
+@pytest.fixture
+def renderer():
+    r = DocumentRenderer(max_workers=2, use_processes=False, pdf_converter=fake_pdf)
+    yield r
+    r.shutdown()
+
+
+def test_build_context_fills_totals():
+    """Line and grand totals are derived when missing"""
+    context = build_context("Q-1", QUOTE)
+
+    assert [item["total"] for item in context["items"]] == [120000, 96000]
+    assert context["items"][1]["name"] == "Branch Breaker"
+    assert context["totals"]["total"] == 216000
+
+
+def test_html_template_compiled_once(renderer):
+    """The PDF template is compiled on first use and reused"""
+    context = build_context("Q-1", QUOTE)
+    html = renderer.render_html(context)
+
+    assert renderer.pdf_template is renderer.pdf_template
+    assert "Q-1" in html
+    assert "₩216,000" in html
+    assert "&lt;A&amp;B&gt;" in html
+
+
+def test_xlsx_has_items_and_total_formula():
+    openpyxl = pytest.importorskip("openpyxl")
+    data = context_to_xlsx(build_context("Q-1", QUOTE))
+
+    sheet = openpyxl.load_workbook(io.BytesIO(data))["Estimate"]
+    assert sheet["B6"].value == "Main Breaker"
+    assert sheet["F7"].value == 96000
+    assert sheet["F9"].value == "=SUM(F6:F7)"
+
+
+def test_xlsx_overflow_moves_the_total_row():
+    """Items beyond the template block push the total down and widen its SUM"""
+    openpyxl = pytest.importorskip("openpyxl")
+    quote = {"items": [{"name": f"CB{i}", "qty": 1, "unit_price": 1000} for i in range(5)]}
+    data = context_to_xlsx(build_context("Q-1", quote))
+
+    sheet = openpyxl.load_workbook(io.BytesIO(data))["Estimate"]
+    assert [sheet.cell(row, 1).value for row in range(6, 11)] == [1, 2, 3, 4, 5]
+    assert sheet["E12"].value == "합계"
+    assert sheet["F12"].value == "=SUM(F6:F10)"
+    assert sheet["F10"].number_format == sheet["F6"].number_format == "#,##0"
+
+
+def test_shared_renderer_is_created_on_first_use(monkeypatch):
+    """Importing the document service starts no renderer or worker pool"""
+    from api.services import document_service
+
+    monkeypatch.setattr(document_service, "_renderer", None)
+    renderer = document_service.get_renderer()
+
+    assert document_service.get_renderer() is renderer
+    assert renderer._executor is None
+    document_service.shutdown_renderer()
+    assert document_service._renderer is None
+
+
+async def test_render_returns_both_formats(renderer):
+    docs = await renderer.render("Q-1", QUOTE)
+
+    assert docs["pdf"].startswith(b"%PDF-")
+    assert docs["xlsx"][:2] == b"PK"
+
+
+async def test_render_failure_raises_runtime_error():
+    renderer = DocumentRenderer(max_workers=1, use_processes=False, pdf_converter=failing_pdf)
+
+    with pytest.raises(RuntimeError) as exc_info:
+        await renderer.render("Q-1", QUOTE)
+
+    assert "converter crashed" in str(exc_info.value)
+    renderer.shutdown()
@@ -0,0 +1,168 @@
+"""
+KIS Estimator - Span Tracing Tests
+Trace context propagation and OTLP/JSON export (file and collector)
+"""
+
+import asyncio
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from api import tracing
+from api.metrics import stage_timer
+
+
+class _Collect(tracing.SpanExporter):
+    def __init__(self):
+        self.spans = []
+
+    def export(self, spans):
+        self.spans.extend(spans)
+
+
+@pytest.fixture
+def exported():
+    exporter = _Collect()
+    tracing.configure(exporter)
+    yield exporter.spans
+    tracing.shutdown()
+
+
+def _by_name(spans):
+    return {span.name: span for span in spans}
+
+
+def test_nested_spans_share_trace(exported):
+    trace_id = tracing.normalize_trace_id(str(uuid.uuid4()))
+
+    async def request():
+        with tracing.span("POST /v1/estimate", kind="server", trace_id=trace_id):
+            with stage_timer("enclosure"):
+                with tracing.span("mcp.call_tool", kind="client"):
+                    await asyncio.to_thread(
+                        lambda: tracing.start_span("db.query", kind="client").end()
+                    )
+
+    asyncio.run(request())
+    tracing.force_flush()
+
+    spans = _by_name(exported)
+    assert {s.trace_id for s in exported} == {trace_id}
+    assert spans["POST /v1/estimate"].parent_id is None
+    assert spans["stage.enclosure"].parent_id == spans["POST /v1/estimate"].span_id
+    assert spans["mcp.call_tool"].parent_id == spans["stage.enclosure"].span_id
+    assert spans["db.query"].parent_id == spans["mcp.call_tool"].span_id
+    assert tracing.current_span() is None
+
+
+def test_error_status(exported):
+    with pytest.raises(ValueError):
+        with tracing.span("stage.lint"):
+            raise ValueError("lint errors: 2")
+    tracing.force_flush()
+
+    otlp = exported[0].to_otlp()
+    assert otlp["status"] == {"code": tracing.STATUS_ERROR, "message": "ValueError: lint errors: 2"}
+
+
+@pytest.mark.parametrize("value,expected", [
+    ("550e8400-e29b-41d4-a716-446655440000", "550e8400e29b41d4a716446655440000"),
+    ("4BF92F3577B34DA6A3CE929D0E0E4736", "4bf92f3577b34da6a3ce929d0e0e4736"),
+])
+def test_normalize_trace_id(value, expected):
+    assert tracing.normalize_trace_id(value) == expected
+
+
+def test_normalize_opaque_trace_id_is_stable():
+    first = tracing.normalize_trace_id("req-42")
+    assert first == tracing.normalize_trace_id("req-42")
+    assert len(first) == 32
+
+
+def test_parse_traceparent():
+    header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+    assert tracing.parse_traceparent(header) == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7")
+    assert tracing.parse_traceparent("garbage") is None
+    assert tracing.parse_traceparent(None) is None
+    trace_id, span_id = "4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7"
+    for bad in (
+        f"00-{trace_id[:-1]}z-{span_id}-01",  # non-hex trace id
+        f"00-{trace_id}-{span_id[:-1]}g-01",  # non-hex parent id
+        f"00-{trace_id.upper()}-{span_id}-01",  # uppercase
+        f"ff-{trace_id}-{span_id}-01",  # forbidden version
+        f"0x-{trace_id}-{span_id}-01",  # non-hex version
+        f"00-{trace_id}-{span_id}-01-extra",  # v00 has exactly four fields
+        f"00-{trace_id}-{span_id}-1",  # short flags
+    ):
+        assert tracing.parse_traceparent(bad) is None, bad
+    assert tracing.parse_traceparent(f"01-{trace_id}-{span_id}-01-future") == (trace_id, span_id)
+
+
+def test_file_exporter_writes_otlp_json(tmp_path):
+    path = tmp_path / "traces" / "spans.jsonl"
+    tracing.setup("file", file_path=str(path))
+    try:
+        with tracing.span("storage.upload", kind="client", attributes={"storage.path": "a/b.json", "size": 3}):
+            pass
+    finally:
+        tracing.shutdown()
+
+    request = json.loads(path.read_text().splitlines()[0])
+    resource = request["resourceSpans"][0]
+    assert resource["resource"]["attributes"][0]["value"]["stringValue"] == tracing.SERVICE_NAME
+    span = resource["scopeSpans"][0]["spans"][0]
+    assert span["name"] == "storage.upload"
+    assert span["kind"] == 3
+    assert int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"])
+    assert {"key": "size", "value": {"intValue": "3"}} in span["attributes"]
+
+
+def test_otlp_exporter_posts_to_collector():
+    received = []
+
+    class Collector(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Collector)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        tracing.setup("otlp", endpoint=f"http://127.0.0.1:{server.server_port}")
+        with tracing.span("GET /healthz", kind="server"):
+            pass
+        tracing.shutdown()
+    finally:
+        server.shutdown()
+
+    path, request = received[0]
+    assert path == "/v1/traces"
+    assert request["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["name"] == "GET /healthz"
+
+
+def test_unknown_exporter():
+    with pytest.raises(ValueError):
+        tracing.setup("jaeger")
+
+
+def test_full_queue_drops_instead_of_blocking():
+    class Blocked(tracing.SpanExporter):
+        def export(self, spans):
+            pass
+
+    processor = tracing.BatchSpanProcessor(Blocked(), max_queue_size=2, interval_s=60)
+    try:
+        for _ in range(5):
+            processor.on_end(tracing.Span("x"))
+        assert processor.dropped >= 1
+    finally:
+        processor.shutdown()
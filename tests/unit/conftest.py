@@ -0,0 +1,32 @@
+"""
+Shared fixtures for engine unit tests
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+from _util_io import write_json
+
+
+@pytest.fixture
+def fixed_breakers():
+    """Pin the placer's input for a work dir (it draws random demo breakers otherwise)"""
+    breakers = [{"id": f"CB{i:02d}", "poles": 1 + i % 3, "current_a": 16 + 4 * i, "heat_w": 5.0 + i}
+                for i in range(1, 13)]
+
+    def pin(work: Path):
+        write_json(work / "input" / "breakers.json", {"breakers": breakers})
+
+    return pin
+
+
+@pytest.fixture
+def frozen_clock(monkeypatch):
+    """Pin ``time.time`` so two runs render the same timestamps into their evidence"""
+    monkeypatch.setattr(time, "time", lambda: 1_700_000_000.0)
@@ -0,0 +1,101 @@
+"""
+Unit tests for the single-pass document lint engine
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import doc_lint_guard
+import pipeline
+from _svg import available_evidence
+
+
+def _strip_ts(result):
+    return {k: v for k, v in result.items() if k != "ts"}
+
+
+@pytest.fixture
+def work(tmp_path):
+    """Work directory with every FIX-4 stage written, plus the stage results"""
+    work = tmp_path / "work"
+    results = pipeline.run_stages(work)
+    return work, results
+
+
+class TestLintDocuments:
+    def test_in_memory_matches_disk(self, work):
+        work, results = work
+        documents = {doc: results[stage] for doc, stage in pipeline.LINT_SOURCES.items()}
+
+        assert (_strip_ts(doc_lint_guard.lint_documents(work, documents))
+                == _strip_ts(doc_lint_guard.lint_documents(work)))
+
+    def test_missing_and_invalid_documents(self, work):
+        work, _ = work
+        (work / "spatial" / "spatial_report.json").unlink()
+        (work / "cover" / "cover_tab.json").write_text("{not json")
+
+        result = doc_lint_guard.lint_documents(work)
+
+        assert result["documents"]["spatial"] == "MISSING"
+        assert result["documents"]["cover"] == "INVALID"
+        assert "Missing document: spatial" in result["error_details"]
+        assert not any(result["field_completeness"].values())
+        assert not result["pass"]
+
+    def test_required_field_accessor(self):
+        get = doc_lint_guard._compile_field("cover_data.project.title")
+        assert get({"cover_data": {"project": {"title": "A"}}}) == "A"
+        assert get({"cover_data": {"project": None}}) is None
+        assert get({"cover_data": "flat"}) is None
+        # A missing key reads as {} (not an error), as in the original walk
+        assert get({}) == {}
+
+
+class TestLintMany:
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_results_in_input_order(self, work, use_processes):
+        work, _ = work
+        empty = work.parent / "empty"
+        results = doc_lint_guard.lint_many([work, empty], max_workers=2, use_processes=use_processes)
+
+        assert list(results) == [str(work), str(empty)]
+        assert results[str(work)]["documents"] == doc_lint_guard.lint_documents(work)["documents"]
+        assert results[str(empty)]["validation_summary"]["documents_valid"] == 0
+
+    def test_jsonl_report(self, work, tmp_path):
+        work, _ = work
+        report = tmp_path / "lint.jsonl"
+        results = doc_lint_guard.lint_many([work, tmp_path / "empty"], report=report)
+
+        rows = [json.loads(line) for line in report.read_text().splitlines()]
+        assert [row["work_dir"] for row in rows] == list(results)
+        assert rows[0]["status"] == results[str(work)]["status"]
+        assert rows[1]["pass"] is False
+        assert "Missing document: enclosure" in rows[1]["error_details"]
+
+    def test_parquet_report(self, work, tmp_path):
+        pl = pytest.importorskip("polars")
+        work, _ = work
+        report = tmp_path / "lint.parquet"
+        doc_lint_guard.lint_many([work, tmp_path / "empty"], use_processes=False, report=report)
+
+        frame = pl.read_parquet(report)
+        assert frame.height == 2
+        assert frame["pass"].to_list()[1] is False
+
+
+class TestAvailableEvidence:
+    def test_matches_per_path_checks(self, work):
+        work, _ = work
+        paths = [work / "placement" / "breaker_placement.svg",
+                 str(work / "placement" / "breaker_critic.svg"),
+                 work / "nowhere" / "x.svg"]
+
+        assert available_evidence(paths) == {paths[0]}
@@ -0,0 +1,405 @@
+"""
+Unit tests for the streaming estimate workbook writer
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import estimate_formatter
+from _xlsx_template import _shift_formulas, compile_template, shift_refs, split_ref, write_workbook
+
+openpyxl = pytest.importorskip("openpyxl")
+
+NAMED_RANGES = """ranges:
+  - {name: Project.Name, sheet: Cover, ref: B3}
+  - {name: Project.Client, sheet: Cover, ref: B4}
+  - {name: Totals.Net, sheet: Estimate, ref: H52}
+  - {name: Totals.VAT, sheet: Estimate, ref: H53}
+  - {name: Totals.Total, sheet: Estimate, ref: H54}
+  - {name: Items.Start, sheet: Estimate, ref: A10}
+  - {name: Items.End, sheet: Estimate, ref: H50}
+"""
+
+
+@pytest.fixture
+def templates(tmp_path):
+    """Minimal Cover/Estimate template with styled item row and footer"""
+    from openpyxl.styles import Font
+
+    wb = openpyxl.Workbook()
+    cover = wb.active
+    cover.title = "Cover"
+    cover["A3"] = "Project"
+    sheet = wb.create_sheet("Estimate")
+    sheet["A9"] = "No"
+    for col in "ABCDEFGH":
+        sheet[f"{col}10"].font = Font(bold=True)
+    sheet["G52"] = "Net"
+    sheet["H56"] = "=SUM(H10:H50)"
+    sheet.merge_cells("A58:C58")
+
+    path = tmp_path / "templates"
+    path.mkdir()
+    wb.save(path / "EstimateTemplate.xlsx")
+    (path / "NamedRanges.yaml").write_text(NAMED_RANGES, encoding="utf-8")
+    return path
+
+
+def estimate(count):
+    items = [{"desc": f"Item {i}", "qty": 1, "unit_price": 100, "total": 100} for i in range(count)]
+    return {
+        "project_name": "Tower & Annex",
+        "client": "Client Co.",
+        "items": items,
+        "subtotal": 100 * count,
+        "vat": 10 * count,
+        "total": 110 * count,
+    }
+
+
+def run_formatter(tmp_path, templates, data):
+    from _util_io import write_json
+
+    work = tmp_path / "work"
+    write_json(work / "input" / "estimate.json", data)
+    return estimate_formatter.format_estimate(work, templates)
+
+
+@pytest.mark.unit
+class TestStreamingWorkbook:
+    """Test compiled template + streamed item rows"""
+
+    def test_items_fit_region(self, tmp_path, templates):
+        """Items inside the region leave the layout unchanged"""
+        result = run_formatter(tmp_path, templates, estimate(3))
+
+        assert result["workbook"]["rows_added"] == 0
+        assert result["named_ranges"]["applied"] == 7
+
+        wb = openpyxl.load_workbook(result["workbook"]["path"])
+        sheet = wb["Estimate"]
+        assert [sheet.cell(10 + i, 2).value for i in range(3)] == ["Item 0", "Item 1", "Item 2"]
+        assert sheet["A12"].value == 3
+        assert sheet["B10"].font.b is True
+        assert sheet["H52"].value == 300
+        assert wb["Cover"]["B3"].value == "Tower & Annex"
+
+    def test_overflow_shifts_rows_below(self, tmp_path, templates):
+        """Items beyond Items.End push totals, formulas and merges down"""
+        result = run_formatter(tmp_path, templates, estimate(1000))
+        added = result["workbook"]["rows_added"]
+
+        assert added == 1000 - 41
+
+        wb = openpyxl.load_workbook(result["workbook"]["path"])
+        sheet = wb["Estimate"]
+        assert sheet.cell(1009, 2).value == "Item 999"
+        assert sheet.cell(52 + added, 7).value == "Net"
+        assert sheet.cell(52 + added, 8).value == 100000
+        assert sheet.cell(56 + added, 8).value == f"=SUM(H10:H{50 + added})"
+        assert str(sheet.merged_cells.ranges.pop()) == f"A{58 + added}:C{58 + added}"
+        assert wb.defined_names["Totals.Total"].attr_text == f"Estimate!$H${54 + added}"
+        assert wb.defined_names["Items.End"].attr_text == f"Estimate!$H${50 + added}"
+
+    def test_overflow_shifts_formulas_above_region(self, tmp_path, templates):
+        """Summary formulas above the item block follow the moved rows"""
+        path = templates / "EstimateTemplate.xlsx"
+        wb = openpyxl.load_workbook(path)
+        wb["Estimate"]["H5"] = "=SUM(H10:H50)"
+        wb["Estimate"]["H6"] = "=H53+Cover!B60"
+        wb.save(path)
+
+        result = run_formatter(tmp_path, templates, estimate(1000))
+        added = result["workbook"]["rows_added"]
+
+        sheet = openpyxl.load_workbook(result["workbook"]["path"])["Estimate"]
+        assert sheet["H5"].value == f"=SUM(H10:H{50 + added})"
+        assert sheet["H6"].value == f"=H{53 + added}+Cover!B60"
+
+    def test_overflow_shifts_qualified_refs_and_sheet_ranges(self, tmp_path, templates):
+        """Estimate!-qualified refs, conditional formats, validations and hyperlinks follow the moved rows"""
+        from openpyxl.formatting.rule import CellIsRule
+        from openpyxl.styles import PatternFill
+        from openpyxl.worksheet.datavalidation import DataValidation
+
+        path = templates / "EstimateTemplate.xlsx"
+        wb = openpyxl.load_workbook(path)
+        sheet = wb["Estimate"]
+        sheet["H5"] = "=Estimate!H53+'Estimate'!H54+Cover!H53"
+        sheet.conditional_formatting.add(
+            "H52:H54", CellIsRule(operator="lessThan", formula=["$H$52"], fill=PatternFill(bgColor="FF0000")))
+        validation = DataValidation(type="decimal", operator="greaterThan", formula1="0")
+        validation.add("H52")
+        sheet.add_data_validation(validation)
+        sheet["G54"].hyperlink = "https://example.com/terms"
+        wb.save(path)
+
+        result = run_formatter(tmp_path, templates, estimate(1000))
+        added = result["workbook"]["rows_added"]
+
+        sheet = openpyxl.load_workbook(result["workbook"]["path"])["Estimate"]
+        assert sheet["H5"].value == f"=Estimate!H{53 + added}+'Estimate'!H{54 + added}+Cover!H53"
+        [formats] = sheet.conditional_formatting
+        assert str(formats.sqref) == f"H{52 + added}:H{54 + added}"
+        assert formats.rules[0].formula == [f"$H${52 + added}"]
+        assert str(sheet.data_validations.dataValidation[0].sqref) == f"H{52 + added}"
+        assert sheet[f"G{54 + added}"].hyperlink.target == "https://example.com/terms"
+        assert sheet[f"G{54 + added}"].hyperlink.ref == f"G{54 + added}"
+
+    def test_items_merged_into_template_rows(self, tmp_path, templates):
+        """Cells outside the item columns of the region's rows are kept"""
+        path = templates / "EstimateTemplate.xlsx"
+        wb = openpyxl.load_workbook(path)
+        sheet = wb["Estimate"]
+        sheet["I10"] = "=H10*1.1"
+        sheet["I11"] = "=H11*1.1"
+        sheet["B11"] = "placeholder"
+        wb.save(path)
+
+        result = run_formatter(tmp_path, templates, estimate(3))
+
+        sheet = openpyxl.load_workbook(result["workbook"]["path"])["Estimate"]
+        assert (sheet["I10"].value, sheet["I11"].value) == ("=H10*1.1", "=H11*1.1")
+        assert (sheet["B11"].value, sheet["H11"].value) == ("Item 1", 100)
+
+    @pytest.mark.parametrize("value", [float("nan"), float("inf"), float("-inf")])
+    def test_non_finite_numbers_rejected(self, tmp_path, templates, value):
+        """NaN/inf have no XLSX encoding: the write fails and leaves no file"""
+        compiled = compile_template(templates / "EstimateTemplate.xlsx")
+        out = tmp_path / "out" / "estimate.xlsx"
+
+        with pytest.raises(ValueError, match="H52"):
+            write_workbook(compiled, out, {"Estimate": {"H52": value}}, {})
+
+        assert not out.exists()
+        assert list(out.parent.iterdir()) == []
+
+    def test_template_not_modified(self, tmp_path, templates):
+        """The shared template file is only read"""
+        template = templates / "EstimateTemplate.xlsx"
+        before = template.read_bytes()
+
+        run_formatter(tmp_path, templates, estimate(100))
+
+        assert template.read_bytes() == before
+
+    def test_compiled_template_reused(self, tmp_path, templates):
+        """One compiled template serves several writes"""
+        compiled = compile_template(templates / "EstimateTemplate.xlsx", ["Estimate"])
+        specs = estimate_formatter._load_named_ranges(templates)
+
+        for count in (5, 60):
+            out = tmp_path / f"estimate_{count}.xlsx"
+            applied, failed, _ = estimate_formatter._apply_named_ranges_streaming(
+                compiled, out, specs, estimate(count)
+            )
+            assert (applied, failed) == (7, [])
+            assert openpyxl.load_workbook(out)["Estimate"].cell(9 + count, 2).value == f"Item {count - 1}"
+
+    def test_invalid_template_reports_failed_ranges(self, tmp_path, templates):
+        """A corrupt template fails every range instead of raising"""
+        (templates / "EstimateTemplate.xlsx").write_bytes(b"not a zip")
+
+        result = run_formatter(tmp_path, templates, estimate(1))
+
+        assert result["named_ranges"]["applied"] == 0
+        assert result["workbook"] is None
+
+
+@pytest.mark.unit
+class TestReferenceShifting:
+    """Test A1 reference helpers"""
+
+    def test_split_ref(self):
+        assert split_ref("$H$52") == (52, 8)
+
+        with pytest.raises(ValueError):
+            split_ref("A1:B2")
+
+    def test_shift_refs_only_moves_rows_at_or_below_end(self):
+        assert shift_refs("SUM(H10:H50)+H52-Cover!B60", 50, 5) == "SUM(H10:H55)+H57-Cover!B60"
+        assert shift_refs("LOG10(A51)", 50, 1) == "LOG10(A52)"
+
+    def test_qualified_refs_shift_only_for_their_sheet(self):
+        formula = "Estimate!H52+'My Sheet'!H52+Cover!H52+H52+SUM(Estimate!H10:H50)"
+        assert shift_refs(formula, 50, 5, "Estimate") == (
+            "Estimate!H57+'My Sheet'!H52+Cover!H52+H57+SUM(Estimate!H10:H55)")
+        assert shift_refs(formula, 50, 5, "My Sheet") == (
+            "Estimate!H52+'My Sheet'!H57+Cover!H52+H57+SUM(Estimate!H10:H50)")
+        # Without a sheet only unqualified references move
+        assert shift_refs(formula, 50, 5) == (
+            "Estimate!H52+'My Sheet'!H52+Cover!H52+H57+SUM(Estimate!H10:H50)")
+
+    def test_shared_formula_range_shifted(self):
+        row = ('<row r="56"><c r="H56"><f t="shared" ref="H56:H58" si="0">H52*2</f></c>'
+               '<c r="I56"><f t="shared" si="0"/></c><c r="J56"><f>A1</f></c></row>')
+        assert _shift_formulas(row, 50, 10) == (
+            '<row r="56"><c r="H56"><f t="shared" ref="H66:H68" si="0">H62*2</f></c>'
+            '<c r="I56"><f t="shared" si="0"/></c><c r="J56"><f>A1</f></c></row>')
+
+
+@pytest.mark.unit
+class TestTemplateRegistry:
+    """Test compiled template caching"""
+
+    def test_repeated_lookups_hit_cache(self, templates):
+        registry = estimate_formatter.TemplateRegistry()
+
+        first = registry.get(templates)
+        second = registry.get(templates)
+
+        assert first is second
+        assert (registry.hits, registry.misses) == (1, 1)
+        assert first.workbook.sheetnames == ["Cover", "Estimate"]
+
+    def test_touched_but_unchanged_template_reused(self, templates):
+        """A new mtime alone falls back to the content hash"""
+        import os
+
+        registry = estimate_formatter.TemplateRegistry()
+        first = registry.get(templates)
+        yaml_file = templates / "NamedRanges.yaml"
+        os.utime(yaml_file, ns=(0, yaml_file.stat().st_mtime_ns + 10**9))
+
+        assert registry.get(templates) is first
+        assert registry.misses == 1
+
+    def test_changed_named_ranges_recompiled(self, templates):
+        registry = estimate_formatter.TemplateRegistry()
+        registry.get(templates)
+        yaml_file = templates / "NamedRanges.yaml"
+        yaml_file.write_text(NAMED_RANGES.replace("B4", "B5") + "\n", encoding="utf-8")
+
+        template = registry.get(templates)
+
+        assert registry.misses == 2
+        client = next(spec for spec in template.range_specs if spec.name == "Project.Client")
+        assert client.ref == "B5"
+
+
+@pytest.mark.unit
+class TestCopyOnWrite:
+    """Test that estimates never write through to the shared template"""
+
+    def test_parallel_estimates_share_template(self, tmp_path, templates):
+        """Concurrent format jobs each get a complete workbook"""
+        from concurrent.futures import ThreadPoolExecutor
+
+        template = templates / "EstimateTemplate.xlsx"
+        before = template.read_bytes()
+
+        def job(n):
+            work = tmp_path / f"quote{n}"
+            from _util_io import write_json
+            write_json(work / "input" / "estimate.json", estimate(n + 1))
+            return estimate_formatter.format_estimate(work, templates)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(job, range(16)))
+
+        assert template.read_bytes() == before
+        for n, result in enumerate(results):
+            sheet = openpyxl.load_workbook(result["workbook"]["path"])["Estimate"]
+            assert sheet["H52"].value == 100 * (n + 1)
+        assert not list(tmp_path.rglob("*.tmp"))
+
+    def test_output_onto_template_refused(self, tmp_path, templates):
+        template = templates / "EstimateTemplate.xlsx"
+        before = template.read_bytes()
+        work = tmp_path / "work"
+
+        result = estimate_formatter.format_estimate(work, templates, output_path=template)
+
+        assert result["workbook"] is None
+        assert result["named_ranges"]["applied"] == 0
+        assert template.read_bytes() == before
+
+
+@pytest.mark.unit
+class TestWorkbookCrossCheck:
+    """Test that every written cell is verified against the pricing kernel"""
+
+    def test_all_item_cells_checked(self, tmp_path, templates):
+        result = run_formatter(tmp_path, templates, estimate(500))
+
+        # Cover (2) + totals (3) + 4 checked fields per item
+        assert result["sample_cells"]["checked"] == 5 + 4 * 500
+        assert result["sample_cells"]["diff"] == 0
+        assert result["validation_pass"] is True
+        assert result["pricing"]["total"] == 110 * 500
+
+    def test_wrong_stated_total_detected(self, tmp_path, templates):
+        data = estimate(3)
+        data["items"][1]["total"] = 999
+
+        result = run_formatter(tmp_path, templates, data)
+
+        assert result["validation_pass"] is False
+        assert "Line total mismatch on 1 item(s)" in result["format_lint"]["error_details"]
+        assert result["sample_cells"]["cells"] == [
+            {"sheet": "Estimate", "ref": "H11", "expected": 100.0, "actual": 999.0}
+        ]
+
+    def test_markup_rules_applied(self, tmp_path, templates):
+        data = estimate(2)
+        for item in data["items"]:
+            item["category"] = "labor"
+
+        from _util_io import write_json
+        work = tmp_path / "work"
+        write_json(work / "input" / "estimate.json", data)
+        result = estimate_formatter.format_estimate(
+            work, templates, rules_dir=Path(__file__).parent.parent.parent / "spec_kit" / "rules"
+        )
+
+        assert result["pricing"]["markup"] == 40
+        assert result["pricing"]["subtotal"] == 240
+        assert any("Subtotal mismatch" in e for e in result["format_lint"]["error_details"])
+        # Totals cells carry the marked-up values, so the read-back matches
+        assert result["sample_cells"]["diff"] == 0
+        sheet = openpyxl.load_workbook(result["workbook"]["path"])["Estimate"]
+        assert (sheet["H52"].value, sheet["H53"].value, sheet["H54"].value) == (240, 24, 264)
+
+    def test_stated_subtotal_without_markup_is_an_error(self, tmp_path, templates):
+        """A subtotal stated as the plain sum of line totals fails once items carry a markup
+
+        (The sum of line totals was the only subtotal check before the pricing
+        kernel; estimates without categories are linted exactly as before.)
+        """
+        data = estimate(2)
+        data["items"][0]["category"] = "material"
+
+        from _util_io import write_json
+        work = tmp_path / "work"
+        write_json(work / "input" / "estimate.json", data)
+        result = estimate_formatter.format_estimate(
+            work, templates, rules_dir=Path(__file__).parent.parent.parent / "spec_kit" / "rules"
+        )
+
+        assert data["subtotal"] == sum(item["total"] for item in data["items"])
+        assert result["validation_pass"] is False
+        assert result["format_lint"]["error_details"] == [
+            "Subtotal mismatch: calculated 215 (net 200 + markup 15) vs stated 200"
+        ]
+
+    def test_marked_up_estimate_passes(self, tmp_path, templates):
+        """Stated totals that include the markup validate cleanly"""
+        data = estimate(2)
+        for item in data["items"]:
+            item["category"] = "labor"
+        data.update(subtotal=240, vat=24, total=264)
+
+        from _util_io import write_json
+        work = tmp_path / "work"
+        write_json(work / "input" / "estimate.json", data)
+        result = estimate_formatter.format_estimate(
+            work, templates, rules_dir=Path(__file__).parent.parent.parent / "spec_kit" / "rules"
+        )
+
+        assert result["validation_pass"] is True
+        assert result["format_lint"]["warning_details"] == []
@@ -0,0 +1,142 @@
+"""
+Unit tests for single-file evidence bundles
+"""
+
+import hashlib
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import _bundle
+import pipeline
+from _bundle import BUNDLE_NAME, EvidenceBundle, active_bundle
+from _svg import svg_mode
+
+
+class TestEvidenceBundle:
+    def test_add_and_random_access(self, tmp_path):
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        sha = bundle.add("placement/a.svg", "<svg/>")
+        bundle.add("lint/b.json", b'{"ok": true}')
+
+        assert sha == hashlib.sha256(b"<svg/>").hexdigest()
+        index = bundle.index()
+        assert list(index) == ["placement/a.svg", "lint/b.json"]
+        assert index["placement/a.svg"]["sha256"] == sha
+        assert bundle.read("lint/b.json") == b'{"ok": true}'
+        assert "lint/b.json" in bundle and "nope" not in bundle
+        with pytest.raises(KeyError):
+            bundle.read("nope")
+
+    def test_readable_as_plain_zip(self, tmp_path):
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        bundle.add("a.json", "{}")
+
+        with zipfile.ZipFile(bundle.path) as zf:
+            assert zf.read("a.json") == b"{}"
+
+    def test_append_only_latest_wins(self, tmp_path):
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        bundle.add("a.json", "1")
+        size = bundle.path.stat().st_size
+        bundle.add("a.json", "2")
+
+        assert bundle.read("a.json") == b"2"
+        assert bundle.path.stat().st_size > size
+        with zipfile.ZipFile(bundle.path) as zf:
+            assert [i.filename for i in zf.infolist()] == ["a.json", "a.json"]
+
+    def test_tampered_member_detected(self, tmp_path):
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        bundle.add("a.json", "original")
+        with zipfile.ZipFile(bundle.path, "a") as zf:
+            info = zipfile.ZipInfo("a.json")
+            info.comment = zf.getinfo("a.json").comment
+            zf.writestr(info, "forged")
+
+        assert bundle.verify() == ["a.json"]
+        with pytest.raises(ValueError):
+            bundle.read("a.json")
+        assert bundle.read("a.json", verify=False) == b"forged"
+
+    def test_concurrent_appends(self, tmp_path):
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(lambda i: bundle.add(f"m{i}.json", str(i) * 100), range(64)))
+
+        assert len(bundle.index()) == 64
+        assert bundle.verify() == []
+
+
+    def test_appends_without_fcntl(self, tmp_path, monkeypatch):
+        """Without flock (Windows) appends from threads are still serialised"""
+        monkeypatch.setattr(_bundle, "fcntl", None)
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda i: bundle.add(f"m{i}.json", str(i)), range(16)))
+
+        assert len(bundle.index()) == 16
+        assert bundle.verify() == []
+
+
+class TestPipelineBundle:
+    @pytest.mark.parametrize("jobs", [1, 4])
+    def test_bundle_holds_eager_evidence(self, tmp_path, jobs, fixed_breakers, frozen_clock):
+        """Bundled evidence matches the files an unbundled run writes"""
+        eager, bundled = tmp_path / "eager", tmp_path / "bundled"
+        fixed_breakers(eager)
+        fixed_breakers(bundled)
+        pipeline.run_stages(eager)
+        if jobs > 1:
+            results = pipeline.run_dag(bundled, max_workers=jobs, bundle=True)
+        else:
+            results = pipeline.run_stages(bundled, bundle=True)
+
+        assert not list(bundled.rglob("*.svg"))
+        assert not list(bundled.rglob("*_evidence.json"))
+
+        bundle = EvidenceBundle(bundled / BUNDLE_NAME)
+        assert bundle.verify() == []
+        expected = {
+            p.relative_to(eager).as_posix(): p
+            for pattern in ("*.svg", "*_evidence.json", "*.png")
+            for p in eager.rglob(pattern)
+        }
+        assert set(bundle.index()) == set(expected)
+        for name, path in expected.items():
+            if name.endswith(".svg"):
+                assert bundle.read(name) == path.read_bytes()
+
+        assert (results["doc_lint_guard"]["evidence_files"]
+                == pipeline.read_json(eager / "lint" / "doc_lint_result.json")["evidence_files"])
+
+    def test_bundled_run_after_plain_run_writes_bundle(self, tmp_path):
+        """Switching to bundle=True re-runs the stages instead of skipping them"""
+        pipeline.run_stages(tmp_path)
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_stages(tmp_path, bundle=True, metrics=metrics)
+
+        assert {s["status"] for s in metrics.metrics["steps"].values()} == {"OK"}
+        bundle = EvidenceBundle(tmp_path / BUNDLE_NAME)
+        assert any(name.endswith(".svg") for name in bundle.index())
+
+    def test_concurrent_runs_keep_their_own_settings(self, tmp_path):
+        """A bundled run and a skip-SVG run in parallel threads do not share state"""
+        bundled, skipped = tmp_path / "bundled", tmp_path / "skipped"
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            runs = [pool.submit(pipeline.run_stages, bundled, bundle=True),
+                    pool.submit(pipeline.run_stages, skipped, svg="skip")]
+            for run in runs:
+                run.result()
+
+        assert not list(bundled.rglob("*.svg"))
+        assert any(name.endswith(".svg") for name in EvidenceBundle(bundled / BUNDLE_NAME).index())
+        assert not list(skipped.rglob("*.svg"))
+        assert not (skipped / BUNDLE_NAME).exists()
+        assert (svg_mode(), active_bundle()) == ("eager", None)
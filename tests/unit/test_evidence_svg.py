@@ -0,0 +1,160 @@
+"""
+Unit tests for compiled SVG evidence templates, the SVG mode switch and
+lazy evidence manifests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import _evidence
+import _svg
+from _svg import Markup, SvgTemplate, evidence_available, render_deferred_svg, set_svg_mode, write_svg
+from _util_io import make_evidence
+from doc_lint_guard import _generate_lint_report_svg
+
+
+def _render_n(data):
+    return f"<svg>{data['n']}</svg>"
+
+
+def _render_bytes(data):
+    return bytes(data)
+
+
+@pytest.fixture(autouse=True)
+def svg_mode():
+    """Restore eager mode and an empty deferred queue after each test"""
+    yield
+    set_svg_mode("eager")
+    _svg._deferred.clear()
+
+
+class TestSvgTemplate:
+    def test_static_chrome_kept_verbatim(self):
+        tpl = SvgTemplate('<svg width="10"><text>{label}: {value:.1f}</text></svg>')
+        assert tpl.render(label="Heat", value=1.25) == '<svg width="10"><text>Heat: 1.2</text></svg>'
+
+    def test_text_is_escaped_markup_is_not(self):
+        tpl = SvgTemplate("<g>{text}{inner}</g>")
+        out = tpl.render(text="a<b & c", inner=Markup("<circle/>"))
+        assert out == "<g>a&lt;b &amp; c<circle/></g>"
+
+    def test_compiled_once(self):
+        tpl = SvgTemplate('<rect fill="{color}"/><text>{n:d}</text>')
+        assert tpl.fields == {"color", "n"}
+        assert tpl.render(color="#fff", n=3) == '<rect fill="#fff"/><text>3</text>'
+        assert tpl.render(color="#000", n=4) == '<rect fill="#000"/><text>4</text>'
+
+    def test_conversion_rejected(self):
+        with pytest.raises(ValueError):
+            SvgTemplate("{value!r}")
+
+    def test_quotes_escaped_in_attributes(self):
+        tpl = SvgTemplate('<text class="{cls}">{label}</text>')
+        out = tpl.render(cls='x" onload="alert(1)', label="it's")
+        assert out == '<text class="x&quot; onload=&quot;alert(1)">it&#x27;s</text>'
+
+    def test_expression_fields_rejected(self):
+        for source in ("{value.__class__}", "{values[0]}", "{0}", "{value:{width}}"):
+            with pytest.raises(ValueError):
+                SvgTemplate(source)
+
+    def test_lint_report_escapes_document_names(self):
+        result = {
+            "pass": True, "quality_score": 100, "errors": 0, "warnings": 0, "evidence_files": 1,
+            "documents": {"R&D <draft>.pdf": "OK"},
+        }
+        svg = _generate_lint_report_svg(result)
+        assert "R&amp;D &lt;draft&gt;.pdf: OK" in svg
+        assert svg.startswith("<svg") and svg.endswith("</svg>")
+
+
+class TestSvgMode:
+    def test_eager_writes(self, tmp_path):
+        assert write_svg(tmp_path / "a.svg", str, "<svg/>") == tmp_path / "a.svg"
+        assert (tmp_path / "a.svg").read_text() == "<svg/>"
+
+    def test_skip_never_renders(self, tmp_path):
+        set_svg_mode("skip")
+        calls = []
+        make_evidence(tmp_path / "stage", {"ok": 1})
+        assert write_svg(tmp_path / "a.svg", calls.append, 1) is None
+        assert calls == []
+        assert not list(tmp_path.glob("*.svg"))
+        # JSON evidence is still written
+        assert (tmp_path / "stage_evidence.json").exists()
+
+    def test_defer_renders_on_request(self, tmp_path):
+        set_svg_mode("defer")
+        make_evidence(tmp_path / "stage", {"ok": 1})
+        write_svg(tmp_path / "b.svg", str, "<svg/>")
+        assert not list(tmp_path.glob("*.svg"))
+
+        assert render_deferred_svg(tmp_path / "b.svg") == [tmp_path / "b.svg"]
+        assert not (tmp_path / "stage.svg").exists()
+
+        assert render_deferred_svg() == [tmp_path / "stage.svg"]
+        assert "Evidence: stage" in (tmp_path / "stage.svg").read_text()
+        assert render_deferred_svg() == []
+
+    def test_lazy_records_and_materializes(self, tmp_path):
+        set_svg_mode("lazy")
+        source = tmp_path / "stage.json"
+        source.write_text('{"n": 2}')
+        make_evidence(tmp_path / "stage", {"ok": 1})
+        write_svg(tmp_path / "report.svg", _render_n, {"n": 1}, source=source)
+
+        assert not list(tmp_path.glob("*.svg")) and not (tmp_path / "stage_evidence.json").exists()
+        assert evidence_available(tmp_path / "report.svg")
+        assert not evidence_available(tmp_path / "other.svg")
+
+        # Rendered from the source JSON, not the inline payload
+        assert _evidence.materialize(tmp_path / "report.svg").read_text() == "<svg>2</svg>"
+        assert sorted(p.name for p in _evidence.materialize_all(tmp_path)) == [
+            "stage.svg", "stage_evidence.json"]
+        assert '"ok": 1' in (tmp_path / "stage_evidence.json").read_text()
+        assert _evidence.pending(tmp_path) == []
+
+    def test_materialize_unknown(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            _evidence.materialize(tmp_path / "missing.svg")
+
+    def test_lazy_rerun_drops_stale_file(self, tmp_path):
+        write_svg(tmp_path / "report.svg", _render_n, {"n": 1})
+        set_svg_mode("lazy")
+        write_svg(tmp_path / "report.svg", _render_n, {"n": 3})
+
+        assert not (tmp_path / "report.svg").exists()
+        assert _evidence.materialize(tmp_path / "report.svg").read_text() == "<svg>3</svg>"
+
+    def test_binary_renderer_materialized(self, tmp_path):
+        _evidence.record(tmp_path / "pixel.png", _render_bytes, [137, 80, 78, 71])
+        assert _evidence.materialize(tmp_path / "pixel.png").read_bytes() == b"\x89PNG"
+
+    def test_manifest_parsed_once_per_change(self, tmp_path, monkeypatch):
+        """is_recorded reuses the parsed manifest until it is appended to"""
+        reads = []
+
+        def counting_open(file, *args, **kwargs):
+            reads.append(file)
+            return open(file, *args, **kwargs)
+
+        monkeypatch.setattr(_evidence, "open", counting_open, raising=False)
+        _evidence.record(tmp_path / "a.svg", _render_n, {"n": 1})
+
+        assert all(_evidence.is_recorded(tmp_path / "a.svg") for _ in range(5))
+        assert not _evidence.is_recorded(tmp_path / "b.svg")
+        manifest_reads = [p for p in reads if p == tmp_path / _evidence.MANIFEST]
+        assert len(manifest_reads) == 2  # the append, then one parse
+
+        _evidence.record(tmp_path / "b.svg", _render_n, {"n": 2})
+        assert _evidence.is_recorded(tmp_path / "b.svg")
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            set_svg_mode("later")
@@ -0,0 +1,79 @@
+"""
+Import-time benchmarks for the engine package
+
+Parses ``python -X importtime`` output in a fresh interpreter so that
+heavy optional dependencies only load when a stage actually needs them.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC_DIR = Path(__file__).parent.parent.parent / "src"
+ENGINE_DIR = SRC_DIR / "kis_estimator_core" / "engine"
+
+HEAVY_MODULES = {"ortools", "openpyxl", "polars", "duckdb", "sqlalchemy", "pandas"}
+
+# Generous ceiling for the cumulative import of the package itself
+IMPORT_BUDGET_US = 250_000
+
+
+def run_python(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(SRC_DIR), str(ENGINE_DIR)])
+    return subprocess.run(
+        [sys.executable, *args], capture_output=True, text=True, env=env, check=True
+    )
+
+
+def import_profile(statement: str) -> dict:
+    """Run ``statement`` under -X importtime and return {module: cumulative_us}."""
+    proc = run_python("-X", "importtime", "-c", statement)
+
+    profile = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def heavy_imports(profile: dict) -> set:
+    return {name.split(".")[0] for name in profile} & HEAVY_MODULES
+
+
+@pytest.mark.unit
+class TestImportTime:
+    """Importing the package must not pull in heavy optional dependencies"""
+
+    def test_package_import_is_light(self):
+        profile = import_profile("import kis_estimator_core")
+
+        assert heavy_imports(profile) == set()
+        assert profile["kis_estimator_core"] < IMPORT_BUDGET_US
+
+    def test_engine_and_pipeline_import_is_light(self):
+        profile = import_profile("import kis_estimator_core.engine, pipeline")
+
+        assert heavy_imports(profile) == set()
+
+    def test_stubs_namespace_import_is_light(self):
+        profile = import_profile("import kis_estimator_core.engine.stubs")
+
+        assert heavy_imports(profile) == set()
+
+    def test_lazy_attribute_resolves_on_access(self):
+        # importlib.import_module bypasses -X importtime, so inspect sys.modules
+        proc = run_python(
+            "-c",
+            "import sys, kis_estimator_core as k; k.engine.BreakerSpec; "
+            "print('\\n'.join(sys.modules))",
+        )
+        loaded = set(proc.stdout.split())
+
+        assert "kis_estimator_core.engine.breaker_placer" in loaded
+        assert heavy_imports(dict.fromkeys(loaded)) == set()
@@ -0,0 +1,57 @@
+"""
+Unit tests for the kis-engine command line
+"""
+
+import pytest
+
+import breaker_critic
+import doc_lint_guard
+import kis_engine
+
+
+def _run(work, *argv):
+    args = kis_engine.build_parser().parse_args(["run", "--work", str(work), "--svg", "skip", *argv])
+    return kis_engine.cmd_run(args)
+
+
+@pytest.fixture(autouse=True)
+def metrics_dir(tmp_path, monkeypatch):
+    """Keep .meta/metrics.jsonl out of the checkout"""
+    monkeypatch.chdir(tmp_path)
+
+
+@pytest.mark.unit
+class TestRunExitCode:
+    """``run`` exits nonzero when a quality gate fails, like the old stage scripts"""
+
+    STAGES = "breaker_placer,breaker_critic"
+
+    def test_passing_critic_exits_zero(self, tmp_path, fixed_breakers, monkeypatch):
+        critique = breaker_critic.critique_placement
+        monkeypatch.setattr(breaker_critic, "critique_placement",
+                            lambda *a, **kw: {**critique(*a, **kw), "passed": True})
+        fixed_breakers(tmp_path / "work")
+
+        assert _run(tmp_path / "work", "--stages", self.STAGES) == 0
+
+    def test_failing_critic_exits_one(self, tmp_path, fixed_breakers, monkeypatch):
+        critique = breaker_critic.critique_placement
+        monkeypatch.setattr(breaker_critic, "critique_placement",
+                            lambda *a, **kw: {**critique(*a, **kw), "passed": False})
+        fixed_breakers(tmp_path / "work")
+
+        assert _run(tmp_path / "work", "--stages", self.STAGES) == 1
+
+    @pytest.mark.parametrize("jobs", ["1", "2"])
+    def test_failing_lint_exits_one(self, tmp_path, monkeypatch, jobs):
+        critique = breaker_critic.critique_placement
+        monkeypatch.setattr(breaker_critic, "critique_placement",
+                            lambda *a, **kw: {**critique(*a, **kw), "passed": True})
+        lint = doc_lint_guard.lint_documents
+        monkeypatch.setattr(doc_lint_guard, "lint_documents",
+                            lambda *a, **kw: {**lint(*a, **kw), "pass": False})
+
+        assert _run(tmp_path / "work", "--jobs", jobs, "--threads-only") == 1
+
+    def test_gate_stages_not_run_exit_zero(self, tmp_path):
+        assert _run(tmp_path / "work", "--stages", "enclosure_solver") == 0
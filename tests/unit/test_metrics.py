@@ -0,0 +1,92 @@
+"""
+Unit tests for span-based engine metrics
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import pipeline
+from _util_io import MetricsCollector, read_metrics
+
+
+class TestMetricsCollector:
+    def test_span_records_timings(self):
+        metrics = MetricsCollector(run_id="run-1")
+        with metrics.span("busy", stage="x"):
+            sum(i * i for i in range(200_000))
+
+        (record,) = metrics.records
+        assert record["run_id"] == "run-1"
+        assert record["status"] == "OK" and record["stage"] == "x"
+        assert record["wall_ns"] > 0 and record["cpu_ns"] > 0
+        assert record["peak_rss_kb"] is None or record["peak_rss_kb"] > 0
+        assert metrics.metrics["steps"]["busy"]["ms"] == record["wall_ns"] / 1e6
+
+    def test_nested_spans(self):
+        metrics = MetricsCollector()
+        with metrics.span("outer") as outer:
+            with metrics.span("inner"):
+                pass
+        inner = next(r for r in metrics.records if r["name"] == "inner")
+
+        assert inner["parent_id"] == outer["span_id"]
+        assert outer["parent_id"] is None
+
+    def test_failure_recorded_and_raised(self):
+        metrics = MetricsCollector()
+        with pytest.raises(ValueError):
+            with metrics.timer("bad"):
+                raise ValueError("boom")
+
+        assert metrics.metrics["steps"]["bad"] == {
+            "ms": metrics.records[0]["wall_ns"] / 1e6, "status": "FAIL", "error": "boom"}
+        assert metrics.metrics["errors"] == [{"step": "bad", "error": "boom"}]
+
+    def test_save_appends(self, tmp_path):
+        path = tmp_path / "metrics.jsonl"
+        first, second = MetricsCollector(), MetricsCollector()
+        with first.span("a"):
+            pass
+        first.save(path)
+        with first.span("b"):
+            pass
+        first.save(path)
+        second.skip("c")
+        second.save(path)
+
+        spans = [r["name"] for r in read_metrics(path) if r["type"] == "span"]
+        assert spans == ["a", "b", "c"]
+        assert len(read_metrics(path, run_id=first.run_id)) == 4  # 2 spans + 2 run lines
+
+    def test_concurrent_spans(self):
+        metrics = MetricsCollector()
+
+        def work(i):
+            with metrics.span(f"s{i}"):
+                pass
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(32)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(metrics.records) == 32
+        assert all(r["parent_id"] is None for r in metrics.records)
+
+
+class TestPipelineSpans:
+    def test_dag_stages_nest_under_caller(self, tmp_path):
+        metrics = MetricsCollector()
+        with metrics.span("run") as run:
+            pipeline.run_dag(tmp_path, metrics=metrics, use_processes=False)
+
+        stages = [r for r in metrics.records if r["name"] in pipeline.STAGES]
+        assert len(stages) == len(pipeline.STAGES)
+        assert {r["parent_id"] for r in stages} == {run["span_id"]}
@@ -0,0 +1,234 @@
+"""
+Unit tests for the in-process engine pipeline
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import _evidence
+import breaker_critic
+import pipeline
+
+
+@pytest.mark.unit
+class TestFusedValidation:
+    """Test placement → critic → spatial fused pass"""
+
+    def test_fused_validation_shares_placement(self, tmp_path):
+        """Critic and spatial checks see the in-memory placement result"""
+        results = pipeline.run_fused_validation(tmp_path)
+
+        slots = len(results["placement"]["slots"])
+        assert results["critic"]["metrics"]["slot_count"] == slots
+        assert results["spatial"]["breakers_checked"] == slots
+
+    def test_fused_validation_writes_evidence_once(self, tmp_path):
+        """Stage outputs are written at the end of the pass"""
+        pipeline.run_fused_validation(tmp_path)
+
+        assert (tmp_path / "placement" / "breaker_placement.json").exists()
+        assert (tmp_path / "placement" / "breaker_critic_evidence.json").exists()
+        assert (tmp_path / "spatial" / "spatial_report.json").exists()
+
+    def test_fused_validation_without_write(self, tmp_path):
+        """write=False keeps the pass entirely in memory"""
+        pipeline.run_fused_validation(tmp_path, write=False)
+
+        assert not (tmp_path / "placement").exists()
+        assert not (tmp_path / "spatial").exists()
+
+    def test_critic_accepts_placement_object(self, tmp_path):
+        """critique_placement does not need breaker_placement.json on disk"""
+        placement = {"phase_imbalance_pct": 5.0, "slots": []}
+        result = breaker_critic.critique_placement(tmp_path, placement=placement)
+
+        assert result["passed"] is False
+        assert result["violation_details"][0]["type"] == "phase_imbalance"
+
+
+@pytest.mark.unit
+class TestRunStages:
+    """Test single-process stage runner"""
+
+    def test_run_all_stages(self, tmp_path):
+        """All seven stages run in process and are timed"""
+        metrics = pipeline.MetricsCollector()
+        results = pipeline.run_stages(tmp_path, metrics=metrics)
+
+        assert list(results) == list(pipeline.STAGES)
+        assert set(metrics.metrics["steps"]) == set(pipeline.STAGES)
+        assert (tmp_path / "lint" / "doc_lint_result.json").exists()
+
+    def test_run_selected_stages(self, tmp_path):
+        """--stages selection keeps canonical order"""
+        results = pipeline.run_stages(tmp_path, stages=["breaker_critic", "breaker_placer"])
+
+        assert list(results) == ["breaker_placer", "breaker_critic"]
+        assert not (tmp_path / "enclosure").exists()
+
+    @pytest.mark.parametrize("svg", ["skip", "defer"])
+    def test_svg_mode(self, tmp_path, svg):
+        """Skipped or deferred SVGs leave the JSON results unchanged"""
+        try:
+            results = pipeline.run_stages(tmp_path, svg=svg)
+            assert not list(tmp_path.rglob("*.svg"))
+            assert (tmp_path / "lint" / "doc_lint_result_evidence.json").exists()
+
+            written = pipeline.render_deferred_svg()
+            assert bool(written) == (svg == "defer")
+        finally:
+            pipeline.set_svg_mode("eager")
+
+        assert list(results) == list(pipeline.STAGES)
+
+    def test_lazy_evidence_matches_eager(self, tmp_path, fixed_breakers, frozen_clock):
+        """Lazy runs record evidence and render the same files on demand"""
+        eager, lazy = tmp_path / "eager", tmp_path / "lazy"
+        fixed_breakers(eager)
+        fixed_breakers(lazy)
+        eager_results = pipeline.run_stages(eager)
+        try:
+            lazy_results = pipeline.run_stages(lazy, svg="lazy")
+        finally:
+            pipeline.set_svg_mode("eager")
+
+        assert not list(lazy.rglob("*.svg"))
+        assert not list(lazy.rglob("*_evidence.json"))
+        assert (lazy_results["doc_lint_guard"]["evidence_files"]
+                == eager_results["doc_lint_guard"]["evidence_files"])
+
+        written = _evidence.materialize_all(lazy)
+        assert _evidence.pending(lazy) == []
+        for path in eager.rglob("*.svg"):
+            rendered = lazy / path.relative_to(eager)
+            assert rendered in written
+            assert rendered.read_text() == path.read_text()
+        assert set(p.relative_to(lazy) for p in lazy.rglob("*_evidence.json")) == set(
+            p.relative_to(eager) for p in eager.rglob("*_evidence.json"))
+
+    def test_unknown_stage_rejected(self):
+        """Unknown stage names raise ValueError"""
+        with pytest.raises(ValueError) as exc_info:
+            pipeline.select_stages(["not_a_stage"])
+
+        assert "Unknown stage" in str(exc_info.value)
+
+
+@pytest.mark.unit
+class TestRunDag:
+    """Test concurrent DAG scheduling of engine stages"""
+
+    def test_dependencies_follow_declared_io(self):
+        """Critic and spatial only need placement; formatter needs nothing"""
+        deps = pipeline.stage_dependencies(pipeline.STAGES.values())
+
+        assert deps["breaker_critic"] == {"breaker_placer"}
+        assert deps["spatial_assistant"] == {"breaker_placer"}
+        assert deps["estimate_formatter"] == set()
+        assert deps["cover_tab_writer"] == {"estimate_formatter", "enclosure_solver"}
+        assert deps["doc_lint_guard"] == set(pipeline.STAGES) - {"doc_lint_guard"}
+
+    def test_dependencies_limited_to_selection(self):
+        """Inputs from unselected stages are expected on disk"""
+        deps = pipeline.stage_dependencies(pipeline.select_stages(["breaker_critic"]))
+
+        assert deps == {"breaker_critic": set()}
+
+    @pytest.mark.parametrize("use_processes", [False, True])
+    def test_run_dag_matches_sequential(self, tmp_path, use_processes):
+        """DAG run produces every stage result in canonical order"""
+        results = pipeline.run_dag(tmp_path, max_workers=4, use_processes=use_processes)
+
+        assert list(results) == list(pipeline.STAGES)
+        assert results["doc_lint_guard"]["documents"]["spatial"] == "OK"
+        assert results["breaker_critic"]["metrics"]["slot_count"] == len(
+            results["breaker_placer"]["slots"]
+        )
+
+    def test_run_dag_propagates_failure(self, tmp_path, monkeypatch):
+        """A failing stage aborts the run and is re-raised"""
+        def boom(ctx):
+            raise RuntimeError("formatter failed")
+
+        monkeypatch.setattr(pipeline.STAGES["estimate_formatter"], "compute", boom)
+        metrics = pipeline.MetricsCollector()
+
+        with pytest.raises(RuntimeError):
+            pipeline.run_dag(tmp_path, metrics=metrics, use_processes=False)
+
+        assert metrics.metrics["steps"]["estimate_formatter"]["status"] == "FAIL"
+        assert "doc_lint_guard" not in metrics.metrics["steps"]
+
+
+@pytest.mark.unit
+class TestStageSkipping:
+    """Test content-hash based stage skipping"""
+
+    def test_rerun_unchanged_skips_every_stage(self, tmp_path):
+        """Second run over an unchanged work dir reuses all outputs"""
+        first = pipeline.run_stages(tmp_path)
+        metrics = pipeline.MetricsCollector()
+        second = pipeline.run_stages(tmp_path, metrics=metrics)
+
+        assert {s["status"] for s in metrics.metrics["steps"].values()} == {"SKIPPED"}
+        assert second["breaker_placer"]["slots"] == first["breaker_placer"]["slots"]
+
+    def test_changed_input_reruns_downstream(self, tmp_path):
+        """Changing estimate input re-runs formatter, cover and lint only"""
+        pipeline.run_stages(tmp_path)
+        (tmp_path / "input").mkdir()
+        (tmp_path / "input" / "estimate.json").write_text(
+            '{"project_name": "P", "client": "C", "items": [], "subtotal": 0, "vat": 0, "total": 0}',
+            encoding="utf-8",
+        )
+
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_dag(tmp_path, metrics=metrics, use_processes=False)
+        status = {name: s["status"] for name, s in metrics.metrics["steps"].items()}
+
+        assert status["estimate_formatter"] == "OK"
+        assert status["cover_tab_writer"] == "OK"
+        assert status["doc_lint_guard"] == "OK"
+        assert status["breaker_placer"] == "SKIPPED"
+        assert status["spatial_assistant"] == "SKIPPED"
+
+    def test_evidence_mode_change_reruns(self, tmp_path):
+        """An eager run after a skip run re-runs every stage and writes SVGs"""
+        try:
+            pipeline.run_stages(tmp_path, svg="skip")
+        finally:
+            pipeline.set_svg_mode("eager")
+        assert not list(tmp_path.rglob("*.svg"))
+
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_stages(tmp_path, metrics=metrics)
+
+        assert {s["status"] for s in metrics.metrics["steps"].values()} == {"OK"}
+        assert list(tmp_path.rglob("*.svg"))
+
+    def test_helper_change_reruns(self, tmp_path, monkeypatch):
+        """A change to shared engine helpers invalidates every stage"""
+        pipeline.run_stages(tmp_path, stages=["enclosure_solver", "breaker_placer"])
+        monkeypatch.setattr(pipeline, "engine_digest", lambda: "changed")
+
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_stages(tmp_path, stages=["enclosure_solver", "breaker_placer"], metrics=metrics)
+        assert {s["status"] for s in metrics.metrics["steps"].values()} == {"OK"}
+
+    def test_missing_output_or_force_reruns(self, tmp_path):
+        """Deleted outputs and force=True both bypass the manifest"""
+        pipeline.run_stages(tmp_path, stages=["enclosure_solver"])
+        (tmp_path / pipeline.ENCLOSURE_PLAN).unlink()
+
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_stages(tmp_path, stages=["enclosure_solver"], metrics=metrics)
+        assert metrics.metrics["steps"]["enclosure_solver"]["status"] == "OK"
+
+        metrics = pipeline.MetricsCollector()
+        pipeline.run_stages(tmp_path, stages=["enclosure_solver"], metrics=metrics, force=True)
+        assert metrics.metrics["steps"]["enclosure_solver"]["status"] == "OK"
@@ -0,0 +1,149 @@
+"""
+Unit tests for the column-wise pricing kernel and cell cross-checks
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Engine modules use flat imports (``from _util_io import ...``)
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "src" / "kis_estimator_core" / "engine"))
+
+import _pricing
+from _pricing import compare_cells, load_markup, price_items
+
+RULES_DIR = Path(__file__).parent.parent.parent / "spec_kit" / "rules"
+
+
+@pytest.fixture(params=["polars", "rows"])
+def backend(request, monkeypatch):
+    """Run each test with and without polars"""
+    if request.param == "polars":
+        pytest.importorskip("polars")
+        monkeypatch.setattr(_pricing, "_HAS_POLARS", True)
+    else:
+        monkeypatch.setattr(_pricing, "_HAS_POLARS", False)
+    return request.param
+
+
+@pytest.mark.unit
+class TestPriceItems:
+    """Test line totals, markups, subtotal and VAT"""
+
+    def test_markup_loaded_from_business_rules(self):
+        assert load_markup(RULES_DIR) == {"material": 1.15, "labor": 1.20, "overhead": 1.10}
+
+    def test_missing_rules_fall_back_to_defaults(self, tmp_path):
+        assert load_markup(tmp_path) == _pricing.DEFAULT_MARKUP
+
+    def test_rules_parsed_once_until_changed(self, tmp_path):
+        rules = tmp_path / "business_rules.yaml"
+        rules.write_text("pricing:\n  markup:\n    labor: 1.5\n", encoding="utf-8")
+        _pricing._read_markup.cache_clear()
+
+        assert load_markup(tmp_path)["labor"] == 1.5
+        load_markup(tmp_path)["labor"] = 9.0  # callers get a copy
+        assert load_markup(tmp_path)["labor"] == 1.5
+        assert _pricing._read_markup.cache_info().misses == 1
+
+        rules.write_text("pricing:\n  markup:\n    labor: 1.25\n", encoding="utf-8")
+        assert load_markup(tmp_path)["labor"] == 1.25
+
+    def test_totals_with_markup(self, backend):
+        items = [
+            {"qty": 2, "unit_price": 1000, "category": "material"},
+            {"qty": 1, "unit_price": 5000, "category": "labor"},
+            {"qty": 3, "unit_price": 100},
+        ]
+
+        result = price_items(items)
+
+        assert result["line_totals"] == [2000, 5000, 300]
+        assert result["net"] == 7300
+        assert result["markup"] == 300 + 1000
+        assert result["subtotal"] == 8600
+        assert result["vat"] == 860
+        assert result["total"] == 9460
+
+    def test_stated_totals_checked(self, backend):
+        items = [
+            {"qty": 2, "unit_price": 1000, "total": 2000},
+            {"qty": 1, "unit_price": 1000, "total": 1500},
+            {"total": 700},
+        ]
+
+        result = price_items(items)
+
+        assert result["stated_mismatches"] == [1]
+        assert result["line_totals"] == [2000, 1000, 700]
+
+    def test_line_totals_are_ints_on_both_backends(self, monkeypatch):
+        pytest.importorskip("polars")
+        items = [{"qty": 3, "unit_price": 333.4}, {"qty": 0.5, "unit_price": 5.2}, {"total": 99.6}]
+
+        monkeypatch.setattr(_pricing, "_HAS_POLARS", True)
+        columnar = price_items(items)["line_totals"]
+        monkeypatch.setattr(_pricing, "_HAS_POLARS", False)
+        rows = price_items(items)["line_totals"]
+
+        assert columnar == rows == [1000, 3, 100]
+        assert all(type(total) is int for total in columnar + rows)
+
+    def test_empty_estimate(self, backend):
+        result = price_items([])
+
+        assert (result["subtotal"], result["vat"], result["total"]) == (0, 0, 0)
+
+
+@pytest.mark.unit
+class TestCompareCells:
+    """Test the one-pass expected vs workbook comparison"""
+
+    def test_matching_cells(self, backend):
+        expected = [("Estimate", "H10", 100), ("Estimate", "B10", "Panel")]
+        actual = {("Estimate", "H10"): 100.4, ("Estimate", "B10"): "Panel"}
+
+        assert compare_cells(expected, actual) == (0, [])
+
+    def test_differences_reported(self, backend):
+        expected = [("Estimate", "H10", 100), ("Estimate", "B10", "Panel"), ("Cover", "B3", "P")]
+        actual = {("Estimate", "H10"): 90, ("Estimate", "B10"): "Panel"}
+
+        diff, cells = compare_cells(expected, actual)
+
+        assert diff == 2
+        assert [(c["ref"], c["actual"]) for c in cells] == [("H10", 90), ("B3", None)]
+
+
+@pytest.mark.unit
+@pytest.mark.slow
+class TestThroughput:
+    """Throughput benchmarks at 10k+ lines"""
+
+    LINES = 20_000
+
+    def test_pricing_throughput(self):
+        pytest.importorskip("polars")
+        items = [{"qty": i % 7 + 1, "unit_price": 1000 + i, "category": "material"}
+                 for i in range(self.LINES)]
+
+        start = time.perf_counter()
+        result = price_items(items)
+        elapsed = time.perf_counter() - start
+
+        assert len(result["line_totals"]) == self.LINES
+        assert elapsed < 1.0, f"{self.LINES / elapsed:,.0f} lines/s"
+
+    def test_cross_check_throughput(self):
+        pytest.importorskip("polars")
+        expected = [("Estimate", f"H{row}", row * 10) for row in range(10, 10 + self.LINES)]
+        actual = {(sheet, ref): value for sheet, ref, value in expected}
+
+        start = time.perf_counter()
+        diff, _ = compare_cells(expected, actual)
+        elapsed = time.perf_counter() - start
+
+        assert diff == 0
+        assert elapsed < 1.0, f"{self.LINES / elapsed:,.0f} cells/s"